@@ -1,11 +1,25 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, stream_with_context
 import sqlite3
 from functools import wraps
 from datetime import datetime, date, timedelta
 import os
+import base64
+import binascii
+import json
 from dotenv import load_dotenv
 import bcrypt
 
+import archive
+import availability
+import booking
+import catalog
+import db
+import fragments
+import jobs
+import metrics
+import migrate
+from db import get_db
+
 load_dotenv()
 
 app = Flask(__name__)
@@ -25,6 +39,25 @@ db_dir = os.path.dirname(DATABASE)
 if db_dir and not os.path.exists(db_dir):
     os.makedirs(db_dir, exist_ok=True)
 
+app.config["DATABASE"] = DATABASE
+# Serve /search from the in-memory bitmap index (set AVAILABILITY_INDEX=false to use SQL only)
+app.config["AVAILABILITY_INDEX"] = os.environ.get("AVAILABILITY_INDEX", "true").lower() == "true"
+# 'hourly' writes one Reservations row per hour; 'interval' writes one row per booking
+app.config["RESERVATION_STORAGE"] = os.environ.get("RESERVATION_STORAGE", "hourly").lower()
+# Seconds browsers may reuse /buildings and /floors without revalidating (0 = always send If-None-Match)
+app.config["CATALOG_MAX_AGE"] = int(os.environ.get("CATALOG_MAX_AGE", 0))
+# Bearer token a scraper can present to /metrics instead of an admin session
+app.config["METRICS_TOKEN"] = os.environ.get("METRICS_TOKEN")
+# Seconds between background passes that archive old rejected/cancelled reservations (0 = off)
+app.config["COMPACTION_INTERVAL"] = int(os.environ.get("COMPACTION_INTERVAL", 3600))
+# Admin writes touching more rows than this run on the background job queue (see jobs.py)
+app.config["ASYNC_ROW_THRESHOLD"] = int(os.environ.get("ASYNC_ROW_THRESHOLD", 500))
+# Job threads per worker process (0 = run every admin write inside its request)
+app.config["JOB_WORKERS"] = int(os.environ.get("JOB_WORKERS", 2))
+db.init_app(app)
+migrate.init_app(app)
+metrics.init_app(app)
+
 # Weekday helpers for recurring reservation management (Monday=0)
 WEEKDAY_OPTIONS = [
     (0, "Monday"),
@@ -34,17 +67,35 @@ WEEKDAY_OPTIONS = [
     (4, "Friday"),
 ]
 
-# Lookup list for SQLite weekday values (Sunday=0)
-SQL_WEEKDAY_NAMES = [
-    "Sunday",
+# Day names indexed by date.weekday() / RecurringSeries.weekday (Monday=0)
+WEEKDAY_NAMES = [
     "Monday",
     "Tuesday",
     "Wednesday",
     "Thursday",
     "Friday",
     "Saturday",
+    "Sunday",
 ]
 
+# Longest span /search/range will scan in one request
+MAX_RANGE_DAYS = 366
+
+# How far ahead /suggest looks, and the most options it returns
+SUGGEST_HORIZON_DAYS = 60
+MAX_SUGGESTIONS = 20
+
+# /reserve/batch: the most bookings one request may carry, and its modes
+MAX_BATCH_BOOKINGS = 100
+BATCH_MODES = ('all_or_nothing', 'best_effort')
+
+# Pending blocks per page on the admin dashboard
+DASHBOARD_PAGE_SIZE = 25
+
+# Rows per page on /admin/reservations (the limit parameter is capped at the max)
+ADMIN_PAGE_SIZE = 50
+MAX_ADMIN_PAGE_SIZE = 500
+
 
 def align_to_weekday(start: date, target_weekday: int) -> date:
     """Return the next occurrence of target_weekday on or after start."""
@@ -54,34 +105,69 @@ def align_to_weekday(start: date, target_weekday: int) -> date:
     return start + timedelta(days=days_ahead)
 
 def get_db_connection():
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row  # This allows dict-like access to rows
-    return conn
+    """Open a standalone connection for scripts and tests.
+
+    Request handlers should use ``get_db()``, which hands out a pooled
+    connection bound to the app context instead.
+    """
+    return db.connect(app.config["DATABASE"])
 
 def init_db():
-    """Initialize the database with schema and sample data."""
-    # Always recreate database on init to ensure fresh data
-    if os.path.exists(DATABASE):
-        os.remove(DATABASE)
-        print("Existing database removed for fresh initialization.")
-    
-    conn = sqlite3.connect(DATABASE)
-    
-    # Read and execute schema
-    with open('schema.sql', 'r') as f:
-        conn.executescript(f.read())
-    
-    # Read and execute sample data
-    try:
-        with open('seed.sql', 'r') as f:
-            conn.executescript(f.read())
-        print("Database initialized with sample data!")
-    except FileNotFoundError:
-        print("Database schema created. Sample data file not found.")
-    
-    conn.close()
+    """Destructively rebuild the database with schema and sample data.
+
+    Normal start-up only applies missing migrations (see ``migrate.upgrade``);
+    this is kept for local resets and the ``flask db reset`` command.
+    """
+    migrate.reset(app.config["DATABASE"])
     return True
 
+def reservations_changed(conn):
+    """Refresh this worker's availability index after committing reservation writes."""
+    availability.get_index(app.config["DATABASE"]).after_write(conn)
+
+@app.before_request
+def start_compactor():
+    """Start this worker's compaction thread on its first request (not under tests or CLI commands)."""
+    if app.config["COMPACTION_INTERVAL"] and not app.testing:
+        archive.get_compactor(app.config["DATABASE"]).ensure_started(app.config["COMPACTION_INTERVAL"])
+
+@app.before_request
+def start_job_runner():
+    """Start this worker's job threads on its first request (not under tests or CLI commands)."""
+    if app.config["JOB_WORKERS"] and not app.testing:
+        jobs.get_runner(app.config["DATABASE"]).ensure_started(app.config["JOB_WORKERS"])
+
+def runs_async(rows):
+    """True when an admin write touching ``rows`` rows should go to the job queue."""
+    return app.config["JOB_WORKERS"] > 0 and rows > app.config["ASYNC_ROW_THRESHOLD"]
+
+def queue_job(kind, params, total, description):
+    """Queue a job and answer at once: 202 with its status URL, or a flash and the dashboard."""
+    job_id = jobs.enqueue(get_db(), kind, params, total=total, created_by=session.get('admin_username'))
+    jobs.get_runner(app.config["DATABASE"]).notify()
+    if wants_json():
+        return jsonify({"job_id": job_id, "status_url": url_for('job_status', job_id=job_id)}), 202
+    flash(f"{description} is running in the background (job #{job_id}).")
+    return redirect(url_for('admin_dashboard'))
+
+def wants_json():
+    """True when the client asked for JSON rather than an HTML redirect."""
+    return request.accept_mimetypes.best == 'application/json'
+
+def encode_cursor(reserved_at, reservation_id):
+    """Opaque keyset cursor for the row a page ended on."""
+    return base64.urlsafe_b64encode(f"{reserved_at}|{reservation_id}".encode()).decode()
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; None for the first page, ValueError when malformed."""
+    if not cursor:
+        return None
+    try:
+        reserved_at, reservation_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit('|', 1)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    return reserved_at, int(reservation_id)
+
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -91,9 +177,7 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-# Custom Jinja2 filters
-@app.template_filter('hour_to_12hr')
-def hour_to_12hr(hour):
+def format_hour_12hr(hour):
     """Convert 24-hour format to 12-hour format with AM/PM"""
     if hour == 0:
         return "12:00 AM"
@@ -104,10 +188,28 @@ def hour_to_12hr(hour):
     else:
         return f"{hour - 12}:00 PM"
 
+# Every label the filters can produce for a day, built once at import
+HOUR_LABELS = {hour: format_hour_12hr(hour) for hour in range(25)}
+TIME_RANGE_LABELS = {
+    (start, end): f"{HOUR_LABELS[start]} - {HOUR_LABELS[end]}"
+    for start in range(24)
+    for end in range(start + 1, 25)
+}
+
+# Custom Jinja2 filters
+@app.template_filter('hour_to_12hr')
+def hour_to_12hr(hour):
+    """Convert 24-hour format to 12-hour format with AM/PM"""
+    label = HOUR_LABELS.get(hour)
+    return label if label is not None else format_hour_12hr(hour)
+
 @app.template_filter('time_range_12hr')
-def time_range_12hr(start_hour):
+def time_range_12hr(start_hour, end_hour=None):
     """Convert hour range to 12-hour format (e.g., 9:00 AM - 10:00 AM)"""
-    return f"{hour_to_12hr(start_hour)} - {hour_to_12hr(start_hour + 1)}"
+    if end_hour is None:
+        end_hour = start_hour + 1
+    label = TIME_RANGE_LABELS.get((start_hour, end_hour))
+    return label if label is not None else f"{hour_to_12hr(start_hour)} - {hour_to_12hr(end_hour)}"
 
 # Client-facing routes
 @app.route('/')
@@ -116,18 +218,18 @@ def index():
 
 @app.route('/search')
 def search():
-    slot_date = request.args.get("slot_date")   # e.g. '2025-08-04'
-    building = request.args.get("building_id")  # may be blank
-    start_hour = request.args.get("start_hour")   # required
-    end_hour = request.args.get("end_hour")       # required
-    floor = request.args.get("floor")           # optional
-
-    # Coerce empty strings to None
-    if building == '':
-        building = None
-    if floor == '':
-        floor = None
-    
+    """Rooms free for a whole time range on one date.
+
+    Filters: building_id, floor, min_capacity (party size), accessible
+    (ADA-compliant rooms) and step_free (buildings with no stairs). With a
+    min_capacity the smallest rooms that fit come first, otherwise rooms are
+    in building / floor / room order. ``limit`` caps the number returned.
+    """
+    args = request.args
+    slot_date = args.get("slot_date")   # e.g. '2025-08-04'
+    start_hour = args.get("start_hour")   # required
+    end_hour = args.get("end_hour")       # required
+
     # Validate time range
     if not start_hour or not end_hour:
         return jsonify({"error": "Start and end times are required"}), 400
@@ -140,64 +242,302 @@ def search():
     except ValueError:
         return jsonify({"error": "Invalid time format"}), 400
 
-    conn = get_db_connection()
+    try:
+        slot_date = datetime.strptime(slot_date or '', '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        return jsonify({"error": "Invalid date format"}), 400
+
+    # Blank form fields mean "any"
+    try:
+        building_id = int(args['building_id']) if args.get('building_id') else None
+        floor = int(args['floor']) if args.get('floor') else None
+        min_capacity = int(args['min_capacity']) if args.get('min_capacity') else None
+        limit = int(args['limit']) if args.get('limit') else None
+    except ValueError:
+        return jsonify({"error": "Invalid building, floor, capacity or limit"}), 400
+    if (min_capacity is not None and min_capacity < 1) or (limit is not None and limit < 1):
+        return jsonify({"error": "Capacity and limit must be at least 1"}), 400
+    accessible = args.get('accessible', '').lower() in ('1', 'true')
+    step_free = args.get('step_free', '').lower() in ('1', 'true')
+    best_fit = min_capacity is not None
+
+    conn = get_db()
+
+    # engine=sql bypasses the availability index so results can be cross-checked
+    if app.config["AVAILABILITY_INDEX"] and args.get("engine") != "sql":
+        index = availability.get_index(app.config["DATABASE"])
+        rooms = index.free_rooms(conn, slot_date, start_hour, end_hour,
+                                 building_id=building_id, floor=floor, min_capacity=min_capacity,
+                                 accessible=accessible, step_free=step_free, best_fit=best_fit, limit=limit)
+        return jsonify({"rooms": rooms})
+
     cur = conn.cursor()
 
-    # Find rooms that are available for ALL hours in the requested range
+    # Only the active filters go into the WHERE clause, so a capacity filter can
+    # range-seek idx_rooms_search, which covers every Rooms column used here
+    clauses, params = [], []
+    if building_id is not None:
+        clauses.append("r.building_id = ?")
+        params.append(building_id)
+    if floor is not None:
+        clauses.append("r.floor = ?")
+        params.append(floor)
+    if min_capacity is not None:
+        clauses.append("r.capacity >= ?")
+        params.append(min_capacity)
+    if accessible:
+        clauses.append("r.is_aca_compliant = 1")
+    if step_free:
+        clauses.append("b.is_no_stair = 1")
+
     # A room is available only if it has no approved reservations for ANY hour in the range
-    sql = """
-        SELECT DISTINCT r.room_id, r.room_num, r.capacity, r.floor, b.name AS building_name, b.building_id
-        FROM   Rooms r
-        JOIN   Buildings b ON b.building_id = r.building_id
-        WHERE  (? IS NULL OR r.building_id = ?)
-          AND  (? IS NULL OR r.floor = ?)
-          AND  r.room_id NOT IN (
+    clauses.append("""r.room_id NOT IN (
               SELECT room_id 
               FROM Reservations 
               WHERE slot_date = ? 
-                AND slot_hour >= ? 
-                AND slot_hour < ?
+                AND slot_hour < ? 
+                AND end_hour > ?
                 AND status = 'approved'
-          )
-        ORDER  BY b.name, r.floor, r.room_num
+          )""")
+    params.extend((slot_date, end_hour, start_hour))
+    order = "r.capacity, b.name, r.floor, r.room_num" if best_fit else "b.name, r.floor, r.room_num"
+    sql = f"""
+        SELECT r.room_id, r.room_num, r.capacity, r.floor, b.name AS building_name, b.building_id,
+               r.is_aca_compliant, b.is_no_stair
+        FROM   Rooms r
+        JOIN   Buildings b ON b.building_id = r.building_id
+        WHERE  {' AND '.join(clauses)}
+        ORDER  BY {order}
+        LIMIT  ?
     """
-    params = (building, building, floor, floor, slot_date, start_hour, end_hour)
-    cur.execute(sql, params)
+    cur.execute(sql, params + [-1 if limit is None else limit])
     rooms = [dict(row) for row in cur.fetchall()]
     cur.close()
-    conn.close()
 
     return jsonify({"rooms": rooms})
 
-@app.route('/buildings')
-def get_buildings():
-    conn = get_db_connection()
+@app.route('/search/range')
+def search_range():
+    """Per-room availability for an hour window across many dates in one round trip.
+
+    Query parameters: start_date, end_date (inclusive, YYYY-MM-DD), start_hour,
+    end_hour, optional weekdays (comma-separated, Monday=0, default Mon-Fri),
+    building_id, floor, room_id, include_pending (also treat pending requests as
+    busy) and all_dates (only return rooms free on every matching date).
+    """
+    args = request.args
+    try:
+        start_date = datetime.strptime(args.get('start_date', ''), '%Y-%m-%d').date()
+        end_date = datetime.strptime(args.get('end_date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({"error": "Invalid date format"}), 400
+    if end_date < start_date:
+        return jsonify({"error": "End date must not be before start date"}), 400
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        return jsonify({"error": f"Date range is limited to {MAX_RANGE_DAYS} days"}), 400
+
+    try:
+        start_hour = int(args.get('start_hour', ''))
+        end_hour = int(args.get('end_hour', ''))
+        weekdays = args.get('weekdays') or '0,1,2,3,4'
+        weekdays = {int(day) for day in weekdays.split(',')}
+        building = int(args['building_id']) if args.get('building_id') else None
+        floor = int(args['floor']) if args.get('floor') else None
+        room_id = int(args['room_id']) if args.get('room_id') else None
+    except ValueError:
+        return jsonify({"error": "Invalid time, weekday or filter format"}), 400
+    if not (7 <= start_hour < end_hour <= 20):
+        return jsonify({"error": "Invalid time range"}), 400
+    if not weekdays <= {0, 1, 2, 3, 4}:
+        return jsonify({"error": "Weekdays must be between 0 (Monday) and 4 (Friday)"}), 400
+
+    include_pending = args.get('include_pending', '').lower() in ('1', 'true')
+    all_dates = args.get('all_dates', '').lower() in ('1', 'true')
+
+    dates = []
+    current_date = start_date
+    while current_date <= end_date:
+        if current_date.weekday() in weekdays:
+            dates.append(current_date.isoformat())
+        current_date += timedelta(days=1)
+
+    conn = get_db()
     cur = conn.cursor()
-    
-    cur.execute("SELECT building_id, name FROM Buildings ORDER BY name")
-    buildings = [dict(row) for row in cur.fetchall()]
-    
+
+    cur.execute("""
+        SELECT r.room_id, r.room_num, r.capacity, r.floor, b.name AS building_name, b.building_id
+        FROM   Rooms r
+        JOIN   Buildings b ON b.building_id = r.building_id
+        WHERE  (? IS NULL OR r.building_id = ?)
+          AND  (? IS NULL OR r.floor = ?)
+          AND  (? IS NULL OR r.room_id = ?)
+        ORDER  BY b.name, r.floor, r.room_num
+    """, (building, building, floor, floor, room_id, room_id))
+    rooms = [dict(row) for row in cur.fetchall()]
+
+    # One range seek for every busy cell in the window: on (status, slot_date)
+    # across rooms, or (room_id, slot_date, status) for a single room. The
+    # generated weekday column drops unselected weekdays inside the scan.
+    busy = {}
+    if dates and rooms:
+        statuses = ('approved', 'pending') if include_pending else ('approved',)
+        clauses = [
+            f"status IN ({', '.join('?' * len(statuses))})",
+            "slot_date BETWEEN ? AND ?",
+            f"weekday IN ({', '.join('?' * len(weekdays))})",
+            "slot_hour < ?",
+            "end_hour > ?",
+        ]
+        params = [*statuses, dates[0], dates[-1], *sorted(weekdays), end_hour, start_hour]
+        if room_id is not None:
+            clauses.append("room_id = ?")
+            params.append(room_id)
+        cur.execute(f"""
+            SELECT room_id, slot_date, slot_hour, end_hour
+            FROM   Reservations
+            WHERE  {' AND '.join(clauses)}
+            ORDER  BY room_id, slot_date, slot_hour
+        """, params)
+        for res_room, slot_date, slot_hour, res_end in cur.fetchall():
+            # Interval rows may extend past the window; report only the hours inside it
+            busy.setdefault(res_room, {}).setdefault(slot_date, []).extend(
+                range(max(slot_hour, start_hour), min(res_end, end_hour)))
     cur.close()
-    conn.close()
-    
-    return jsonify({"buildings": buildings})
+
+    results = []
+    for room in rooms:
+        room_busy = busy.get(room['room_id'], {})
+        if all_dates and room_busy:
+            continue
+        room['free_dates'] = [d for d in dates if d not in room_busy]
+        room['busy_hours'] = room_busy
+        results.append(room)
+
+    return jsonify({
+        "dates": dates,
+        "start_hour": start_hour,
+        "end_hour": end_hour,
+        "rooms": results,
+    })
+
+def catalog_response(snapshot, key, payload):
+    """JSON response for catalog data with an ETag, answering If-None-Match with 304."""
+    tag = snapshot.etag(key, payload)
+    if request.if_none_match.contains(tag):
+        catalog.get_cache(app.config["DATABASE"]).record_not_modified()
+        response = app.response_class(status=304)
+    else:
+        response = jsonify(payload)
+    response.set_etag(tag)
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config["CATALOG_MAX_AGE"]
+    if not app.config["CATALOG_MAX_AGE"]:
+        response.cache_control.no_cache = True
+    return response
+
+@app.route('/suggest')
+def suggest():
+    """The next free times for a booking of ``duration`` hours.
+
+    Either one room_id or the /search filters (building_id, floor,
+    min_capacity, accessible, step_free) pick the candidate rooms; with a
+    min_capacity the smallest rooms that fit are preferred. Weekdays from
+    from_date (default today) up to SUGGEST_HORIZON_DAYS ahead are tried
+    earliest first, and the first ``count`` (default 5) free
+    (room, date, start_hour) options are returned.
+    """
+    args = request.args
+    today = date.today()
+    try:
+        duration = int(args.get('duration', ''))
+        count = int(args.get('count') or 5)
+        first_date = datetime.strptime(args['from_date'], '%Y-%m-%d').date() if args.get('from_date') else today
+        room_id = int(args['room_id']) if args.get('room_id') else None
+        building = int(args['building_id']) if args.get('building_id') else None
+        floor = int(args['floor']) if args.get('floor') else None
+        min_capacity = int(args['min_capacity']) if args.get('min_capacity') else None
+    except ValueError:
+        return jsonify({"error": "duration is required; dates must be YYYY-MM-DD and filters whole numbers"}), 400
+    if not 1 <= duration <= availability.SLOT_COUNT:
+        return jsonify({"error": f"duration must be 1 to {availability.SLOT_COUNT} hours"}), 400
+    if not 1 <= count <= MAX_SUGGESTIONS:
+        return jsonify({"error": f"count must be 1 to {MAX_SUGGESTIONS}"}), 400
+    if first_date < today:
+        return jsonify({"error": "from_date must not be in the past"}), 400
+    accessible = args.get('accessible', '').lower() in ('1', 'true')
+    step_free = args.get('step_free', '').lower() in ('1', 'true')
+
+    conn = get_db()
+    snapshot = catalog.get_cache(app.config["DATABASE"]).get(conn)
+    step_free_buildings = {b['building_id'] for b in snapshot.buildings if b['is_no_stair']}
+    rooms = [room for room in snapshot.rooms
+             if (room_id is None or room['room_id'] == room_id)
+             and (building is None or room['building_id'] == building)
+             and (floor is None or room['floor'] == floor)
+             and (min_capacity is None or room['capacity'] >= min_capacity)
+             and (not accessible or room['is_aca_compliant'])
+             and (not step_free or room['building_id'] in step_free_buildings)]
+    if room_id is not None and not rooms:
+        return jsonify({"error": "Room not found"}), 404
+    if min_capacity is not None:
+        rooms.sort(key=lambda room: room['capacity'])
+
+    # Hours already under way today are not offered
+    earliest = datetime.now().hour + 1 if first_date == today else availability.FIRST_HOUR
+    last_date = first_date + timedelta(days=SUGGEST_HORIZON_DAYS - 1)
+    options, searched = availability.next_free_slots(conn, rooms, first_date, last_date, duration, count,
+                                                     earliest_hour=earliest)
+    return jsonify({
+        "options": options,
+        "searched_through": searched.isoformat() if searched else None,
+        "horizon_end": last_date.isoformat(),
+    })
+
+@app.route('/buildings')
+def get_buildings():
+    snapshot = catalog.get_cache(app.config["DATABASE"]).get(get_db())
+    buildings = [{"building_id": b["building_id"], "name": b["name"]} for b in snapshot.buildings]
+    return catalog_response(snapshot, 'buildings', {"buildings": buildings})
 
 @app.route('/floors/<int:building_id>')
 def get_floors(building_id):
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
-    cur.execute("SELECT DISTINCT floor FROM Rooms WHERE building_id = ? ORDER BY floor", (building_id,))
-    floors = [row[0] for row in cur.fetchall()]
-    
-    cur.close()
-    conn.close()
-    
-    return jsonify({"floors": floors})
+    snapshot = catalog.get_cache(app.config["DATABASE"]).get(get_db())
+    return catalog_response(snapshot, ('floors', building_id), {"floors": snapshot.floors_for(building_id)})
 
-@app.route('/reserve', methods=['POST'])
-def make_reservation():
-    data = request.json
+@app.route('/api/bootstrap')
+def api_bootstrap():
+    """Everything the search page needs to build its form, in one cacheable response.
+
+    Buildings, floors per building, the bookable hour window (end exclusive)
+    and weekday rules. ``version`` is the catalog data version; the ETag
+    changes whenever any of the content does.
+    """
+    snapshot = catalog.get_cache(app.config["DATABASE"]).get(get_db())
+    first_hour, close_hour = availability.FIRST_HOUR, availability.LAST_HOUR + 1
+    payload = {
+        "version": snapshot.version,
+        "buildings": [{"building_id": b["building_id"], "name": b["name"]} for b in snapshot.buildings],
+        "floors": {str(building_id): floors for building_id, floors in snapshot.floors.items()},
+        "hours": {
+            "first": first_hour,
+            "last": close_hour,
+            "labels": {str(hour): hour_to_12hr(hour) for hour in range(first_hour, close_hour + 1)},
+        },
+        "weekdays": {
+            "bookable": [value for value, _ in WEEKDAY_OPTIONS],
+            "names": WEEKDAY_NAMES,
+        },
+        "max_range_days": MAX_RANGE_DAYS,
+    }
+    return catalog_response(snapshot, 'bootstrap', payload)
+
+def parse_booking(data, room_ids):
+    """Validate one booking request body; return ``(booking, None)`` or ``(None, error)``.
+
+    ``room_ids`` is the set of existing rooms, from the catalog snapshot.
+    """
+    if not isinstance(data, dict):
+        return None, "Request body must be an object"
     room_id = data.get('room_id')
     reserved_by = data.get('reserved_by')
     slot_date = data.get('slot_date')
@@ -205,77 +545,145 @@ def make_reservation():
     end_hour = data.get('end_hour')
 
     if not all([room_id, reserved_by, slot_date, start_hour, end_hour]):
-        return jsonify({"error": "Missing required fields"}), 400
+        return None, "Missing required fields"
+    if not isinstance(reserved_by, str):
+        return None, "Invalid name"
 
     # Validate weekday (Monday=0, Sunday=6)
     try:
         reservation_date = datetime.strptime(slot_date, '%Y-%m-%d').date()
         if reservation_date.weekday() > 4:  # Saturday=5, Sunday=6
-            return jsonify({"error": "Reservations are only allowed on weekdays"}), 400
-    except ValueError:
-        return jsonify({"error": "Invalid date format"}), 400
+            return None, "Reservations are only allowed on weekdays"
+    except (TypeError, ValueError):
+        return None, "Invalid date format"
 
     # Validate time range
     try:
         start_hour = int(start_hour)
         end_hour = int(end_hour)
         if not (7 <= start_hour < end_hour <= 20):
-            return jsonify({"error": "Time range must be between 07:00 and 20:00, with end after start"}), 400
-    except ValueError:
-        return jsonify({"error": "Invalid time format"}), 400
+            return None, "Time range must be between 07:00 and 20:00, with end after start"
+    except (TypeError, ValueError):
+        return None, "Invalid time format"
 
-    conn = get_db_connection()
-    cur = conn.cursor()
+    try:
+        room_id = int(room_id)
+    except (TypeError, ValueError):
+        return None, "Invalid room"
+    if room_id not in room_ids:
+        return None, "Room not found"
+
+    return {"room_id": room_id, "reserved_by": reserved_by, "slot_date": reservation_date.isoformat(),
+            "start_hour": start_hour, "end_hour": end_hour}, None
+
+
+@app.route('/reserve', methods=['POST'])
+def make_reservation():
+    conn = get_db()
+    fields, error = parse_booking(request.json, catalog.get_cache(app.config["DATABASE"]).get(conn).room_ids)
+    if error:
+        return jsonify({"error": error}), 400
 
     try:
-        # Check if ANY hour in the range is already reserved
-        cur.execute("""
-            SELECT slot_hour FROM Reservations 
-            WHERE room_id = ? 
-              AND slot_date = ? 
-              AND slot_hour >= ? 
-              AND slot_hour < ?
-              AND status IN ('pending', 'approved')
-            LIMIT 1
-        """, (room_id, slot_date, start_hour, end_hour))
-        
-        conflict = cur.fetchone()
-        if conflict:
-            cur.close()
-            conn.close()
-            return jsonify({"error": f"Time slot {conflict[0]}:00 is already reserved or pending"}), 409
-        
-        # Create individual hourly reservations for each hour in the range
-        reservation_ids = []
-        for hour in range(start_hour, end_hour):
-            cur.execute("""
-                INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status)
-                VALUES (?, ?, ?, ?, 'pending')
-            """, (room_id, reserved_by, slot_date, hour))
-            reservation_ids.append(cur.lastrowid)
-        
-        conn.commit()
-        cur.close()
-        conn.close()
-        
-        hours_count = end_hour - start_hour
-        return jsonify({
-            "message": f"Reservation submitted for approval ({hours_count} hour{'s' if hours_count > 1 else ''})",
-            "reservation_ids": reservation_ids,
-            "hours_reserved": hours_count
-        })
-    
+        # Lock, conflict check and single-statement insert happen in one transaction
+        result = booking.book(conn, **fields, interval=app.config["RESERVATION_STORAGE"] == "interval")
     except sqlite3.IntegrityError:
-        conn.rollback()
-        cur.close()
-        conn.close()
         return jsonify({"error": "One or more time slots already reserved"}), 409
+    except sqlite3.OperationalError as e:
+        if booking.is_busy(e):
+            return jsonify({"error": "The system is busy, please try again"}), 503
+        return jsonify({"error": str(e)}), 500
     except Exception as e:
-        conn.rollback()
-        cur.close()
-        conn.close()
         return jsonify({"error": str(e)}), 500
 
+    if result['conflicts']:
+        hours = result['conflicting_hours']
+        return jsonify({
+            "error": f"Time slot {hours[0]}:00 is already reserved or pending",
+            "conflicting_hours": hours,
+            "conflicts": result['conflicts'],
+        }), 409
+
+    reservations_changed(conn)
+    hours_count = fields['end_hour'] - fields['start_hour']
+    return jsonify({
+        "message": f"Reservation submitted for approval ({hours_count} hour{'s' if hours_count > 1 else ''})",
+        "reservation_ids": result['reservation_ids'],
+        "hours_reserved": hours_count
+    })
+
+@app.route('/reserve/batch', methods=['POST'])
+def make_reservations():
+    """Book a list of room/date/hour ranges in one transaction.
+
+    The body is ``{"bookings": [...], "mode": ..., "reserved_by": ...}``; each
+    booking has the /reserve fields and falls back to the top-level
+    reserved_by. In "all_or_nothing" mode (the default) any invalid or
+    conflicting booking means nothing is written; "best_effort" books every
+    booking that is valid and free. ``results`` has one entry per booking,
+    in order.
+    """
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be an object"}), 400
+    bookings = data.get('bookings')
+    mode = data.get('mode', 'all_or_nothing')
+    if mode not in BATCH_MODES:
+        return jsonify({"error": f"mode must be one of {', '.join(BATCH_MODES)}"}), 400
+    if not isinstance(bookings, list) or not bookings:
+        return jsonify({"error": "bookings must be a non-empty list"}), 400
+    if len(bookings) > MAX_BATCH_BOOKINGS:
+        return jsonify({"error": f"At most {MAX_BATCH_BOOKINGS} bookings per request"}), 400
+
+    room_ids = catalog.get_cache(app.config["DATABASE"]).get(get_db()).room_ids
+    results, items = [], []
+    for index, item in enumerate(bookings):
+        if not isinstance(item, dict):
+            fields, error = None, "Each booking must be an object"
+        else:
+            fields, error = parse_booking({'reserved_by': data.get('reserved_by'), **item}, room_ids)
+        results.append({"index": index, **(fields or {})})
+        if error:
+            results[-1].update(status="invalid", error=error)
+        else:
+            items.append((index, fields))
+
+    atomic = mode == 'all_or_nothing'
+    if atomic and len(items) < len(bookings):
+        for result in results:
+            result.setdefault('status', 'skipped')
+        return jsonify({"error": "One or more bookings are invalid", "booked": 0, "results": results}), 400
+
+    conn = get_db()
+    if items:
+        try:
+            outcomes = booking.book_batch(conn, [fields for _, fields in items], atomic=atomic,
+                                          interval=app.config["RESERVATION_STORAGE"] == "interval")
+        except sqlite3.IntegrityError:
+            return jsonify({"error": "One or more time slots already reserved"}), 409
+        except sqlite3.OperationalError as e:
+            if booking.is_busy(e):
+                return jsonify({"error": "The system is busy, please try again"}), 503
+            return jsonify({"error": str(e)}), 500
+        for (index, _), outcome in zip(items, outcomes):
+            # Batch conflicts name the other booking by its position in this request
+            for conflict in outcome['conflicts']:
+                if 'item' in conflict:
+                    conflict['item'] = items[conflict['item']][0]
+            results[index].update(outcome)
+
+    booked = sum(1 for result in results if result['status'] == 'booked')
+    if booked:
+        reservations_changed(conn)
+    if atomic and not booked:
+        return jsonify({"error": "One or more time slots are already reserved or pending",
+                        "booked": 0, "results": results}), 409
+    return jsonify({
+        "message": f"{booked} of {len(results)} booking{'s' if len(results) > 1 else ''} submitted for approval",
+        "booked": booked,
+        "results": results,
+    })
+
 # Admin routes
 @app.route('/admin/login', methods=['GET', 'POST'])
 def admin_login():
@@ -288,12 +696,11 @@ def admin_login():
             return render_template('admin/login.html')
         
         # Query database for admin user
-        conn = get_db_connection()
+        conn = get_db()
         cur = conn.cursor()
         cur.execute("SELECT admin_id, username, password_hash FROM Admins WHERE username = ?", (username,))
         admin = cur.fetchone()
         cur.close()
-        conn.close()
         
         # Verify password using bcrypt
         if admin and bcrypt.checkpw(password.encode('utf-8'), admin['password_hash'].encode('utf-8')):
@@ -316,201 +723,358 @@ def admin_logout():
 @app.route('/admin')
 @admin_required
 def admin_dashboard():
-    conn = get_db_connection()
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+
+    conn = get_db()
     cur = conn.cursor()
     
-    # Get pending reservations
+    # Group pending reservations into blocks (consecutive hours for same person, room, date)
+    # in SQL: within a run of back-to-back rows, end_hour minus the running total of
+    # booked hours is constant, so it identifies the island each row belongs to
     cur.execute("""
-        SELECT r.reservation_id, r.reserved_by, r.slot_date, r.slot_hour, r.reserved_at,
-               rm.room_id, rm.room_num, rm.capacity, rm.floor, b.name as building_name
-        FROM Reservations r
-        JOIN Rooms rm ON r.room_id = rm.room_id
+        WITH pending AS (
+            SELECT reservation_id, reserved_by, room_id, slot_date, slot_hour, end_hour,
+                   end_hour - SUM(end_hour - slot_hour) OVER (
+                       PARTITION BY reserved_by, room_id, slot_date
+                       ORDER BY slot_hour
+                   ) AS island
+            FROM Reservations INDEXED BY idx_reservations_pending_blocks
+            WHERE status = 'pending'
+        ),
+        blocks AS (
+            SELECT reserved_by, room_id, slot_date,
+                   MIN(slot_hour) AS start_hour, MAX(end_hour) AS end_hour,
+                   GROUP_CONCAT(reservation_id) AS reservation_ids,
+                   COUNT(*) AS size
+            FROM pending
+            GROUP BY reserved_by, room_id, slot_date, island
+        )
+        SELECT bl.*, rm.room_num, rm.capacity, rm.floor, b.name as building_name,
+               COUNT(*) OVER () AS total_blocks
+        FROM blocks bl
+        JOIN Rooms rm ON bl.room_id = rm.room_id
         JOIN Buildings b ON rm.building_id = b.building_id
-        WHERE r.status = 'pending'
-        ORDER BY r.reserved_by, r.slot_date, r.slot_hour
+        ORDER BY bl.reserved_by, bl.slot_date, bl.start_hour, bl.room_id
+        LIMIT ? OFFSET ?
+    """, (DASHBOARD_PAGE_SIZE, (page - 1) * DASHBOARD_PAGE_SIZE))
+    blocks = [dict(row) for row in cur.fetchall()]
+    total_blocks = blocks[0]['total_blocks'] if blocks else 0
+
+    # Member rows for just this page's blocks, for the per-reservation actions
+    ids = [int(rid) for block in blocks for rid in block['reservation_ids'].split(',')]
+    rows = {}
+    if ids:
+        placeholders = ','.join('?' * len(ids))
+        cur.execute(f"""
+            SELECT reservation_id, reserved_by, slot_date, slot_hour, end_hour, reserved_at
+            FROM Reservations
+            WHERE reservation_id IN ({placeholders})
+        """, ids)
+        rows = {row['reservation_id']: dict(row) for row in cur.fetchall()}
+    for block in blocks:
+        members = [rows[int(rid)] for rid in block['reservation_ids'].split(',') if int(rid) in rows]
+        block['reservations'] = sorted(members, key=lambda res: res['slot_hour'])
+        for res in block['reservations']:
+            res.update(building_name=block['building_name'], room_num=block['room_num'])
+
+    # All four counters in one round trip
+    cur.execute("""
+        SELECT (SELECT COUNT(*) FROM Reservations WHERE status = 'pending')  AS pending,
+               (SELECT COUNT(*) FROM Reservations WHERE status = 'approved') AS approved,
+               (SELECT COUNT(*) FROM Buildings)                               AS buildings,
+               (SELECT COUNT(*) FROM Rooms)                                   AS rooms
     """)
-    pending_reservations = [dict(row) for row in cur.fetchall()]
-    
-    # Group reservations into blocks (consecutive hours for same person, room, date)
-    grouped_reservations = []
-    current_block = []
-    
-    for res in pending_reservations:
-        if not current_block:
-            current_block = [res]
-        else:
-            last_res = current_block[-1]
-            # Check if this reservation is consecutive (same person, room, date, and hour is consecutive)
-            if (res['reserved_by'] == last_res['reserved_by'] and
-                res['room_id'] == last_res['room_id'] and
-                res['slot_date'] == last_res['slot_date'] and
-                res['slot_hour'] == last_res['slot_hour'] + 1):
-                current_block.append(res)
-            else:
-                # Save the current block and start a new one
-                grouped_reservations.append(current_block)
-                current_block = [res]
-    
-    # Don't forget the last block
-    if current_block:
-        grouped_reservations.append(current_block)
-    
-    # Get statistics
-    cur.execute("SELECT COUNT(*) as total FROM Reservations WHERE status = 'pending'")
-    pending_count = cur.fetchone()[0]
-    
-    cur.execute("SELECT COUNT(*) as total FROM Reservations WHERE status = 'approved'")
-    approved_count = cur.fetchone()[0]
-    
-    cur.execute("SELECT COUNT(*) as total FROM Buildings")
-    building_count = cur.fetchone()[0]
-    
-    cur.execute("SELECT COUNT(*) as total FROM Rooms")
-    room_count = cur.fetchone()[0]
+    stats = dict(cur.fetchone())
     
     cur.close()
-    conn.close()
-    
-    stats = {
-        'pending': pending_count,
-        'approved': approved_count,
-        'buildings': building_count,
-        'rooms': room_count
-    }
     
     return render_template('admin/dashboard.html', 
-                         reservation_blocks=grouped_reservations, 
-                         stats=stats)
+                         jobs=jobs.recent_jobs(conn),
+                         reservation_blocks=blocks, 
+                         stats=stats,
+                         page=page,
+                         page_count=max(-(-total_blocks // DASHBOARD_PAGE_SIZE), 1),
+                         total_blocks=total_blocks)
 
 @app.route('/admin/reservations')
 @admin_required
 def admin_reservations():
-    status_filter = request.args.get('status', 'all')
-    
-    conn = get_db_connection()
+    """Newest-first reservation list, one keyset page at a time.
+
+    Filters: status, building_id, room_id, start_date / end_date (slot date,
+    inclusive) and reserved_by (substring). ``cursor`` is the opaque
+    ``next_cursor`` of the previous page. JSON clients get the page rows, the
+    rendered table rows for appending, and the cursor for the next page.
+    """
+    args = request.args
+    status_filter = args.get('status', 'all')
+    filters = {
+        'building_id': args.get('building_id', ''),
+        'room_id': args.get('room_id', ''),
+        'start_date': args.get('start_date', ''),
+        'end_date': args.get('end_date', ''),
+        'reserved_by': args.get('reserved_by', '').strip(),
+    }
+
+    try:
+        building = int(filters['building_id']) if filters['building_id'] else None
+        room = int(filters['room_id']) if filters['room_id'] else None
+        for key in ('start_date', 'end_date'):
+            if filters[key]:
+                filters[key] = datetime.strptime(filters[key], '%Y-%m-%d').date().isoformat()
+        limit = min(int(args.get('limit') or ADMIN_PAGE_SIZE), MAX_ADMIN_PAGE_SIZE)
+        after = decode_cursor(args.get('cursor'))
+    except ValueError:
+        if wants_json():
+            return jsonify({"error": "Invalid filter or cursor"}), 400
+        flash('Invalid filter values were ignored', 'error')
+        return redirect(url_for('admin_reservations', status=status_filter))
+    if limit < 1:
+        limit = ADMIN_PAGE_SIZE
+
+    conn = get_db()
     cur = conn.cursor()
-    
-    if status_filter == 'all':
-        cur.execute("""
-            SELECT r.reservation_id, r.reserved_by, r.slot_date, r.slot_hour, r.reserved_at, r.status,
+
+    # Only the active filters go into the WHERE clause, so the planner can seek
+    # idx_reservations_reserved_at (or its per-status twin) straight to the cursor
+    # with the row-value comparison instead of scanning from the newest row
+    clauses, params = [], []
+    if status_filter != 'all':
+        clauses.append("r.status = ?")
+        params.append(status_filter)
+    if building is not None:
+        clauses.append("rm.building_id = ?")
+        params.append(building)
+    if room is not None:
+        clauses.append("r.room_id = ?")
+        params.append(room)
+    if filters['start_date']:
+        clauses.append("r.slot_date >= ?")
+        params.append(filters['start_date'])
+    if filters['end_date']:
+        clauses.append("r.slot_date <= ?")
+        params.append(filters['end_date'])
+    if filters['reserved_by']:
+        clauses.append("r.reserved_by LIKE '%' || ? || '%'")
+        params.append(filters['reserved_by'])
+    if after:
+        clauses.append("(r.reserved_at, r.reservation_id) < (?, ?)")
+        params.extend(after)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    def page(table):
+        return f"""
+            SELECT r.reservation_id, r.reserved_by, r.slot_date, r.slot_hour, r.end_hour, r.reserved_at, r.status,
                    rm.room_num, rm.capacity, rm.floor, b.name as building_name
-            FROM Reservations r
+            FROM {table} r
             JOIN Rooms rm ON r.room_id = rm.room_id
             JOIN Buildings b ON rm.building_id = b.building_id
-            ORDER BY r.reserved_at DESC
-        """)
+            {where}
+            ORDER BY r.reserved_at DESC, r.reservation_id DESC
+            LIMIT ?
+        """
+
+    if archive.reaches_archive(conn, filters['start_date'] or None):
+        # Each table walks its own keyset index to one page; the merge sorts at most two pages
+        cur.execute(f"""
+            SELECT * FROM ({page('Reservations')})
+            UNION ALL
+            SELECT * FROM ({page('ReservationsArchive')})
+            ORDER BY reserved_at DESC, reservation_id DESC
+            LIMIT ?
+        """, params + [limit + 1] + params + [limit + 1, limit + 1])
     else:
-        cur.execute("""
-            SELECT r.reservation_id, r.reserved_by, r.slot_date, r.slot_hour, r.reserved_at, r.status,
-                   rm.room_num, rm.capacity, rm.floor, b.name as building_name
-            FROM Reservations r
-            JOIN Rooms rm ON r.room_id = rm.room_id
-            JOIN Buildings b ON rm.building_id = b.building_id
-            WHERE r.status = ?
-            ORDER BY r.reserved_at DESC
-        """, (status_filter,))
-    
+        cur.execute(page('Reservations'), params + [limit + 1])
+
     reservations = [dict(row) for row in cur.fetchall()]
+    next_cursor = None
+    if len(reservations) > limit:
+        reservations = reservations[:limit]
+        last = reservations[-1]
+        next_cursor = encode_cursor(last['reserved_at'], last['reservation_id'])
+
+    if wants_json():
+        cur.close()
+        return jsonify({
+            "reservations": reservations,
+            "next_cursor": next_cursor,
+            "rows_html": render_template('admin/_reservation_rows.html', reservations=reservations),
+        })
+
     cur.close()
-    conn.close()
-    
+    snapshot = catalog.get_cache(app.config["DATABASE"]).get(conn)
+
     return render_template('admin/reservations.html', 
                          reservations=reservations, 
-                         status_filter=status_filter)
+                         status_filter=status_filter,
+                         filters=filters,
+                         active_filters={key: value for key, value in filters.items() if value},
+                         buildings=snapshot.buildings,
+                         rooms=snapshot.rooms,
+                         next_cursor=next_cursor)
 
 @app.route('/admin/approve/<int:reservation_id>', methods=['POST'])
 @admin_required
 def approve_reservation(reservation_id):
-    conn = get_db_connection()
+    conn = get_db()
     cur = conn.cursor()
     
-    cur.execute("UPDATE Reservations SET status = 'approved' WHERE reservation_id = ?", 
-                (reservation_id,))
-    conn.commit()
-    
-    cur.close()
-    conn.close()
+    # Only a pending request can be approved: a stale page may still show one
+    # that was rejected since, and its slot may have been booked again
+    try:
+        cur.execute("UPDATE Reservations SET status = 'approved' WHERE reservation_id = ? AND status = 'pending'", 
+                    (reservation_id,))
+        conn.commit()
+        updated = cur.rowcount
+    except sqlite3.IntegrityError:
+        conn.rollback()
+        flash('That time slot is already taken', 'error')
+        return redirect(request.referrer or url_for('admin_dashboard'))
+    finally:
+        cur.close()
+
+    if updated == 0:
+        flash('Reservation is no longer pending', 'error')
+        return redirect(request.referrer or url_for('admin_dashboard'))
+    reservations_changed(conn)
     
     flash('Reservation approved successfully')
     # Redirect back to the page the user came from (dashboard, reservations, or room schedule)
     return redirect(request.referrer or url_for('admin_dashboard'))
 
-@app.route('/admin/approve-block', methods=['POST'])
-@admin_required
-def approve_block():
+def block_ids():
+    """The comma-separated reservation_ids of a block form, or None when missing or invalid."""
     reservation_ids = request.form.get('reservation_ids', '')
     if not reservation_ids:
         flash('No reservations specified', 'error')
-        return redirect(request.referrer or url_for('admin_dashboard'))
-    
-    # Convert comma-separated string to list of integers
+        return None
     try:
-        ids = [int(rid) for rid in reservation_ids.split(',')]
+        return [int(rid) for rid in reservation_ids.split(',')]
     except ValueError:
         flash('Invalid reservation IDs', 'error')
+        return None
+
+@app.route('/admin/approve-block', methods=['POST'])
+@admin_required
+def approve_block():
+    ids = block_ids()
+    if ids is None:
         return redirect(request.referrer or url_for('admin_dashboard'))
-    
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
-    # Approve all reservations in the block
-    placeholders = ','.join('?' * len(ids))
-    cur.execute(f"UPDATE Reservations SET status = 'approved' WHERE reservation_id IN ({placeholders})", 
-                ids)
-    conn.commit()
-    
-    count = cur.rowcount
-    cur.close()
-    conn.close()
-    
-    flash(f'Successfully approved {count} reservation(s) in block')
+
+    if runs_async(len(ids)):
+        return queue_job('moderate', {"action": "approve", "filters": {"reservation_ids": ids}}, len(ids),
+                         f"Approving {len(ids)} reservations")
+
+    conn = get_db()
+    # The ids travel as one JSON parameter, so a block of any size is one statement
+    try:
+        result = booking.moderate(conn, 'approve', reservation_ids=ids)
+    except sqlite3.IntegrityError:
+        flash('One or more time slots are already taken', 'error')
+        return redirect(request.referrer or url_for('admin_dashboard'))
+    reservations_changed(conn)
+
+    flash(f"Successfully approved {result['updated']} reservation(s) in block")
     # Redirect back to the page the user came from
     return redirect(request.referrer or url_for('admin_dashboard'))
 
 @app.route('/admin/reject-block', methods=['POST'])
 @admin_required
 def reject_block():
-    reservation_ids = request.form.get('reservation_ids', '')
-    if not reservation_ids:
-        flash('No reservations specified', 'error')
+    ids = block_ids()
+    if ids is None:
         return redirect(request.referrer or url_for('admin_dashboard'))
-    
-    # Convert comma-separated string to list of integers
+
+    if runs_async(len(ids)):
+        return queue_job('moderate', {"action": "reject", "filters": {"reservation_ids": ids}}, len(ids),
+                         f"Rejecting {len(ids)} reservations")
+
+    conn = get_db()
+    result = booking.moderate(conn, 'reject', reservation_ids=ids)
+    reservations_changed(conn)
+
+    flash(f"Successfully rejected {result['updated']} reservation(s) in block")
+    # Redirect back to the page the user came from
+    return redirect(request.referrer or url_for('admin_dashboard'))
+
+@app.route('/admin/moderate', methods=['POST'])
+@admin_required
+def bulk_moderate():
+    """Approve or reject every pending reservation matching the posted filters.
+
+    Form (or JSON) fields: action ("approve" / "reject") and the
+    /admin/reservations filters building_id, room_id, reserved_by,
+    start_date and end_date. With no filters it applies to every pending
+    block on the dashboard. More than ASYNC_ROW_THRESHOLD matching rows go
+    to the job queue instead.
+    """
+    form = request.get_json(silent=True) or request.form
+    action = form.get('action')
     try:
-        ids = [int(rid) for rid in reservation_ids.split(',')]
-    except ValueError:
-        flash('Invalid reservation IDs', 'error')
+        if action not in ('approve', 'reject'):
+            raise ValueError(action)
+        building = int(form['building_id']) if form.get('building_id') else None
+        room = int(form['room_id']) if form.get('room_id') else None
+        dates = {key: datetime.strptime(form[key], '%Y-%m-%d').date().isoformat() if form.get(key) else None
+                 for key in ('start_date', 'end_date')}
+        reserved_by = form.get('reserved_by') or ''
+        if not isinstance(reserved_by, str):
+            raise TypeError(reserved_by)
+    except (TypeError, ValueError):
+        if wants_json():
+            return jsonify({"error": "Invalid action or filter"}), 400
+        flash('Invalid action or filter', 'error')
         return redirect(request.referrer or url_for('admin_dashboard'))
-    
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
-    # reject all reservations in the block
-    placeholders = ','.join('?' * len(ids))
-    cur.execute(f"UPDATE Reservations SET status = 'rejected' WHERE reservation_id IN ({placeholders})", 
-                ids)
-    conn.commit()
-    
-    count = cur.rowcount
-    cur.close()
-    conn.close()
-    
-    flash(f'Successfully rejected {count} reservation(s) in block')
-    # Redirect back to the page the user came from
+
+    filters = {"building_id": building, "room_id": room,
+               "reserved_by": reserved_by.strip() or None, **dates}
+    conn = get_db()
+    where, params = booking.pending_filter(**filters)
+    matching = conn.execute(f"SELECT COUNT(*) FROM Reservations WHERE {where}", params).fetchone()[0]
+    if runs_async(matching):
+        return queue_job('moderate', {"action": action, "filters": filters}, matching,
+                         f"{'Approving' if action == 'approve' else 'Rejecting'} {matching} pending reservations")
+
+    try:
+        result = booking.moderate(conn, action, **filters)
+    except sqlite3.IntegrityError:
+        if wants_json():
+            return jsonify({"error": "One or more time slots already reserved"}), 409
+        flash('One or more time slots are already taken', 'error')
+        return redirect(request.referrer or url_for('admin_dashboard'))
+    except sqlite3.OperationalError as e:
+        if not booking.is_busy(e):
+            raise
+        if wants_json():
+            return jsonify({"error": "The system is busy, please try again"}), 503
+        flash('The system is busy, please try again', 'error')
+        return redirect(request.referrer or url_for('admin_dashboard'))
+    reservations_changed(conn)
+
+    if wants_json():
+        return jsonify(result)
+    flash(f"{'Approved' if action == 'approve' else 'Rejected'} {result['updated']} pending reservation(s)")
     return redirect(request.referrer or url_for('admin_dashboard'))
 
 @app.route('/admin/reject/<int:reservation_id>', methods=['POST'])
 @admin_required
 def reject_reservation(reservation_id):
-    conn = get_db_connection()
+    conn = get_db()
     cur = conn.cursor()
     
-    cur.execute("UPDATE Reservations SET status = 'rejected' WHERE reservation_id = ?", 
+    cur.execute("UPDATE Reservations SET status = 'rejected' WHERE reservation_id = ? AND status = 'pending'", 
                 (reservation_id,))
     conn.commit()
-    
+    updated = cur.rowcount
     cur.close()
-    conn.close()
+
+    if updated == 0:
+        flash('Reservation is no longer pending', 'error')
+        return redirect(request.referrer or url_for('admin_dashboard'))
+    reservations_changed(conn)
     
     flash('Reservation rejected')
     # Redirect back to the page the user came from (dashboard, reservations, or room schedule)
@@ -519,16 +1083,21 @@ def reject_reservation(reservation_id):
 @app.route('/admin/cancel/<int:reservation_id>', methods=['POST'])
 @admin_required
 def cancel_reservation(reservation_id):
-    conn = get_db_connection()
+    conn = get_db()
     cur = conn.cursor()
     
-    # Delete the reservation to free up the time slot
-    cur.execute("DELETE FROM Reservations WHERE reservation_id = ?", 
+    # Only pending/approved rows hold a slot, so marking it cancelled frees it
+    cur.execute("UPDATE Reservations SET status = 'cancelled' "
+                "WHERE reservation_id = ? AND status IN ('pending', 'approved')", 
                 (reservation_id,))
     conn.commit()
-    
+    updated = cur.rowcount
     cur.close()
-    conn.close()
+
+    if updated == 0:
+        flash('Reservation is not active', 'error')
+        return redirect(request.referrer or url_for('admin_reservations'))
+    reservations_changed(conn)
     
     flash('Reservation released - time slot is now available')
     return redirect(request.referrer or url_for('admin_reservations'))
@@ -536,66 +1105,48 @@ def cancel_reservation(reservation_id):
 @app.route('/admin/buildings')
 @admin_required
 def admin_buildings():
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
-    cur.execute("""
-        SELECT b.*, COUNT(r.room_id) as room_count
-        FROM Buildings b
-        LEFT JOIN Rooms r ON b.building_id = r.building_id
-        GROUP BY b.building_id
-        ORDER BY b.name
-    """)
-    buildings = [dict(row) for row in cur.fetchall()]
-    
-    cur.close()
-    conn.close()
+    snapshot = catalog.get_cache(app.config["DATABASE"]).get(get_db())
+    room_counts = {}
+    for room in snapshot.rooms:
+        room_counts[room['building_id']] = room_counts.get(room['building_id'], 0) + 1
+    buildings = [{**building, 'room_count': room_counts.get(building['building_id'], 0)}
+                 for building in snapshot.buildings]
+
+    # The table only changes with the catalog, so it is rendered once per version
+    table = fragments.get_cache(app.config["DATABASE"]).render(
+        ('buildings_table', snapshot.version),
+        lambda: render_template('admin/_buildings_table.html', buildings=buildings))
     
-    return render_template('admin/buildings.html', buildings=buildings)
+    return render_template('admin/buildings.html', buildings=buildings, buildings_table=table)
 
 @app.route('/admin/rooms')
 @admin_required
 def admin_rooms():
     building_id = request.args.get('building_id')
     
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
+    snapshot = catalog.get_cache(app.config["DATABASE"]).get(get_db())
     if building_id:
-        cur.execute("""
-            SELECT r.*, b.name as building_name
-            FROM Rooms r
-            JOIN Buildings b ON r.building_id = b.building_id
-            WHERE r.building_id = ?
-            ORDER BY r.floor, r.room_num
-        """, (building_id,))
+        # Same order as before: floor, then room number within the building
+        rooms = sorted((room for room in snapshot.rooms if str(room['building_id']) == building_id),
+                       key=lambda room: (room['floor'], room['room_num']))
     else:
-        cur.execute("""
-            SELECT r.*, b.name as building_name
-            FROM Rooms r
-            JOIN Buildings b ON r.building_id = b.building_id
-            ORDER BY b.name, r.floor, r.room_num
-        """)
-    
-    rooms = [dict(row) for row in cur.fetchall()]
-    
-    # Get buildings for filter
-    cur.execute("SELECT building_id, name FROM Buildings ORDER BY name")
-    buildings = [dict(row) for row in cur.fetchall()]
-    
-    cur.close()
-    conn.close()
+        rooms = snapshot.rooms
+
+    table = fragments.get_cache(app.config["DATABASE"]).render(
+        ('rooms_table', building_id or None, snapshot.version),
+        lambda: render_template('admin/_rooms_table.html', rooms=rooms))
     
     return render_template('admin/rooms.html', 
                          rooms=rooms, 
-                         buildings=buildings, 
+                         rooms_table=table,
+                         buildings=snapshot.buildings, 
                          selected_building=building_id)
 
 
 @app.route('/admin/recurring', methods=['GET', 'POST'])
 @admin_required
 def admin_recurring():
-    conn = get_db_connection()
+    conn = get_db()
     cur = conn.cursor()
 
     if request.method == 'POST':
@@ -670,47 +1221,49 @@ def admin_recurring():
             if building_id and str(room_record['building_id']) != building_id:
                 raise ValueError('Selected room does not belong to the chosen building.')
 
-            total_inserted = 0
-            conflicts = []
-
-            for week_index in range(weeks):
-                slot_date = aligned_start + timedelta(weeks=week_index)
-
-                for hour in range(start_hour, end_hour):
-                    try:
-                        cur.execute(
-                            """
-                            INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status)
-                            VALUES (?, ?, ?, ?, ?)
-                            """,
-                            (room_id, reserved_by, slot_date.isoformat(), hour, status)
-                        )
-                        total_inserted += 1
-                    except sqlite3.IntegrityError:
-                        conflicts.append((slot_date, hour))
+            dates = booking.series_dates(aligned_start, weeks)
+            rows = len(dates) * (end_hour - start_hour)
+            if runs_async(rows):
+                return queue_job('create_series', {
+                    "room_id": room_id, "reserved_by": reserved_by, "dates": [d.isoformat() for d in dates],
+                    "start_hour": start_hour, "end_hour": end_hour, "status": status,
+                    "interval": app.config["RESERVATION_STORAGE"] == "interval",
+                }, rows, f"Adding {rows} slot(s) for {reserved_by}")
+
+            # Conflict check and bulk insert run as one transaction (see booking.create_series)
+            report = booking.create_series(
+                conn, room_id, reserved_by, dates,
+                start_hour, end_hour, status,
+                interval=app.config["RESERVATION_STORAGE"] == "interval"
+            )
+            reservations_changed(conn)
 
-            conn.commit()
+            if wants_json():
+                return jsonify({**report, "first_date": aligned_start.isoformat()})
 
+            conflicts = report['conflicts']
             if conflicts:
-                unique_conflicts = sorted({(d.isoformat(), h) for d, h in conflicts})
-                conflict_summary = ', '.join(f"{d} {hour_to_12hr(h)}" for d, h in unique_conflicts[:5])
-                more_conflicts = len(unique_conflicts) - 5
+                conflict_summary = ', '.join(f"{c['slot_date']} {hour_to_12hr(c['slot_hour'])}" for c in conflicts[:5])
+                more_conflicts = len(conflicts) - 5
                 if more_conflicts > 0:
                     conflict_summary += f" … (+{more_conflicts} more)"
-                flash(f"Added {total_inserted} slot(s). Skipped {len(conflicts)} conflict(s): {conflict_summary}.")
+                flash(f"Added {report['inserted']} slot(s). Skipped {len(conflicts)} conflict(s): {conflict_summary}.")
             else:
-                flash(f"Added {total_inserted} slot(s) for {reserved_by} starting {aligned_start}.")
+                flash(f"Added {report['inserted']} slot(s) for {reserved_by} starting {aligned_start}.")
 
         except ValueError as exc:
             error = str(exc)
+            error_status = 400
         except Exception as exc:
             error = f"Unable to create recurring series: {exc}"
+            error_status = 500
 
         if error:
             conn.rollback()
+            if wants_json():
+                return jsonify({"error": error}), error_status
             flash(error)
 
-        conn.close()
         return redirect(url_for('admin_recurring'))
 
     # Data for form selections
@@ -727,47 +1280,41 @@ def admin_recurring():
     )
     rooms = [dict(row) for row in cur.fetchall()]
 
+    # Series are first-class rows; slot counts come from idx_reservations_series
     cur.execute(
         """
-        SELECT 
-            Reservations.reserved_by,
-            Reservations.room_id,
+        SELECT
+            s.series_id,
+            s.reserved_by,
+            s.room_id,
             Rooms.room_num,
             Buildings.name AS building_name,
-            MIN(Reservations.slot_date) AS first_date,
-            MAX(Reservations.slot_date) AS last_date,
-            COUNT(*) AS total_slots,
-            MIN(Reservations.slot_hour) AS start_hour,
-            MAX(Reservations.slot_hour) AS end_hour,
-            CAST(strftime('%w', Reservations.slot_date) AS INTEGER) AS sql_weekday,
-            MIN(Reservations.status) AS status
-        FROM Reservations
-        JOIN Rooms ON Rooms.room_id = Reservations.room_id
+            s.weekday,
+            s.start_hour,
+            s.end_hour,
+            s.status,
+            s.end_date AS last_date,
+            (SELECT MIN(r.slot_date) FROM Reservations r
+             WHERE r.series_id = s.series_id AND r.slot_date >= date('now')) AS first_date,
+            (SELECT SUM(r.end_hour - r.slot_hour) FROM Reservations r
+             WHERE r.series_id = s.series_id AND r.slot_date >= date('now')) AS total_slots
+        FROM RecurringSeries s
+        JOIN Rooms ON Rooms.room_id = s.room_id
         JOIN Buildings ON Buildings.building_id = Rooms.building_id
-        WHERE Reservations.slot_date >= date('now')
-          AND (Reservations.reserved_by LIKE 'Weekly:%' OR Reservations.reserved_by LIKE 'Recurring:%')
-        GROUP BY Reservations.reserved_by, Reservations.room_id, sql_weekday, Reservations.status
-        HAVING COUNT(*) >= 1
-        ORDER BY Reservations.reserved_by, sql_weekday, Rooms.room_num
+        WHERE s.end_date >= date('now')
+        ORDER BY s.reserved_by, s.weekday, Rooms.room_num
         """
     )
 
     recurring_series = []
     for row in cur.fetchall():
         series = dict(row)
-        weekday_index = series.get('sql_weekday')
-        if weekday_index is not None and 0 <= weekday_index < len(SQL_WEEKDAY_NAMES):
-            series['weekday_name'] = SQL_WEEKDAY_NAMES[weekday_index]
-        else:
-            series['weekday_name'] = 'Unknown'
-        if series.get('end_hour') is not None:
-            series['display_end_hour'] = series['end_hour'] + 1
-        else:
-            series['display_end_hour'] = None
+        if not series['total_slots']:
+            continue
+        series['weekday_name'] = WEEKDAY_NAMES[series['weekday']]
+        series['display_end_hour'] = series['end_hour']
         recurring_series.append(series)
 
-    conn.close()
-
     hour_choices = list(range(7, 20))
     end_hour_choices = list(range(8, 21))
     default_start_date = align_to_weekday(date.today(), 0).isoformat()
@@ -787,66 +1334,52 @@ def admin_recurring():
 @app.route('/admin/recurring/delete', methods=['POST'])
 @admin_required
 def delete_recurring():
-    reserved_by = request.form.get('reserved_by')
-    room_id = request.form.get('room_id')
-    sql_weekday = request.form.get('weekday')
+    series_id = request.form.get('series_id')
     from_date = request.form.get('from_date') or date.today().isoformat()
-    status = request.form.get('status')
-
-    if not (reserved_by and room_id and sql_weekday is not None):
-        flash('Missing series information for removal.')
-        return redirect(url_for('admin_recurring'))
 
     try:
-        room_id = int(room_id)
-        sql_weekday = int(sql_weekday)
-    except ValueError:
+        series_id = int(series_id)
+        from_date = datetime.strptime(from_date, '%Y-%m-%d').date().isoformat()
+    except (TypeError, ValueError):
         flash('Invalid series identifiers.')
         return redirect(url_for('admin_recurring'))
 
-    conn = get_db_connection()
+    conn = get_db()
     cur = conn.cursor()
 
-    try:
-        params = [reserved_by, room_id, sql_weekday, from_date]
-        status_clause = ''
-        if status:
-            status_clause = ' AND status = ?'
-            params.append(status)
-
-        cur.execute(
-            f"""
-            DELETE FROM Reservations
-            WHERE reserved_by = ?
-              AND room_id = ?
-              AND CAST(strftime('%w', slot_date) AS INTEGER) = ?
-              AND slot_date >= ?
-              {status_clause}
-            """,
-            params
-        )
+    cur.execute(
+        "SELECT reserved_by, weekday FROM RecurringSeries WHERE series_id = ?", (series_id,)
+    )
+    series = cur.fetchone()
+    if not series:
+        flash('No matching recurring slots found to remove.')
+        return redirect(url_for('admin_recurring'))
 
-        deleted_count = cur.rowcount
-        conn.commit()
+    slots = cur.execute("SELECT COUNT(*) FROM Reservations WHERE series_id = ? AND slot_date >= ?",
+                        (series_id, from_date)).fetchone()[0]
+    if runs_async(slots):
+        return queue_job('delete_series', {"series_id": series_id, "from_date": from_date}, slots,
+                         f"Removing {slots} slot(s) for {series['reserved_by']}")
+
+    try:
+        deleted_count = booking.delete_series(conn, series_id, from_date)
+        reservations_changed(conn)
 
-        weekday_label = SQL_WEEKDAY_NAMES[sql_weekday] if 0 <= sql_weekday < len(SQL_WEEKDAY_NAMES) else 'selected day'
+        weekday_label = WEEKDAY_NAMES[series['weekday']]
         if deleted_count:
-            flash(f"Removed {deleted_count} slot(s) for {reserved_by} on {weekday_label} starting {from_date}.")
+            flash(f"Removed {deleted_count} slot(s) for {series['reserved_by']} on {weekday_label} starting {from_date}.")
         else:
             flash('No matching recurring slots found to remove.')
 
     except Exception as exc:
-        conn.rollback()
         flash(f'Unable to remove recurring series: {exc}')
-    finally:
-        conn.close()
 
     return redirect(url_for('admin_recurring'))
 
 @app.route('/admin/room/<int:room_id>/schedule')
 @admin_required
 def room_schedule(room_id):
-    conn = get_db_connection()
+    conn = get_db()
     cur = conn.cursor()
     
     # Get room details
@@ -868,51 +1401,233 @@ def room_schedule(room_id):
     today = date.today()
     end_date = today + timedelta(weeks=3)
     
-    # Get all reservations for this room in the next 3 weeks (excluding rejected)
-    cur.execute("""
-        SELECT reservation_id, reserved_by, slot_date, slot_hour, reserved_at, status
-        FROM Reservations
-        WHERE room_id = ?
-          AND slot_date >= ?
-          AND slot_date <= ?
-          AND status != 'rejected'
-        ORDER BY slot_date, slot_hour
-    """, (room_id, today, end_date))
-    
-    reservations = [dict(row) for row in cur.fetchall()]
-    
-    cur.close()
-    conn.close()
-    
-    # Group reservations by date
-    from collections import defaultdict
-    reservations_by_date_dict = defaultdict(list)
-    
-    for res in reservations:
-        reservations_by_date_dict[res['slot_date']].append(res)
-    
-    # Create a list of all dates in the range with their reservations
+    # Each day's table is cached against the newest change-log entry for its
+    # (room, date) cell; only the days that changed are queried and re-rendered
+    stamp, versions = fragments.cell_versions(conn, room_id, today.isoformat(), end_date.isoformat())
+    cache = fragments.get_cache(app.config["DATABASE"])
+
     reservations_by_date = []
     current_date = today
     while current_date <= end_date:
         # Only include weekdays (Monday=0 to Friday=4)
         if current_date.weekday() < 5:
             date_str = current_date.strftime('%Y-%m-%d')
+            key = ('schedule_day', room_id, date_str, stamp, versions.get(date_str))
             reservations_by_date.append({
                 'date': date_str,
                 'date_formatted': current_date.strftime('%B %d, %Y'),
                 'day_name': current_date.strftime('%A'),
-                'reservations': reservations_by_date_dict.get(date_str, [])
+                'key': key,
+                'table': cache.get(key),
             })
         current_date += timedelta(days=1)
+
+    # Get this room's active reservations for the days not already cached
+    missing = [date_info for date_info in reservations_by_date if date_info['table'] is None]
+    if missing:
+        by_date = {date_info['date']: [] for date_info in missing}
+        cur.execute("""
+            SELECT reservation_id, reserved_by, slot_date, slot_hour, end_hour, reserved_at, status
+            FROM Reservations
+            WHERE room_id = ?
+              AND slot_date >= ?
+              AND slot_date <= ?
+              AND status IN ('pending', 'approved')
+            ORDER BY slot_date, slot_hour
+        """, (room_id, missing[0]['date'], missing[-1]['date']))
+        for row in cur.fetchall():
+            if row['slot_date'] in by_date:
+                by_date[row['slot_date']].append(dict(row))
+        for date_info in missing:
+            date_info['reservations'] = by_date[date_info['date']]
+            date_info['table'] = cache.put(date_info['key'], render_template(
+                'admin/_schedule_day.html', date_info=date_info))
+    
+    cur.close()
     
     return render_template('admin/room_schedule.html',
                          room=room,
                          reservations_by_date=reservations_by_date)
 
-# Initialize database when module is loaded (not just when running directly)
-# This ensures database is created when Gunicorn imports the module
-init_db()
+@app.route('/admin/schedule')
+@admin_required
+def admin_schedule():
+    """Client-side room x date x hour grid fed by /admin/api/schedule."""
+    snapshot = catalog.get_cache(app.config["DATABASE"]).get(get_db())
+    today = date.today()
+    return render_template('admin/schedule.html',
+                         buildings=snapshot.buildings,
+                         default_start=today.isoformat(),
+                         default_end=(today + timedelta(weeks=3)).isoformat())
+
+@app.route('/admin/api/schedule')
+@admin_required
+def admin_api_schedule():
+    """Dense room x date x hour grid, streamed so memory stays flat for large ranges.
+
+    Query parameters: start_date, end_date (inclusive, default today + 3 weeks),
+    optional building_id or room_id, include_rejected, and format: ``ndjson``
+    (default; a ``grid`` header line, then a ``room`` line followed by one
+    ``day`` line per date for each room) or ``json`` (one document, sent in
+    chunks of one room). Each day carries 13 cells for 07:00-19:00, null when
+    free or ``[reservation_id, status, reserved_by]``.
+    """
+    args = request.args
+    try:
+        start_date = datetime.strptime(args['start_date'], '%Y-%m-%d').date() if args.get('start_date') else date.today()
+        end_date = datetime.strptime(args['end_date'], '%Y-%m-%d').date() if args.get('end_date') else start_date + timedelta(weeks=3)
+        building = int(args['building_id']) if args.get('building_id') else None
+        room_id = int(args['room_id']) if args.get('room_id') else None
+    except ValueError:
+        return jsonify({"error": "Invalid date or filter format"}), 400
+    if end_date < start_date:
+        return jsonify({"error": "End date must not be before start date"}), 400
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        return jsonify({"error": f"Date range is limited to {MAX_RANGE_DAYS} days"}), 400
+    output = args.get('format', 'ndjson')
+    if output not in ('ndjson', 'json'):
+        return jsonify({"error": "Format must be ndjson or json"}), 400
+    statuses = ('pending', 'approved', 'rejected') if args.get('include_rejected', '').lower() in ('1', 'true') \
+        else ('pending', 'approved')
+
+    snapshot = catalog.get_cache(app.config["DATABASE"]).get(get_db())
+    rooms = [room for room in snapshot.rooms
+             if (building is None or room['building_id'] == building)
+             and (room_id is None or room['room_id'] == room_id)]
+
+    dates = []
+    current_date = start_date
+    while current_date <= end_date:
+        if current_date.weekday() < 5:
+            dates.append(current_date.isoformat())
+        current_date += timedelta(days=1)
+
+    hours = list(range(availability.FIRST_HOUR, availability.LAST_HOUR + 1))
+    header = {"start_date": start_date.isoformat(), "end_date": end_date.isoformat(),
+              "dates": dates, "hours": hours, "room_count": len(rooms)}
+    database = app.config["DATABASE"]
+    # Windows that reach back past the newest archived date read both tables
+    source = "Reservations"
+    if archive.reaches_archive(get_db(), start_date.isoformat()):
+        columns = "room_id, slot_date, slot_hour, end_hour, reservation_id, status, reserved_by"
+        source = f"(SELECT {columns} FROM Reservations UNION ALL SELECT {columns} FROM ReservationsArchive)"
+
+    def grid():
+        """Yield (room, [(date, cells), ...]) merging one ordered cursor into the dense grid."""
+        pool = db.get_pool(database)
+        conn = pool.acquire()
+        try:
+            placeholders = ','.join('?' * len(statuses))
+            # Same order as the catalog snapshot so rows can be merged as they stream
+            cur = conn.execute(f"""
+                SELECT r.room_id, r.slot_date, r.slot_hour, r.end_hour, r.reservation_id, r.status, r.reserved_by
+                FROM   {source} r
+                JOIN   Rooms rm ON rm.room_id = r.room_id
+                JOIN   Buildings b ON b.building_id = rm.building_id
+                WHERE  r.slot_date BETWEEN ? AND ?
+                  AND  r.status IN ({placeholders})
+                  AND  (? IS NULL OR rm.building_id = ?)
+                  AND  (? IS NULL OR r.room_id = ?)
+                ORDER  BY b.name, rm.floor, rm.room_num, rm.room_id, r.slot_date, r.slot_hour
+            """, (start_date.isoformat(), end_date.isoformat(), *statuses, building, building, room_id, room_id))
+            # Rows for rooms outside the snapshot (added since it was taken) are skipped
+            positions = {room['room_id']: position for position, room in enumerate(rooms)}
+            pending = cur.fetchone()
+            for position, room in enumerate(rooms):
+                days = {slot_date: [None] * len(hours) for slot_date in dates}
+                while pending is not None and positions.get(pending['room_id'], -1) <= position:
+                    cells = days.get(pending['slot_date'])
+                    if cells is not None and pending['room_id'] == room['room_id']:
+                        cell = [pending['reservation_id'], pending['status'], pending['reserved_by']]
+                        for hour in range(pending['slot_hour'], pending['end_hour']):
+                            # A rejected row may share hours with the booking that replaced it
+                            held = cells[hour - availability.FIRST_HOUR]
+                            if held is None or held[1] == 'rejected':
+                                cells[hour - availability.FIRST_HOUR] = cell
+                    pending = cur.fetchone()
+                yield room, days
+            cur.close()
+        finally:
+            pool.release(conn)
+
+    def ndjson():
+        yield json.dumps({"type": "grid", **header}) + "\n"
+        for room, days in grid():
+            yield json.dumps({"type": "room", **room}) + "\n"
+            for slot_date, cells in days.items():
+                yield json.dumps({"type": "day", "room_id": room['room_id'], "date": slot_date,
+                                  "cells": cells}) + "\n"
+
+    def chunked_json():
+        yield json.dumps(header)[:-1] + ', "rooms": ['
+        for position, (room, days) in enumerate(grid()):
+            room = {**room, "days": [{"date": slot_date, "cells": cells} for slot_date, cells in days.items()]}
+            yield (", " if position else "") + json.dumps(room)
+        yield "]}"
+
+    if output == 'json':
+        return app.response_class(stream_with_context(chunked_json()), mimetype='application/json')
+    return app.response_class(stream_with_context(ndjson()), mimetype='application/x-ndjson')
+
+@app.route('/admin/jobs')
+@admin_required
+def job_list():
+    """Active and recently finished background jobs, newest first."""
+    try:
+        limit = int(request.args.get('limit') or 10)
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    if limit < 1:
+        return jsonify({"error": "Limit must be at least 1"}), 400
+    return jsonify({"jobs": jobs.recent_jobs(get_db(), limit=min(limit, 100))})
+
+@app.route('/admin/jobs/<int:job_id>')
+@admin_required
+def job_status(job_id):
+    """Status, progress and (once done) the report of one background job."""
+    job = jobs.get_job(get_db(), job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+@app.route('/admin/db-stats')
+@admin_required
+def db_stats():
+    """Connection pool, cache and compaction counters for this worker process."""
+    return jsonify({
+        "pool": db.get_pool(app.config["DATABASE"]).stats(),
+        "availability_index": availability.get_index(app.config["DATABASE"]).stats(),
+        "catalog_cache": catalog.get_cache(app.config["DATABASE"]).stats(),
+        "fragment_cache": fragments.get_cache(app.config["DATABASE"]).stats(),
+        "compaction": archive.get_compactor(app.config["DATABASE"]).stats(),
+        "jobs": jobs.get_runner(app.config["DATABASE"]).stats(),
+    })
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text metrics for this worker process (admin session or METRICS_TOKEN bearer)."""
+    token = app.config["METRICS_TOKEN"]
+    authorized = session.get('is_admin') or (
+        token and request.headers.get("Authorization") == f"Bearer {token}"
+    )
+    if not authorized:
+        return "Unauthorized\n", 401, {"Content-Type": "text/plain; charset=utf-8"}
+    database = app.config["DATABASE"]
+    body = metrics.registry.render({
+        "db_pool": db.get_pool(database).stats(),
+        "availability_index": availability.get_index(database).stats(),
+        "catalog_cache": catalog.get_cache(database).stats(),
+        "fragment_cache": fragments.get_cache(database).stats(),
+        "compaction": archive.get_compactor(database).stats(),
+        "jobs": jobs.get_runner(database).stats(),
+    })
+    return body, 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+# Bring the database schema up to date when the module is loaded (not just when
+# running directly) so every Gunicorn worker starts against a current schema.
+# Existing data is kept; set AUTO_MIGRATE=false to run `flask db upgrade` by hand.
+if os.environ.get('AUTO_MIGRATE', 'true').lower() == 'true':
+    migrate.upgrade(app.config["DATABASE"])
 
 if __name__ == '__main__':
     # This block is for local development only
@@ -0,0 +1,201 @@
+"""
+Reservation compaction for the Building Reservation System.
+
+The booking path only reads today onwards, yet every date-range scan and
+index seek pays for the whole history. Compaction keeps ``Reservations``
+bounded to the active schedule by moving rows into ``ReservationsArchive``
+in short batched transactions:
+
+* every reservation dated more than ``ARCHIVE_AFTER_DAYS`` ago, and
+* rejected and cancelled rows, which no longer hold a slot (see
+  migrations/0009_partial_unique_slots.py), once their date is
+  ``ARCHIVE_REJECTED_DAYS`` in the past.
+
+Admin history reads call ``reaches_archive`` and UNION ALL the archive only
+when their date filter goes back past the newest archived date.
+
+Each worker runs a daemon thread that wakes every ``COMPACTION_INTERVAL``
+seconds. The workers share one ``compaction`` timestamp in ``DataVersion``,
+claimed under the write lock, so only one of them compacts per interval.
+``flask db compact`` runs the same pass by hand.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import date, timedelta
+
+import booking
+import db
+
+logger = logging.getLogger("scheduler.archive")
+
+# Reservations of any status whose date is this many days past are archived (0 = keep them live)
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", 90))
+# Rejected / cancelled rows whose date is this many days past are archived
+ARCHIVE_REJECTED_DAYS = int(os.environ.get("ARCHIVE_REJECTED_DAYS", 30))
+# Rows moved per transaction, so the write lock is never held for long
+ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", 2000))
+
+COLUMNS = "reservation_id, room_id, reserved_by, reserved_at, status, slot_date, slot_hour, end_hour, series_id"
+
+
+def archive_rows(conn, where, params=(), batch_size=ARCHIVE_BATCH_SIZE):
+    """Move every Reservations row matching ``where`` into the archive; return the count.
+
+    Each batch selects up to ``batch_size`` ids and copies then deletes them
+    inside one ``BEGIN IMMEDIATE`` transaction.
+    """
+    moved = 0
+    while True:
+        booking.begin_immediate(conn)
+        try:
+            ids = [row[0] for row in conn.execute(
+                f"SELECT reservation_id FROM Reservations WHERE {where} LIMIT ?", (*params, batch_size))]
+            if ids:
+                batch = json.dumps(ids)
+                conn.execute(f"""
+                    INSERT OR REPLACE INTO ReservationsArchive ({COLUMNS})
+                    SELECT {COLUMNS} FROM Reservations
+                    WHERE  reservation_id IN (SELECT value FROM json_each(?))
+                """, (batch,))
+                conn.execute("DELETE FROM Reservations WHERE reservation_id IN (SELECT value FROM json_each(?))",
+                             (batch,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        moved += len(ids)
+        if len(ids) < batch_size:
+            return moved
+
+
+def compact(conn, today=None, after_days=ARCHIVE_AFTER_DAYS, rejected_days=ARCHIVE_REJECTED_DAYS,
+            batch_size=ARCHIVE_BATCH_SIZE):
+    """Archive everything dated ``after_days`` ago and inactive rows dated ``rejected_days`` ago."""
+    today = today or date.today()
+    started = time.perf_counter()
+    report = {"past": 0, "inactive": 0, "horizon": None,
+              "cutoff": (today - timedelta(days=rejected_days)).isoformat()}
+    if after_days > 0:
+        report["horizon"] = (today - timedelta(days=after_days)).isoformat()
+        report["past"] = archive_rows(conn, "slot_date < ?", (report["horizon"],), batch_size)
+    report["inactive"] = archive_rows(conn, "status IN ('rejected', 'cancelled') AND slot_date < ?",
+                                      (report["cutoff"],), batch_size)
+    report["archived"] = report["past"] + report["inactive"]
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def archived_through(conn):
+    """The newest slot_date in the archive, or None while it is empty."""
+    return conn.execute("SELECT MAX(slot_date) FROM ReservationsArchive").fetchone()[0]
+
+
+def reaches_archive(conn, first_date):
+    """True when a read from ``first_date`` (ISO date, None = unbounded) must include the archive."""
+    newest = archived_through(conn)
+    return newest is not None and (first_date is None or first_date <= newest)
+
+
+def claim(conn, interval, now=None):
+    """Take this interval's compaction turn; False when another worker already has it."""
+    now = int(time.time() if now is None else now)
+    booking.begin_immediate(conn)
+    try:
+        row = conn.execute("SELECT version FROM DataVersion WHERE name = 'compaction'").fetchone()
+        if row is not None and now - row[0] < interval:
+            conn.rollback()
+            return False
+        conn.execute("""
+            INSERT INTO DataVersion (name, version) VALUES ('compaction', ?)
+            ON CONFLICT (name) DO UPDATE SET version = excluded.version
+        """, (now,))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return True
+
+
+class Compactor:
+    """Per-process background thread that runs ``compact`` once per interval across workers."""
+
+    def __init__(self, database):
+        self.database = database
+        self._lock = threading.Lock()
+        self._pid = None
+        self._thread = None
+        self.interval = None
+        self.runs = 0
+        self.archived = 0
+        self.last_run = None
+        self.errors = 0
+
+    def ensure_started(self, interval):
+        """Start the thread in this process if it is not running yet."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            # Threads do not survive a fork, so every worker starts its own
+            if self._pid != os.getpid():
+                self.interval = interval
+                self._thread = threading.Thread(target=self._loop, name="compactor", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def run_once(self):
+        """Compact now if this worker wins the interval's claim; return the report or None."""
+        conn = db.connect(self.database)
+        try:
+            if not claim(conn, self.interval):
+                return None
+            report = compact(conn)
+        finally:
+            conn.close()
+        with self._lock:
+            self.runs += 1
+            self.archived += report["archived"]
+            self.last_run = time.time()
+        if report["archived"]:
+            logger.info("Archived %d past and %d rejected/cancelled reservations in %.1fs",
+                        report["past"], report["inactive"], report["seconds"])
+        return report
+
+    def _loop(self):
+        while True:
+            # Jitter keeps workers started together from all waking at once
+            time.sleep(self.interval * random.uniform(0.5, 1.0))
+            try:
+                self.run_once()
+            except Exception:
+                self.errors += 1
+                logger.exception("Reservation compaction failed")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "running": self._pid == os.getpid(),
+                "interval_seconds": self.interval,
+                "runs": self.runs,
+                "archived": self.archived,
+                "errors": self.errors,
+                "last_run": self.last_run,
+            }
+
+
+_compactors = {}
+_compactors_lock = threading.Lock()
+
+
+def get_compactor(database):
+    """Return the process-wide compactor for ``database``."""
+    with _compactors_lock:
+        compactor = _compactors.get(database)
+        if compactor is None:
+            compactor = Compactor(database)
+            _compactors[database] = compactor
+        return compactor
@@ -0,0 +1,404 @@
+"""
+In-memory room availability index for the Building Reservation System.
+
+Bookable slots are the fixed hourly cells 07:00-20:00, so a room's day fits
+in a 13-bit mask. The index keeps those masks transposed: for every loaded
+date it holds one bitset per hour whose bit ``p`` is set when the room at
+position ``p`` is booked. "Which rooms are free for every hour in
+[start, end)" is then an OR of a few big integers followed by an AND with
+the candidate rooms, instead of a NOT IN subquery per request.
+
+Dates are loaded lazily with one indexed query and kept in an LRU. Every
+worker stays coherent through the ``ReservationChanges`` log and the
+``catalog`` entry in ``DataVersion`` that the schema triggers maintain
+(see migrations/0002_availability_tracking.sql).
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from itertools import islice
+
+FIRST_HOUR = 7
+LAST_HOUR = 19  # last bookable slot starts at 19:00 and ends at 20:00
+SLOT_COUNT = LAST_HOUR - FIRST_HOUR + 1
+
+# Reloading single cells is cheaper than dropping a date until a write touches this many
+MAX_CELL_RELOADS = 256
+# Keep at most this many change-log rows once every worker has had a chance to read them
+CHANGE_LOG_KEEP = 10000
+# How many new change-log rows a worker lets accumulate before it prunes
+PRUNE_EVERY = 1000
+# Up to this many candidate rooms, next_free_slots seeks each room's rows
+# instead of walking every room's rows in date order
+ROOM_LIST_MAX = 64
+
+
+def hour_mask(start_hour, end_hour):
+    """13-bit mask covering slots start_hour .. end_hour - 1."""
+    return ((1 << (end_hour - start_hour)) - 1) << (start_hour - FIRST_HOUR)
+
+
+def _positions(bits):
+    """Yield the positions of the set bits in ``bits``, lowest first."""
+    text = bin(bits)[:1:-1]
+    index = text.find("1")
+    while index != -1:
+        yield index
+        index = text.find("1", index + 1)
+
+
+def _bitset(flags):
+    """Pack a bytearray of 0/1 flags (position 0 first) into an int."""
+    if not any(flags):
+        return 0
+    return int(bytes(flags[::-1]).translate(_FLAG_DIGITS), 2)
+
+
+_FLAG_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+
+
+class _DaySlots:
+    """Room bitsets for one date: ``approved[h]`` and ``held[h]`` per slot."""
+
+    __slots__ = ("approved", "held")
+
+    def __init__(self, approved, held):
+        self.approved = approved
+        self.held = held
+
+
+class AvailabilityIndex:
+    """Per-process bitmap index over the Rooms catalog and its reservations."""
+
+    def __init__(self, max_dates=400):
+        self.max_dates = max_dates
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+        self._clear()
+
+    def _clear(self):
+        self.rooms = []            # room dicts in display order
+        self.positions = {}        # room_id -> position in self.rooms
+        self._all = 0              # bitset of every room
+        self._by_building = {}     # building_id -> bitset
+        self._by_floor = {}        # floor -> bitset
+        self._by_capacity = {}     # capacity -> bitset, iterated smallest first for best fit
+        self._accessible = 0       # bitset of ADA-compliant rooms
+        self._step_free = 0        # bitset of rooms in step-free buildings
+        self._days = OrderedDict()  # slot_date -> _DaySlots (LRU order)
+        self.catalog_version = None
+        self.last_change_id = None
+        self.last_pruned_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- loading ----------
+
+    def _load_catalog(self, conn, catalog_version):
+        cur = conn.execute("""
+            SELECT r.room_id, r.room_num, r.capacity, r.floor, b.name AS building_name, b.building_id,
+                   r.is_aca_compliant, b.is_no_stair
+            FROM   Rooms r
+            JOIN   Buildings b ON b.building_id = r.building_id
+            ORDER  BY b.name, r.floor, r.room_num
+        """)
+        self.rooms = [dict(row) for row in cur.fetchall()]
+        self.positions = {room["room_id"]: pos for pos, room in enumerate(self.rooms)}
+        self._all = (1 << len(self.rooms)) - 1
+        self._by_building = {}
+        self._by_floor = {}
+        by_capacity = {}
+        self._accessible = 0
+        self._step_free = 0
+        for pos, room in enumerate(self.rooms):
+            bit = 1 << pos
+            self._by_building[room["building_id"]] = self._by_building.get(room["building_id"], 0) | bit
+            self._by_floor[room["floor"]] = self._by_floor.get(room["floor"], 0) | bit
+            by_capacity[room["capacity"]] = by_capacity.get(room["capacity"], 0) | bit
+            if room["is_aca_compliant"]:
+                self._accessible |= bit
+            if room["is_no_stair"]:
+                self._step_free |= bit
+        self._by_capacity = dict(sorted(by_capacity.items()))
+        self._days.clear()
+        self.catalog_version = catalog_version
+
+    def _load_day(self, conn, slot_date):
+        size = len(self.rooms)
+        approved = [bytearray(size) for _ in range(SLOT_COUNT)]
+        held = [bytearray(size) for _ in range(SLOT_COUNT)]
+        cur = conn.execute("""
+            SELECT room_id, slot_hour, end_hour, status
+            FROM   Reservations
+            WHERE  slot_date = ?
+              AND  status IN ('pending', 'approved')
+        """, (slot_date,))
+        for room_id, slot_hour, end_hour, status in cur:
+            pos = self.positions.get(room_id)
+            if pos is None:
+                continue
+            for hour in range(slot_hour, end_hour):
+                held[hour - FIRST_HOUR][pos] = 1
+                if status == "approved":
+                    approved[hour - FIRST_HOUR][pos] = 1
+        day = _DaySlots([_bitset(a) for a in approved], [_bitset(h) for h in held])
+        self._days[slot_date] = day
+        while len(self._days) > self.max_dates:
+            self._days.popitem(last=False)
+        return day
+
+    def _reload_cell(self, conn, room_id, slot_date):
+        day = self._days.get(slot_date)
+        pos = self.positions.get(room_id)
+        if day is None or pos is None:
+            return
+        bit = 1 << pos
+        for i in range(SLOT_COUNT):
+            day.approved[i] &= ~bit
+            day.held[i] &= ~bit
+        cur = conn.execute("""
+            SELECT slot_hour, end_hour, status
+            FROM   Reservations
+            WHERE  room_id = ?
+              AND  slot_date = ?
+              AND  status IN ('pending', 'approved')
+        """, (room_id, slot_date))
+        for slot_hour, end_hour, status in cur:
+            for hour in range(slot_hour, end_hour):
+                day.held[hour - FIRST_HOUR] |= bit
+                if status == "approved":
+                    day.approved[hour - FIRST_HOUR] |= bit
+
+    def sync(self, conn):
+        """Apply catalog and reservation changes committed since the last sync."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._clear()
+
+            row = conn.execute("SELECT version FROM DataVersion WHERE name = 'catalog'").fetchone()
+            catalog_version = row[0] if row else 0
+            if catalog_version != self.catalog_version:
+                self.last_change_id = None
+                self._load_catalog(conn, catalog_version)
+
+            if self.last_change_id is None:
+                row = conn.execute("SELECT COALESCE(MAX(change_id), 0) FROM ReservationChanges").fetchone()
+                self.last_change_id = row[0]
+                self._days.clear()
+                return
+
+            changes = conn.execute("""
+                SELECT change_id, room_id, slot_date
+                FROM   ReservationChanges
+                WHERE  change_id > ?
+                ORDER  BY change_id
+            """, (self.last_change_id,)).fetchall()
+            if not changes:
+                return
+
+            if changes[0][0] != self.last_change_id + 1:
+                # The log was pruned past our position; start over from the current state
+                self._days.clear()
+            else:
+                cells = {(room_id, slot_date) for _, room_id, slot_date in changes
+                         if slot_date in self._days}
+                if len(cells) > MAX_CELL_RELOADS:
+                    for _, slot_date in cells:
+                        self._days.pop(slot_date, None)
+                else:
+                    for room_id, slot_date in cells:
+                        self._reload_cell(conn, room_id, slot_date)
+            self.last_change_id = changes[-1][0]
+
+    def after_write(self, conn):
+        """Pick up a write this worker just committed and prune the change log."""
+        with self._lock:
+            self.sync(conn)
+            if self.last_change_id - self.last_pruned_id >= PRUNE_EVERY:
+                prune_change_log(conn)
+                conn.commit()
+                self.last_pruned_id = self.last_change_id
+
+    def _day(self, conn, slot_date):
+        day = self._days.get(slot_date)
+        if day is None:
+            self.misses += 1
+            return self._load_day(conn, slot_date)
+        self.hits += 1
+        self._days.move_to_end(slot_date)
+        return day
+
+    # ---------- queries ----------
+
+    def candidates(self, building_id=None, floor=None, min_capacity=None, accessible=False, step_free=False):
+        """Bitset of rooms matching the optional building / floor / size / accessibility filters."""
+        bits = self._all
+        if building_id is not None:
+            bits &= self._by_building.get(building_id, 0)
+        if floor is not None:
+            bits &= self._by_floor.get(floor, 0)
+        if min_capacity is not None:
+            sized = 0
+            for capacity, rooms in self._by_capacity.items():
+                if capacity >= min_capacity:
+                    sized |= rooms
+            bits &= sized
+        if accessible:
+            bits &= self._accessible
+        if step_free:
+            bits &= self._step_free
+        return bits
+
+    def busy(self, conn, slot_date, start_hour, end_hour, include_pending=False):
+        """Bitset of rooms with a reservation in any hour of [start_hour, end_hour)."""
+        day = self._day(conn, slot_date)
+        slots = day.held if include_pending else day.approved
+        bits = 0
+        for hour in range(start_hour, end_hour):
+            bits |= slots[hour - FIRST_HOUR]
+        return bits
+
+    def free_rooms(self, conn, slot_date, start_hour, end_hour, building_id=None, floor=None,
+                   include_pending=False, min_capacity=None, accessible=False, step_free=False,
+                   best_fit=False, limit=None):
+        """Rooms free for every hour in [start_hour, end_hour), in display order.
+
+        Only approved reservations block a room unless ``include_pending`` is set,
+        matching the SQL used by ``/search``. With ``best_fit`` the smallest
+        rooms come first (display order within a size). At most ``limit``
+        rooms are returned.
+        """
+        with self._lock:
+            self.sync(conn)
+            free = self.candidates(building_id, floor, min_capacity, accessible, step_free) & ~self.busy(
+                conn, slot_date, start_hour, end_hour, include_pending)
+            if not best_fit:
+                return [self.rooms[pos] for pos in islice(_positions(free), limit)]
+            rooms = []
+            # Capacity buckets are sorted, so the walk can stop once the limit is met
+            for capacity_rooms in self._by_capacity.values():
+                if limit is not None and len(rooms) >= limit:
+                    break
+                rooms.extend(self.rooms[pos] for pos in _positions(free & capacity_rooms))
+            return rooms[:limit]
+
+    def room_mask(self, conn, room_id, slot_date, include_pending=False):
+        """The 13-bit booked mask for one room on one date."""
+        with self._lock:
+            self.sync(conn)
+            pos = self.positions.get(room_id)
+            if pos is None:
+                return 0
+            day = self._day(conn, slot_date)
+            slots = day.held if include_pending else day.approved
+            mask = 0
+            for i, bits in enumerate(slots):
+                if bits >> pos & 1:
+                    mask |= 1 << i
+            return mask
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "rooms": len(self.rooms),
+                "dates_loaded": len(self._days),
+                "max_dates": self.max_dates,
+                "catalog_version": self.catalog_version,
+                "last_change_id": self.last_change_id,
+                "date_hits": self.hits,
+                "date_misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+def next_free_slots(conn, rooms, first_date, last_date, duration, count, earliest_hour=FIRST_HOUR):
+    """The first ``count`` free ``(room, date, start_hour)`` options, earliest first.
+
+    ``rooms`` are the candidates in preference order and ``duration`` is in
+    hours. Weekdays from ``first_date`` to ``last_date`` (``date`` objects)
+    are tried in order, each hour in order, each room in order; on
+    ``first_date`` nothing starts before ``earliest_hour``. Pending and
+    approved reservations block, as in ``booking.book``.
+
+    Busy hours come from one cursor that yields a mask per (date, room) in
+    date order, so the scan stops at the date where the last option is found.
+    Active rows of a room never overlap, so SUM of their masks is their OR.
+    Many candidates walk idx_reservations_active_date, which covers the read
+    and is already grouped; up to ``ROOM_LIST_MAX`` seek their own rows on
+    uq_reservations_active_slot instead. Returns ``(options, searched_through)``:
+    the options as dicts and the last date examined.
+    """
+    options = []
+    if not rooms or not 1 <= duration <= SLOT_COUNT:
+        return options, None
+    wanted = {room["room_id"] for room in rooms}
+    params = [first_date.isoformat(), last_date.isoformat()]
+    if len(rooms) <= ROOM_LIST_MAX:
+        source = "Reservations WHERE room_id IN (SELECT value FROM json_each(?)) AND"
+        params.insert(0, json.dumps(sorted(wanted)))
+    else:
+        source = "Reservations INDEXED BY idx_reservations_active_date WHERE"
+    cur = conn.execute(f"""
+        SELECT slot_date, room_id, SUM(((1 << (end_hour - slot_hour)) - 1) << (slot_hour - {FIRST_HOUR})) AS busy
+        FROM   {source} slot_date BETWEEN ? AND ?
+          AND  status IN ('pending', 'approved')
+        GROUP  BY slot_date, room_id
+        ORDER  BY slot_date
+    """, params)
+
+    row = cur.fetchone()
+    day = first_date
+    searched = None
+    while day <= last_date and len(options) < count:
+        slot_date = day.isoformat()
+        busy = {}
+        while row is not None and row[0] <= slot_date:
+            if row[0] == slot_date:
+                busy[row[1]] = row[2]
+            row = cur.fetchone()
+        if day.weekday() < 5:
+            searched = day
+            first = earliest_hour if day == first_date else FIRST_HOUR
+            for start in range(max(first, FIRST_HOUR), LAST_HOUR + 2 - duration):
+                window = hour_mask(start, start + duration)
+                for room in rooms:
+                    if not busy.get(room["room_id"], 0) & window:
+                        options.append({**room, "slot_date": slot_date,
+                                        "start_hour": start, "end_hour": start + duration})
+                        if len(options) == count:
+                            break
+                if len(options) == count:
+                    break
+        day += timedelta(days=1)
+    cur.close()
+    return options, searched
+
+
+def prune_change_log(conn, keep=CHANGE_LOG_KEEP):
+    """Trim the reservation change log to its newest ``keep`` rows.
+
+    Workers that fall further behind than this simply reload their index.
+    """
+    conn.execute("""
+        DELETE FROM ReservationChanges
+        WHERE change_id <= (SELECT MAX(change_id) FROM ReservationChanges) - ?
+    """, (keep,))
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(database):
+    """Return the process-wide availability index for ``database``."""
+    with _indexes_lock:
+        index = _indexes.get(database)
+        if index is None:
+            index = AvailabilityIndex()
+            _indexes[database] = index
+        return index
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark /search: bitmap availability index vs. the SQL NOT IN query.
+
+Builds a throwaway database with N rooms and a year of hourly bookings,
+then runs the same random searches through both engines, checks that they
+agree and prints latency percentiles.
+
+Usage: python bench_availability.py [--rooms 10000] [--days 365] [--density 0.15]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+import availability
+import db
+import migrate
+
+
+def build_database(path, rooms, days, density, seed):
+    rng = random.Random(seed)
+    migrate.upgrade(path, seed_data=False, log=lambda *a: None)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous = OFF")
+
+    buildings = max(1, rooms // 20)
+    conn.executemany(
+        "INSERT INTO Buildings (name, address, is_no_stair) VALUES (?, ?, ?)",
+        [(f"Building {b:04d}", f"{b} Bench St", b % 2) for b in range(1, buildings + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO Rooms (building_id, room_num, capacity, floor, is_aca_compliant) VALUES (?, ?, ?, ?, ?)",
+        [(r % buildings + 1, f"R{r:05d}", rng.choice((4, 6, 8, 12, 20)), r % 4 + 1, r % 3 == 0)
+         for r in range(rooms)],
+    )
+
+    start = date.today()
+    dates = [start + timedelta(days=d) for d in range(days)]
+    weekdays = [d.isoformat() for d in dates if d.weekday() < 5]
+
+    def rows():
+        for room_id in range(1, rooms + 1):
+            for slot_date in weekdays:
+                for hour in range(7, 20):
+                    if rng.random() < density:
+                        status = "approved" if rng.random() < 0.8 else "pending"
+                        yield (room_id, "Bench", slot_date, hour, status)
+
+    conn.executemany(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status) VALUES (?, ?, ?, ?, ?)",
+        rows(),
+    )
+    conn.execute("DELETE FROM ReservationChanges")
+    conn.commit()
+    total = conn.execute("SELECT COUNT(*) FROM Reservations").fetchone()[0]
+    conn.close()
+    return buildings, weekdays, total
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    return {
+        "p50": pick(0.50) * 1000,
+        "p95": pick(0.95) * 1000,
+        "p99": pick(0.99) * 1000,
+        "mean": statistics.fmean(samples) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rooms", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--density", type=float, default=0.15, help="share of hourly slots booked")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_availability_")
+    path = os.path.join(workdir, "bench.db")
+
+    started = time.perf_counter()
+    buildings, weekdays, total = build_database(path, args.rooms, args.days, args.density, args.seed)
+    print(f"Built {args.rooms} rooms / {buildings} buildings / {total} reservations "
+          f"in {time.perf_counter() - started:.1f}s ({path})")
+
+    os.environ["AUTO_MIGRATE"] = "false"
+    from app import app
+    app.config["DATABASE"] = path
+    client = app.test_client()
+
+    rng = random.Random(args.seed)
+    queries = []
+    for _ in range(args.queries):
+        start_hour = rng.randint(7, 18)
+        params = {
+            "slot_date": rng.choice(weekdays),
+            "start_hour": start_hour,
+            "end_hour": rng.randint(start_hour + 1, min(start_hour + 4, 20)),
+        }
+        if rng.random() < 0.5:
+            params["building_id"] = rng.randint(1, buildings)
+        queries.append(params)
+
+    index = availability.get_index(path)
+    conn = db.connect(path)
+    timings = {"sql": [], "index (cold)": [], "index (warm)": [], "index only": []}
+    for params in queries:
+        started = time.perf_counter()
+        expected = client.get("/search", query_string={**params, "engine": "sql"}).get_json()
+        timings["sql"].append(time.perf_counter() - started)
+
+        misses = index.stats()["date_misses"]
+        started = time.perf_counter()
+        got = client.get("/search", query_string=params).get_json()
+        elapsed = time.perf_counter() - started
+        assert got == expected, f"engines disagree for {params}"
+        cold = index.stats()["date_misses"] > misses
+        timings["index (cold)" if cold else "index (warm)"].append(elapsed)
+
+        started = time.perf_counter()
+        index.free_rooms(conn, params["slot_date"], params["start_hour"], params["end_hour"],
+                         building_id=params.get("building_id"))
+        timings["index only"].append(time.perf_counter() - started)
+    conn.close()
+
+    print(f"\n{'engine':<14} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9}  n")
+    for name, samples in timings.items():
+        if samples:
+            p = percentiles(samples)
+            print(f"{name:<14} {p['p50']:9.2f} {p['p95']:9.2f} {p['p99']:9.2f} {p['mean']:9.2f}  {len(samples)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Load-test the hot routes against a synthetic dataset and write a JSON report.
+
+Builds a throwaway database of the requested size (buildings, rooms, days of
+hourly bookings, booking density, share left pending, weekly series), then
+drives /search, /search/range, /admin, /admin/recurring and /reserve with
+concurrent clients - in-process through the Flask test client and/or over
+HTTP against a local Gunicorn - and records latency percentiles, status
+counts and throughput per route. Reports from two commits can be compared
+with --compare.
+
+Usage: python bench_load.py [--buildings 50] [--rooms 2000] [--days 90]
+                            [--density 0.15] [--pending 0.2] [--series 100]
+                            [--driver both] [--clients 8] [--requests 200]
+                            [--output bench_report.json] [--compare old.json]
+
+At full scale (slow to build):
+    python bench_load.py --buildings 500 --rooms 20000 --days 365 --driver gunicorn
+"""
+
+import argparse
+import http.cookiejar
+import json
+import os
+import platform
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import bcrypt
+
+import migrate
+from bench_availability import percentiles
+from seed import bulk_load
+
+ADMIN_USERNAME = "bench"
+ADMIN_PASSWORD = "bench"
+EMPLOYEES = 150
+ROUTES = ("search", "search_range", "admin_dashboard", "admin_recurring", "reserve")
+
+
+def build_dataset(path, buildings=50, rooms=2000, days=90, density=0.15, pending=0.2,
+                  series=100, seed=42):
+    """Create a migrated database at ``path`` filled with synthetic bookings; return its shape."""
+    rng = random.Random(seed)
+    migrate.upgrade(path, seed_data=False, log=lambda *a: None)
+    conn = sqlite3.connect(path)
+    with bulk_load(conn):
+        conn.execute("INSERT INTO Admins (username, password_hash) VALUES (?, ?)",
+                     (ADMIN_USERNAME, bcrypt.hashpw(ADMIN_PASSWORD.encode(), bcrypt.gensalt(4)).decode()))
+        conn.executemany(
+            "INSERT INTO Buildings (name, address, is_no_stair) VALUES (?, ?, ?)",
+            [(f"Building {b:04d}", f"{b} Load St", b % 2) for b in range(1, buildings + 1)],
+        )
+        conn.executemany(
+            "INSERT INTO Rooms (building_id, room_num, capacity, floor, is_aca_compliant) VALUES (?, ?, ?, ?, ?)",
+            [(r % buildings + 1, f"R{r:05d}", rng.choice((4, 6, 8, 12, 20)), r % 4 + 1, r % 3 == 0)
+             for r in range(rooms)],
+        )
+
+        today = date.today()
+        weekdays = [day for day in (today + timedelta(days=d) for d in range(days)) if day.weekday() < 5]
+        employees = [f"Employee {n:03d}" for n in range(1, EMPLOYEES + 1)]
+
+        # Weekly series: one run of hours on one weekday in one room for the whole window
+        taken = {}
+        for n in range(series):
+            room_id = rng.randint(1, rooms)
+            weekday = rng.randint(0, 4)
+            start = rng.randint(7, 17)
+            end = min(20, start + rng.randint(1, 3))
+            dates = [day.isoformat() for day in weekdays if day.weekday() == weekday]
+            hours = taken.setdefault(room_id, set())
+            if not dates or any((slot_date, hour) in hours for slot_date in dates for hour in range(start, end)):
+                continue
+            status = "pending" if rng.random() < pending else "approved"
+            series_id = conn.execute("""
+                INSERT INTO RecurringSeries (room_id, reserved_by, weekday, start_hour, end_hour,
+                                             start_date, end_date, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (room_id, f"Weekly: Team {n}", weekday, start, end, dates[0], dates[-1], status)).lastrowid
+            conn.executemany(
+                "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status, series_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(room_id, f"Weekly: Team {n}", slot_date, hour, hour + 1, status, series_id)
+                 for slot_date in dates for hour in range(start, end)],
+            )
+            hours.update((slot_date, hour) for slot_date in dates for hour in range(start, end))
+
+        def rows():
+            for room_id in range(1, rooms + 1):
+                hours = taken.get(room_id, ())
+                for day in weekdays:
+                    slot_date = day.isoformat()
+                    for hour in range(7, 20):
+                        if (slot_date, hour) not in hours and rng.random() < density:
+                            status = "pending" if rng.random() < pending else "approved"
+                            yield (room_id, rng.choice(employees), slot_date, hour, hour + 1, status)
+
+        conn.executemany(
+            "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows(),
+        )
+    conn.execute("ANALYZE")
+    shape = {
+        "buildings": buildings,
+        "rooms": rooms,
+        "weekdays": len(weekdays),
+        "reservations": conn.execute("SELECT COUNT(*) FROM Reservations").fetchone()[0],
+        "series": conn.execute("SELECT COUNT(*) FROM RecurringSeries").fetchone()[0],
+    }
+    conn.close()
+    return shape, [day.isoformat() for day in weekdays]
+
+
+def make_requests(route, count, shape, weekdays, seed):
+    """``count`` (method, path, json_body) tuples for ``route``, reproducible from ``seed``."""
+    rng = random.Random(f"{route}:{seed}")
+    requests = []
+    for _ in range(count):
+        start = rng.randint(7, 18)
+        end = rng.randint(start + 1, min(start + 3, 20))
+        if route == "search":
+            params = {"slot_date": rng.choice(weekdays), "start_hour": start, "end_hour": end}
+            if rng.random() < 0.5:
+                params["building_id"] = rng.randint(1, shape["buildings"])
+            requests.append(("GET", "/search?" + urllib.parse.urlencode(params), None))
+        elif route == "search_range":
+            first = rng.randrange(max(1, len(weekdays) - 10))
+            params = {"building_id": rng.randint(1, shape["buildings"]),
+                      "start_date": weekdays[first], "end_date": weekdays[min(first + 9, len(weekdays) - 1)],
+                      "start_hour": start, "end_hour": end}
+            requests.append(("GET", "/search/range?" + urllib.parse.urlencode(params), None))
+        elif route == "admin_dashboard":
+            requests.append(("GET", f"/admin?page={rng.randint(1, 3)}", None))
+        elif route == "admin_recurring":
+            requests.append(("GET", "/admin/recurring", None))
+        elif route == "reserve":
+            requests.append(("POST", "/reserve", {
+                "room_id": rng.randint(1, shape["rooms"]),
+                "reserved_by": f"Load {rng.randint(1, EMPLOYEES)}",
+                "slot_date": rng.choice(weekdays),
+                "start_hour": start,
+                "end_hour": end,
+            }))
+    return requests
+
+
+def drive(send, requests, clients):
+    """Run ``requests`` through ``send(client_no, request) -> status`` from ``clients`` threads."""
+    lock = threading.Lock()
+    samples, statuses, errors = [], {}, []
+    queue = list(reversed(requests))
+
+    def worker(client_no):
+        while True:
+            with lock:
+                if not queue:
+                    return
+                request = queue.pop()
+            started = time.perf_counter()
+            try:
+                status = send(client_no, request)
+            except Exception as error:  # connection reset, timeout...
+                with lock:
+                    errors.append(repr(error))
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                samples.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(worker, range(clients)))
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "requests": len(requests),
+        "clients": clients,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "errors": len(errors) + sum(count for status, count in statuses.items() if status >= 500),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else None,
+    }
+    if samples:
+        result.update({f"{key}_ms": round(value, 3) for key, value in percentiles(samples).items()})
+        result["max_ms"] = round(max(samples) * 1000, 3)
+    return result
+
+
+def test_client_sender(database, clients):
+    """Sender backed by one logged-in Flask test client per thread."""
+    os.environ["AUTO_MIGRATE"] = "false"
+    from app import app
+    app.config["DATABASE"] = database
+    test_clients = []
+    for _ in range(clients):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["is_admin"] = True
+            session["admin_username"] = ADMIN_USERNAME
+        test_clients.append(client)
+
+    def send(client_no, request):
+        method, path, body = request
+        return test_clients[client_no].open(path, method=method, json=body).status_code
+
+    return send
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(database, workers, threads):
+    """Start Gunicorn on a free local port; return (process, base_url) once it answers."""
+    port = free_port()
+    env = {**os.environ, "DATABASE_PATH": database, "AUTO_MIGRATE": "false",
+           "SECRET_KEY": "bench-load", "FLASK_DEBUG": "false"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), "--threads", str(threads),
+         "-b", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during start-up")
+        try:
+            urllib.request.urlopen(base_url + "/", timeout=1).close()
+            return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("gunicorn did not start within 30s")
+
+
+def http_sender(base_url):
+    """Sender that talks HTTP to ``base_url`` with a logged-in session cookie."""
+    cookies = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookies))
+    login = urllib.parse.urlencode({"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD}).encode()
+    opener.open(base_url + "/admin/login", data=login, timeout=10).close()
+
+    def send(client_no, request):
+        method, path, body = request
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(base_url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"} if data else {})
+        try:
+            with opener.open(req, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            error.read()
+            return error.code
+
+    return send
+
+
+def run(database, shape, weekdays, drivers=("test_client",), routes=ROUTES, requests=200,
+        clients=8, gunicorn_workers=2, gunicorn_threads=4, seed=42):
+    """Drive ``routes`` with each driver in ``drivers``; return {driver: {route: result}}."""
+    results = {}
+    for driver in drivers:
+        process = None
+        if driver == "test_client":
+            send = test_client_sender(database, clients)
+        elif driver == "gunicorn":
+            process, base_url = start_gunicorn(database, gunicorn_workers, gunicorn_threads)
+            send = http_sender(base_url)
+        else:
+            raise ValueError(f"unknown driver {driver!r}")
+        try:
+            results[driver] = {
+                route: drive(send, make_requests(route, requests, shape, weekdays, f"{driver}:{seed}"), clients)
+                for route in routes
+            }
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(30)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    print(f"\n{'driver / route':<30} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} {'5xx':>5}  statuses")
+    for driver, routes in results.items():
+        for route, result in routes.items():
+            line = (f"{driver + ' / ' + route:<30} {result.get('p50_ms', 0):9.2f} {result.get('p95_ms', 0):9.2f} "
+                    f"{result.get('p99_ms', 0):9.2f} {result['throughput_rps'] or 0:8.1f} {result['errors']:5d}  "
+                    f"{result['statuses']}")
+            before = (baseline or {}).get(driver, {}).get(route)
+            if before and before.get("p50_ms"):
+                change = (result.get("p50_ms", 0) - before["p50_ms"]) / before["p50_ms"] * 100
+                line += f"  p50 {change:+.0f}% vs baseline"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--buildings", type=int, default=50)
+    parser.add_argument("--rooms", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=90, help="calendar days of bookings from today")
+    parser.add_argument("--density", type=float, default=0.15, help="share of hourly slots booked")
+    parser.add_argument("--pending", type=float, default=0.2, help="share of bookings left pending")
+    parser.add_argument("--series", type=int, default=100, help="weekly recurring series to add")
+    parser.add_argument("--driver", choices=("test_client", "gunicorn", "both"), default="both")
+    parser.add_argument("--routes", default=",".join(ROUTES), help="comma-separated subset of " + ",".join(ROUTES))
+    parser.add_argument("--clients", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route and driver")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument("--database", help="reuse a database built by an earlier run")
+    parser.add_argument("--output", default="bench_report.json")
+    parser.add_argument("--compare", help="earlier report to diff p50 latency against")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    dataset = {key: getattr(args, key) for key in ("buildings", "rooms", "days", "density", "pending", "series", "seed")}
+    started = time.perf_counter()
+    if args.database and os.path.exists(args.database):
+        path = args.database
+        conn = sqlite3.connect(path)
+        shape = {
+            "buildings": conn.execute("SELECT COUNT(*) FROM Buildings").fetchone()[0],
+            "rooms": conn.execute("SELECT COUNT(*) FROM Rooms").fetchone()[0],
+            "reservations": conn.execute("SELECT COUNT(*) FROM Reservations").fetchone()[0],
+            "series": conn.execute("SELECT COUNT(*) FROM RecurringSeries").fetchone()[0],
+        }
+        weekdays = [row[0] for row in conn.execute(
+            "SELECT DISTINCT slot_date FROM Reservations WHERE slot_date >= date('now') ORDER BY slot_date")]
+        conn.close()
+        shape["weekdays"] = len(weekdays)
+    else:
+        path = args.database or os.path.join(tempfile.mkdtemp(prefix="bench_load_"), "load.db")
+        shape, weekdays = build_dataset(path, **dataset)
+    build_seconds = time.perf_counter() - started
+    print(f"{shape['reservations']} reservations in {shape['rooms']} rooms / {shape['buildings']} buildings, "
+          f"{shape['series']} series, ready in {build_seconds:.1f}s ({path})")
+
+    drivers = ("test_client", "gunicorn") if args.driver == "both" else (args.driver,)
+    routes = tuple(route for route in args.routes.split(",") if route)
+    results = run(path, shape, weekdays, drivers, routes, args.requests, args.clients,
+                  args.workers, args.threads, args.seed)
+
+    report = {
+        "commit": git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "dataset": {**dataset, **shape, "build_seconds": round(build_seconds, 2)},
+        "load": {"clients": args.clients, "requests": args.requests,
+                 "gunicorn_workers": args.workers, "gunicorn_threads": args.threads},
+        "results": results,
+    }
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)["results"]
+    print_results(results, baseline)
+    print(f"\nReport written to {args.output}")
+    return 1 if any(result["errors"] for routes in results.values() for result in routes.values()) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
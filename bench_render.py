@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark admin page rendering with and without cached fragments.
+
+Books one room solid for the next 3 weeks (13 hourly slots per weekday),
+then times /admin/room/<id>/schedule with an empty fragment cache (every
+day table rendered) and with a warm one, plus the hour label filters on
+their own against the per-call string formatting they replaced.
+
+Usage: python bench_render.py [--requests 50] [--interval]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+import migrate
+from bench_availability import percentiles
+
+ROOM_ID = 1
+
+
+def build_database(path, interval):
+    migrate.upgrade(path, seed_data=False, log=lambda *a: None)
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO Buildings (name, address) VALUES ('Render', '1 Template St')")
+    conn.execute("INSERT INTO Rooms (building_id, room_num, capacity) VALUES (1, '101', 8)")
+    today = date.today()
+    days = [today + timedelta(days=d) for d in range(22)]
+    spans = [(7, 20)] if interval else [(hour, hour + 1) for hour in range(7, 20)]
+    rows = [(ROOM_ID, f"Booker {n % 7}", day.isoformat(), start, end, ("approved", "pending")[n % 2])
+            for n, (day, (start, end)) in enumerate((d, s) for d in days if d.weekday() < 5 for s in spans)]
+    conn.executemany(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+    return len(rows)
+
+
+def time_requests(client, url, count, before=None):
+    samples = []
+    for _ in range(count):
+        if before:
+            before()
+        started = time.perf_counter()
+        response = client.get(url)
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 200
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--interval", action="store_true", help="store each day as one interval row")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_render_"), "render.db")
+    rows = build_database(path, args.interval)
+    print(f"Booked {rows} reservation rows for room {ROOM_ID} ({path})")
+
+    os.environ["AUTO_MIGRATE"] = "false"
+    import fragments
+    from app import app, format_hour_12hr, time_range_12hr
+    app.config["DATABASE"] = path
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["is_admin"] = True
+        session["admin_username"] = "bench"
+
+    cache = fragments.get_cache(path)
+    url = f"/admin/room/{ROOM_ID}/schedule"
+    timings = {
+        "cold fragments": time_requests(client, url, args.requests, before=cache.clear),
+        "warm fragments": time_requests(client, url, args.requests),
+    }
+
+    cells = [(hour, hour + 1) for hour in range(7, 20)] * 15
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        for start, end in cells:
+            f"{format_hour_12hr(start)} - {format_hour_12hr(end)}"
+    formatted = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        for start, end in cells:
+            time_range_12hr(start, end)
+    looked_up = time.perf_counter() - started
+
+    print(f"\n{'schedule page':<16} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9}  n")
+    for name, samples in timings.items():
+        p = percentiles(samples)
+        print(f"{name:<16} {p['p50']:9.2f} {p['p95']:9.2f} {p['p99']:9.2f} {p['mean']:9.2f}  {len(samples)}")
+    per_page = len(cells)
+    print(f"\ntime_range_12hr x {per_page}: formatting {formatted / args.requests * 1000:.3f} ms, "
+          f"lookup table {looked_up / args.requests * 1000:.3f} ms per page")
+
+
+if __name__ == "__main__":
+    main()
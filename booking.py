@@ -0,0 +1,384 @@
+"""
+Reservation write paths for the Building Reservation System.
+
+Bulk operations here work on whole sets of slots: conflicts are found with
+one query, the remaining rows go in with ``executemany``, and everything
+happens inside a single ``BEGIN IMMEDIATE`` transaction so no other worker
+can slip a booking in between the check and the insert. Taking that lock
+retries SQLITE_BUSY with a bounded backoff (see ``begin_immediate``).
+"""
+
+import json
+import os
+import random
+import sqlite3
+import time
+from datetime import timedelta
+
+# BEGIN IMMEDIATE attempts before giving up when another writer holds the
+# lock past busy_timeout, and the first backoff delay (doubled each retry)
+BUSY_RETRIES = int(os.environ.get("BOOKING_BUSY_RETRIES", 5))
+BUSY_BACKOFF = float(os.environ.get("BOOKING_BUSY_BACKOFF", 0.05))
+MAX_BACKOFF = 1.0
+
+
+def is_busy(error):
+    """True for the OperationalError sqlite3 raises on SQLITE_BUSY / SQLITE_LOCKED."""
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def begin_immediate(conn, retries=None, backoff=None):
+    """Take the write lock up front, retrying SQLITE_BUSY with bounded jittered backoff.
+
+    busy_timeout already makes each attempt wait inside SQLite; the retries
+    cover writers that hold the lock longer than that under heavy load.
+    """
+    retries = BUSY_RETRIES if retries is None else retries
+    delay = BUSY_BACKOFF if backoff is None else backoff
+    for attempt in range(retries + 1):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            return
+        except sqlite3.OperationalError as error:
+            if not is_busy(error) or attempt == retries:
+                raise
+        time.sleep(min(delay, MAX_BACKOFF) * random.uniform(0.5, 1.0))
+        delay *= 2
+
+
+def book(conn, room_id, reserved_by, slot_date, start_hour, end_hour, status="pending", interval=False):
+    """Reserve ``start_hour`` .. ``end_hour - 1`` in one room on one date, all or nothing.
+
+    The write lock is taken before the conflict check, so no other worker can
+    book between the check and the insert, and the whole range goes in with a
+    single INSERT. Returns ``{"reservation_ids", "conflicts", "conflicting_hours"}``;
+    when anything conflicts nothing is written and ``conflicts`` lists each
+    pending or approved reservation in the way. Rejected and cancelled rows
+    never hold a slot, and the probe seeks the partial index that skips them.
+    """
+    begin_immediate(conn)
+    try:
+        cur = conn.execute("""
+            SELECT reservation_id, slot_hour, end_hour, status, reserved_by
+            FROM   Reservations
+            WHERE  room_id = ?
+              AND  slot_date = ?
+              AND  status IN ('pending', 'approved')
+              AND  slot_hour < ?
+              AND  end_hour > ?
+            ORDER  BY slot_hour
+        """, (room_id, slot_date, end_hour, start_hour))
+        conflicts = [dict(row) for row in cur.fetchall()]
+        if conflicts:
+            conn.rollback()
+            hours = set()
+            for row in conflicts:
+                hours.update(range(max(row["slot_hour"], start_hour), min(row["end_hour"], end_hour)))
+            return {"reservation_ids": [], "conflicts": conflicts, "conflicting_hours": sorted(hours)}
+
+        if interval:
+            cur = conn.execute("""
+                INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status)
+                VALUES (?, ?, ?, ?, ?, ?)
+                RETURNING reservation_id
+            """, (room_id, reserved_by, slot_date, start_hour, end_hour, status))
+        else:
+            cur = conn.execute("""
+                INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status)
+                SELECT ?, ?, ?, hour, hour + 1, ?
+                FROM   SlotHours
+                WHERE  hour >= ? AND hour < ?
+                ORDER  BY hour
+                RETURNING reservation_id
+            """, (room_id, reserved_by, slot_date, status, start_hour, end_hour))
+        reservation_ids = sorted(row[0] for row in cur.fetchall())
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return {"reservation_ids": reservation_ids, "conflicts": [], "conflicting_hours": []}
+
+
+def book_batch(conn, items, atomic=True, status="pending", interval=False):
+    """Reserve a list of bookings in one transaction; return one result per item.
+
+    ``items`` are dicts with room_id, reserved_by, slot_date, start_hour and
+    end_hour. A single query joins the whole batch against the active slot
+    index to find every pending or approved reservation in the way, and an
+    item that overlaps an earlier item of the same batch conflicts with it
+    too. The free items then go in with one INSERT. With ``atomic`` any
+    conflict writes nothing.
+
+    Each result has a ``status`` of "booked", "conflict" or, for free items
+    of an atomic batch that was not written, "skipped", plus the
+    ``reservation_ids``, ``conflicts`` and ``conflicting_hours`` that
+    ``book`` reports.
+    """
+    batch = json.dumps([[item["room_id"], item["slot_date"], item["start_hour"], item["end_hour"]]
+                        for item in items])
+    results = [{"status": "booked", "reservation_ids": [], "conflicts": [], "conflicting_hours": []}
+               for _ in items]
+
+    begin_immediate(conn)
+    try:
+        cur = conn.execute("""
+            WITH batch AS (
+                SELECT key AS item, value ->> 0 AS room_id, value ->> 1 AS slot_date,
+                       value ->> 2 AS start_hour, value ->> 3 AS end_hour
+                FROM   json_each(?)
+            )
+            SELECT b.item, r.reservation_id, r.slot_hour, r.end_hour, r.status, r.reserved_by
+            FROM   batch b
+            JOIN   Reservations r
+              ON   r.room_id = b.room_id
+             AND   r.slot_date = b.slot_date
+             AND   r.status IN ('pending', 'approved')
+             AND   r.slot_hour < b.end_hour
+             AND   r.end_hour > b.start_hour
+            ORDER  BY b.item, r.slot_hour
+        """, (batch,))
+        for row in cur.fetchall():
+            conflict = dict(row)
+            results[conflict.pop("item")]["conflicts"].append(conflict)
+
+        # Hours each (room, date) cell takes from items already accepted in this batch
+        claimed = {}
+        accepted = []
+        for index, (item, result) in enumerate(zip(items, results)):
+            cell = (item["room_id"], item["slot_date"])
+            for other, first, last in claimed.get(cell, []):
+                if first < item["end_hour"] and last > item["start_hour"]:
+                    result["conflicts"].append({"item": other, "slot_hour": first, "end_hour": last,
+                                                "reserved_by": items[other]["reserved_by"]})
+            if result["conflicts"]:
+                result["status"] = "conflict"
+                hours = set()
+                for row in result["conflicts"]:
+                    hours.update(range(max(row["slot_hour"], item["start_hour"]),
+                                       min(row["end_hour"], item["end_hour"])))
+                result["conflicting_hours"] = sorted(hours)
+            else:
+                claimed.setdefault(cell, []).append((index, item["start_hour"], item["end_hour"]))
+                accepted.append(index)
+
+        if atomic and len(accepted) < len(items):
+            conn.rollback()
+            for index in accepted:
+                results[index]["status"] = "skipped"
+            return results
+
+        if accepted:
+            rows = json.dumps([[items[i]["room_id"], items[i]["slot_date"], items[i]["start_hour"],
+                                items[i]["end_hour"], items[i]["reserved_by"]] for i in accepted])
+            if interval:
+                source = "SELECT value ->> 0, value ->> 4, value ->> 1, value ->> 2, value ->> 3, ? FROM json_each(?)"
+            else:
+                source = """
+                    SELECT value ->> 0, value ->> 4, value ->> 1, h.hour, h.hour + 1, ?
+                    FROM   json_each(?)
+                    JOIN   SlotHours h ON h.hour >= value ->> 2 AND h.hour < value ->> 3
+                """
+            cur = conn.execute(f"""
+                INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status)
+                {source}
+                RETURNING reservation_id, room_id, slot_date, slot_hour
+            """, (status, rows))
+            # Accepted items never overlap, so (room, date, start hour) names one item
+            owner = {}
+            for index in accepted:
+                item = items[index]
+                for hour in range(item["start_hour"], item["end_hour"]):
+                    owner[(item["room_id"], item["slot_date"], hour)] = index
+            for reservation_id, room_id, slot_date, slot_hour in cur.fetchall():
+                results[owner[(room_id, slot_date, slot_hour)]]["reservation_ids"].append(reservation_id)
+            for index in accepted:
+                results[index]["reservation_ids"].sort()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return results
+
+
+def pending_filter(reservation_ids=None, building_id=None, room_id=None, reserved_by=None,
+                   start_date=None, end_date=None):
+    """WHERE clause and parameters for the pending rows matching the moderation filters.
+
+    The filters are ANDed: explicit ``reservation_ids``, building, room,
+    requester (substring, as on /admin/reservations) and an inclusive slot
+    date range. With none of them every pending row matches. Ids travel as
+    one JSON parameter, so a list of any length stays a single statement.
+    """
+    clauses, params = ["status = 'pending'"], []
+    if reservation_ids is not None:
+        clauses.append("reservation_id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(list(reservation_ids)))
+    if building_id is not None:
+        clauses.append("room_id IN (SELECT room_id FROM Rooms WHERE building_id = ?)")
+        params.append(building_id)
+    if room_id is not None:
+        clauses.append("room_id = ?")
+        params.append(room_id)
+    if reserved_by:
+        clauses.append("reserved_by LIKE '%' || ? || '%'")
+        params.append(reserved_by)
+    if start_date:
+        clauses.append("slot_date >= ?")
+        params.append(start_date)
+    if end_date:
+        clauses.append("slot_date <= ?")
+        params.append(end_date)
+    return " AND ".join(clauses), params
+
+
+def pending_ids(conn, **filters):
+    """Ids of the pending rows matching ``filters`` (see ``pending_filter``), in id order."""
+    where, params = pending_filter(**filters)
+    return [row[0] for row in conn.execute(
+        f"SELECT reservation_id FROM Reservations WHERE {where} ORDER BY reservation_id", params)]
+
+
+def moderate(conn, action, **filters):
+    """Approve or reject every pending reservation matching ``filters``, in one transaction.
+
+    ``action`` is "approve" or "reject" and ``filters`` are those of
+    ``pending_filter``. The status change is a single UPDATE that seeks
+    idx_reservations_status_date (or the room index for one room); the
+    overlap triggers already keep pending and approved rows apart.
+    Returns ``{"updated"}``.
+    """
+    status = {"approve": "approved", "reject": "rejected"}[action]
+    where, params = pending_filter(**filters)
+
+    begin_immediate(conn)
+    try:
+        updated = conn.execute(f"UPDATE Reservations SET status = ? WHERE {where}", [status, *params]).rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return {"updated": updated}
+
+
+def series_dates(first_date, weeks):
+    """Dates of a weekly series: ``first_date`` and the same weekday after it."""
+    return [first_date + timedelta(weeks=week) for week in range(weeks)]
+
+
+def hour_runs(hours):
+    """Collapse sorted hours into ``(start, end)`` spans of consecutive hours."""
+    runs = []
+    for hour in hours:
+        if runs and runs[-1][1] == hour:
+            runs[-1][1] = hour + 1
+        else:
+            runs.append([hour, hour + 1])
+    return [tuple(run) for run in runs]
+
+
+def create_series(conn, room_id, reserved_by, dates, start_hour, end_hour, status, interval=False):
+    """Record a RecurringSeries and insert its slots in one transaction.
+
+    ``dates`` must all fall on the same weekday. Hours that already hold a
+    pending or approved reservation are skipped.
+    With ``interval`` each date's free hours are stored as one row per
+    consecutive run rather than one row per hour.
+    Returns a report dict with the new ``series_id`` (None when every slot
+    conflicted), the number of hourly slots ``inserted``, the ``requested``
+    total and a ``conflicts`` list describing each reservation in the way.
+    """
+    iso_dates = sorted(d.isoformat() for d in dates)
+    wanted = set(iso_dates)
+
+    begin_immediate(conn)
+    try:
+        conflicts = []
+        taken = set()
+        if iso_dates:
+            # One range-overlap probe on the room's dates; the generated weekday
+            # column skips the other weekdays in the span inside the scan
+            cur = conn.execute("""
+                SELECT reservation_id, slot_date, slot_hour, end_hour, status, reserved_by
+                FROM   Reservations
+                WHERE  room_id = ?
+                  AND  slot_date BETWEEN ? AND ?
+                  AND  weekday = ?
+                  AND  status IN ('pending', 'approved')
+                  AND  slot_hour < ?
+                  AND  end_hour > ?
+                ORDER  BY slot_date, slot_hour
+            """, (room_id, iso_dates[0], iso_dates[-1], min(dates).weekday(), end_hour, start_hour))
+            for row in cur.fetchall():
+                if row['slot_date'] in wanted:
+                    for hour in range(max(row['slot_hour'], start_hour), min(row['end_hour'], end_hour)):
+                        taken.add((row['slot_date'], hour))
+                    conflicts.append(dict(row))
+
+        rows = []
+        for slot_date in iso_dates:
+            free = [hour for hour in range(start_hour, end_hour) if (slot_date, hour) not in taken]
+            spans = hour_runs(free) if interval else [(hour, hour + 1) for hour in free]
+            rows.extend((slot_date, first, last) for first, last in spans)
+
+        series_id = None
+        if rows:
+            cur = conn.execute("""
+                INSERT INTO RecurringSeries
+                    (room_id, reserved_by, weekday, start_hour, end_hour, start_date, end_date, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (room_id, reserved_by, min(dates).weekday(), start_hour, end_hour,
+                  iso_dates[0], iso_dates[-1], status))
+            series_id = cur.lastrowid
+            conn.executemany("""
+                INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status, series_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [(room_id, reserved_by, slot_date, first, last, status, series_id)
+                  for slot_date, first, last in rows])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return {
+        "series_id": series_id,
+        "requested": len(iso_dates) * (end_hour - start_hour),
+        "inserted": sum(last - first for _, first, last in rows),
+        "conflicts": conflicts,
+    }
+
+
+def delete_series(conn, series_id, from_date):
+    """Delete a series' slots on or after ``from_date`` (ISO string).
+
+    The series row is trimmed to its remaining slots, archived ones
+    included, or removed entirely when none are left. Returns the number of
+    reservations deleted.
+    """
+    begin_immediate(conn)
+    try:
+        cur = conn.execute(
+            "DELETE FROM Reservations WHERE series_id = ? AND slot_date >= ?",
+            (series_id, from_date),
+        )
+        deleted = cur.rowcount
+        # Compacted history keeps its series_id, so the series lives on while it has any
+        remaining = conn.execute("""
+            SELECT MAX(last) FROM (
+                SELECT MAX(slot_date) AS last FROM Reservations WHERE series_id = ?1
+                UNION ALL
+                SELECT MAX(slot_date) FROM ReservationsArchive WHERE series_id = ?1
+            )
+        """, (series_id,)).fetchone()[0]
+        if remaining is None:
+            conn.execute("DELETE FROM RecurringSeries WHERE series_id = ?", (series_id,))
+        else:
+            conn.execute(
+                "UPDATE RecurringSeries SET end_date = ? WHERE series_id = ?", (remaining, series_id)
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return deleted
@@ -0,0 +1,121 @@
+"""
+In-process catalog cache for the Building Reservation System.
+
+Buildings and rooms only change through admin actions, yet every page load
+asks for them. Each worker keeps one snapshot of the catalog (buildings,
+rooms and the floors of each building) tagged with the ``catalog`` entry in
+``DataVersion``. The schema triggers bump that counter on any Buildings or
+Rooms write (see migrations/0002_availability_tracking.sql), so checking
+freshness is a single primary-key lookup and every worker sees admin
+changes on its next request.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+
+class CatalogSnapshot:
+    """Immutable view of the catalog at one data version."""
+
+    def __init__(self, version, buildings, rooms):
+        self.version = version
+        self.buildings = buildings          # [{building_id, name, ...}] by name
+        self.rooms = rooms                  # [{room_id, building_id, ...}] by building, floor, room
+        self.room_ids = frozenset(room["room_id"] for room in rooms)
+        floors = {}
+        for room in rooms:
+            building_floors = floors.setdefault(room["building_id"], [])
+            if room["floor"] not in building_floors:
+                building_floors.append(room["floor"])
+        self.floors = {building_id: sorted(values) for building_id, values in floors.items()}
+        self._etags = {}
+
+    def floors_for(self, building_id):
+        return self.floors.get(building_id, [])
+
+    def etag(self, key, payload):
+        """ETag for the response ``key`` built from this snapshot, computed once."""
+        tag = self._etags.get(key)
+        if tag is None:
+            tag = self._etags[key] = etag_for(payload)
+        return tag
+
+
+def etag_for(payload):
+    """Strong ETag derived from the response body, so it survives restarts and resets."""
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha1(body).hexdigest()
+
+
+class CatalogCache:
+    """Per-process catalog snapshot, reloaded when the data version moves."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._snapshot = None
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, conn):
+        """Return the current CatalogSnapshot, reloading it if the catalog changed."""
+        row = conn.execute("SELECT version FROM DataVersion WHERE name = 'catalog'").fetchone()
+        version = row[0] if row else 0
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._snapshot = None
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == version:
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+
+        buildings = [dict(row) for row in conn.execute("""
+            SELECT building_id, name, address, is_no_stair
+            FROM   Buildings
+            ORDER  BY name
+        """)]
+        rooms = [dict(row) for row in conn.execute("""
+            SELECT r.room_id, r.building_id, r.room_num, r.capacity, r.floor, r.is_aca_compliant,
+                   b.name AS building_name
+            FROM   Rooms r
+            JOIN   Buildings b ON b.building_id = r.building_id
+            ORDER  BY b.name, r.floor, r.room_num, r.room_id
+        """)]
+        snapshot = CatalogSnapshot(version, buildings, rooms)
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self._snapshot.version if self._snapshot else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "not_modified": self.not_modified,
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(database):
+    """Return the process-wide catalog cache for ``database``."""
+    with _caches_lock:
+        cache = _caches.get(database)
+        if cache is None:
+            cache = CatalogCache()
+            _caches[database] = cache
+        return cache
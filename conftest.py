@@ -0,0 +1,33 @@
+"""
+Shared pytest fixtures.
+"""
+
+import pytest
+
+import migrate
+from app import app as flask_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    """The Flask app pointed at a freshly migrated and seeded throwaway database."""
+    database = str(tmp_path / "test.db")
+    migrate.upgrade(database, log=lambda *a: None)
+    original = flask_app.config["DATABASE"]
+    flask_app.config.update(DATABASE=database, TESTING=True)
+    yield flask_app
+    flask_app.config.update(DATABASE=original, TESTING=False)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(client):
+    with client.session_transaction() as session:
+        session['is_admin'] = True
+        session['admin_username'] = 'admin'
+        session['admin_id'] = 1
+    return client
@@ -0,0 +1,289 @@
+"""
+SQLite connection management for the Building Reservation System.
+
+Each Gunicorn worker keeps a small pool of warm connections so requests no
+longer pay the connect / schema parse / page-cache warmup cost on every hit.
+Connections are tuned once when they are opened, handed out through Flask's
+application context (``g``) and returned to the pool on teardown.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from flask import current_app, g
+
+# Applied once per physical connection, right after it is opened
+CONNECTION_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("mmap_size", 268435456),   # 256 MB memory-mapped I/O
+    ("cache_size", -16000),     # negative = KiB, so ~16 MB page cache
+    ("busy_timeout", 5000),     # milliseconds to wait on a locked database
+)
+
+# The SQL here uses RETURNING (3.35) and the JSON ->> operator (3.38)
+MIN_SQLITE_VERSION = (3, 38, 0)
+if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+    raise RuntimeError(f"SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer is required, "
+                       f"found {sqlite3.sqlite_version}")
+
+DEFAULT_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 8))
+DEFAULT_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))
+
+
+# ---------- query tracing ----------
+# A tracer is any object with record_query(sql, seconds, rows, count=True). It is bound to
+# the current thread for the length of one request (see metrics.py), so
+# connections used outside a traced request pay only an attribute lookup.
+_trace = threading.local()
+
+
+def start_trace(tracer):
+    _trace.tracer = tracer
+
+
+def stop_trace():
+    _trace.tracer = None
+
+
+def _tracer():
+    return getattr(_trace, "tracer", None)
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that reports statement time and rows fetched to the active tracer."""
+
+    _sql = None
+
+    def execute(self, sql, parameters=()):
+        tracer = _tracer()
+        if tracer is None:
+            return super().execute(sql, parameters)
+        self._sql = sql
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            tracer.record_query(sql, time.perf_counter() - started, 0)
+
+    def executemany(self, sql, seq_of_parameters):
+        tracer = _tracer()
+        if tracer is None:
+            return super().executemany(sql, seq_of_parameters)
+        self._sql = None
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            tracer.record_query(sql, time.perf_counter() - started, 0)
+
+    def _fetched(self, rows):
+        tracer = _tracer()
+        if tracer is not None and self._sql is not None and rows:
+            tracer.record_query(self._sql, 0.0, rows, count=False)
+
+    def fetchone(self):
+        row = super().fetchone()
+        self._fetched(row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self._fetched(len(rows))
+        return rows
+
+    def __next__(self):
+        row = super().__next__()
+        self._fetched(1)
+        return row
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute shortcuts) are traced."""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    # The C implementations of these shortcuts bypass cursor(), so route them through it.
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connect(database):
+    """Open a new tuned connection with dict-like row access."""
+    conn = sqlite3.connect(database, check_same_thread=False, factory=TracedConnection)
+    conn.row_factory = sqlite3.Row  # This allows dict-like access to rows
+    for name, value in CONNECTION_PRAGMAS:
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+class ConnectionPool:
+    """Bounded LIFO pool of warm SQLite connections for a single database file."""
+
+    def __init__(self, database, max_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT):
+        self.database = database
+        self.max_size = max_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # Connections must never cross a fork, so every process starts empty
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._in_use = 0
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.connect_time = 0.0
+        self.max_connect_time = 0.0
+
+    def acquire(self):
+        """Return a connection, reusing an idle one whenever possible."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            try:
+                conn = self._idle.get_nowait()
+                self.hits += 1
+                self._in_use += 1
+                return conn
+            except queue.Empty:
+                pass
+            if self._created < self.max_size:
+                self._created += 1
+                self.misses += 1
+                self._in_use += 1
+                create = True
+            else:
+                create = False
+
+        if create:
+            started = time.perf_counter()
+            try:
+                conn = connect(self.database)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                    self._in_use -= 1
+                raise
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.connect_time += elapsed
+                self.max_connect_time = max(self.max_connect_time, elapsed)
+            return conn
+
+        # Pool exhausted: wait for another request to hand a connection back
+        started = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"Timed out after {self.timeout}s waiting for a database connection"
+            )
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.hits += 1
+            self.waits += 1
+            self.wait_time += waited
+            self.max_wait_time = max(self.max_wait_time, waited)
+            self._in_use += 1
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool, discarding any open transaction."""
+        with self._lock:
+            foreign = self._pid != os.getpid()
+            if not foreign:
+                self._in_use -= 1
+        if foreign:
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Broken connection: drop it so a fresh one can be opened later
+            with self._lock:
+                self._created -= 1
+            conn.close()
+            return
+        self._idle.put(conn)
+
+    def close_all(self):
+        """Close every idle connection (used by tests and on shutdown)."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "database": self.database,
+                "max_size": self.max_size,
+                "open": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / requests, 4) if requests else None,
+                "waits": self.waits,
+                "wait_time_total_ms": round(self.wait_time * 1000, 3),
+                "wait_time_max_ms": round(self.max_wait_time * 1000, 3),
+                "connect_time_total_ms": round(self.connect_time * 1000, 3),
+                "connect_time_max_ms": round(self.max_connect_time * 1000, 3),
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(database):
+    """Return the process-wide pool for ``database``, creating it on first use."""
+    with _pools_lock:
+        pool = _pools.get(database)
+        if pool is None:
+            pool = ConnectionPool(database)
+            _pools[database] = pool
+        return pool
+
+
+def get_db():
+    """Return the connection bound to the current app context."""
+    if "db" not in g:
+        g.db_pool = get_pool(current_app.config["DATABASE"])
+        g.db = g.db_pool.acquire()
+    return g.db
+
+
+def close_db(exc=None):
+    """Teardown hook: hand the app-context connection back to its pool."""
+    conn = g.pop("db", None)
+    pool = g.pop("db_pool", None)
+    if conn is not None and pool is not None:
+        pool.release(conn)
+
+
+def init_app(app):
+    app.teardown_appcontext(close_db)
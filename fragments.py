@@ -0,0 +1,116 @@
+"""
+Rendered-fragment cache for admin pages.
+
+Admin pages re-render the same tables over and over although their data
+only changes through writes that already bump a version: the ``catalog``
+counter in ``DataVersion`` for buildings and rooms, and the
+``ReservationChanges`` log for each (room, date) cell of the schedule. Each
+worker keeps the rendered HTML of those sub-blocks in an LRU keyed by the
+version they were rendered from, so an unchanged block is a dict lookup.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from markupsafe import Markup
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get("FRAGMENT_CACHE_SIZE", 4096))
+
+
+class FragmentCache:
+    """Per-process LRU of rendered HTML fragments."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the fragment cached under ``key``, or None."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._entries.clear()
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key, html):
+        """Cache rendered ``html`` under ``key`` and return it as Markup."""
+        html = Markup(html)
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return html
+
+    def render(self, key, render):
+        """Return the fragment cached under ``key``, calling ``render()`` to build it on a miss."""
+        html = self.get(key)
+        if html is None:
+            html = self.put(key, render())
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+def cell_versions(conn, room_id, first_date, last_date):
+    """Version stamp of every (room, date) cell in a date range.
+
+    Returns ``(stamp, versions)``: ``versions`` maps each date that has
+    change-log entries to its newest change_id, and ``stamp`` identifies the
+    database file and how far the log has been pruned. Pruning can erase a
+    cell's newest entry, so it must invalidate fragments keyed on it. An
+    empty log (e.g. right after a bulk seed) reports the id its first entry
+    will get, so that first write does not look like a prune.
+    """
+    row = conn.execute("""
+        SELECT (SELECT version FROM DataVersion WHERE name = 'instance'),
+               COALESCE((SELECT MIN(change_id) FROM ReservationChanges),
+                        (SELECT seq + 1 FROM sqlite_sequence WHERE name = 'ReservationChanges'),
+                        1)
+    """).fetchone()
+    versions = dict(conn.execute("""
+        SELECT slot_date, MAX(change_id)
+        FROM   ReservationChanges
+        WHERE  room_id = ?
+          AND  slot_date BETWEEN ? AND ?
+        GROUP  BY slot_date
+    """, (room_id, first_date, last_date)).fetchall())
+    return (row[0], row[1]), versions
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(database):
+    """Return the process-wide fragment cache for ``database``."""
+    with _caches_lock:
+        cache = _caches.get(database)
+        if cache is None:
+            cache = FragmentCache()
+            _caches[database] = cache
+        return cache
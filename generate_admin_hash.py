@@ -33,7 +33,7 @@ def generate_hash():
     print("-" * 40)
     print("\nTo insert this admin into the database, run:")
     print(f"INSERT INTO Admins (username, password_hash) VALUES ('your_username', '{hash_string}');")
-    print("\nOr update seed.sql with this hash.")
+    print("\nOr update ADMIN in seed.py with this hash.")
 
 if __name__ == '__main__':
     generate_hash()
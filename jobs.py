@@ -0,0 +1,327 @@
+"""
+Background job queue for the Building Reservation System.
+
+Admin writes that touch more than ``ASYNC_ROW_THRESHOLD`` rows (bulk
+moderation, large recurring series) do not run inside the request: the
+route records a ``Jobs`` row (see migrations/0014_jobs.sql) and returns at
+once. Each worker runs ``JOB_WORKERS`` (app config) daemon threads that
+claim queued jobs under the write lock, so every job runs once across all
+workers, and write their progress into the row as they go. ``/admin/jobs/<id>`` serves that
+row and the dashboard polls it until the job finishes.
+
+A job whose worker died stops updating ``heartbeat``; after
+``JOB_STALE_SECONDS`` it is claimed again, up to ``JOB_MAX_ATTEMPTS`` times,
+and then marked failed.
+Handlers are safe to rerun: moderation only touches rows still pending,
+and a series that already went in conflicts with itself and adds nothing.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+
+import availability
+import booking
+import db
+
+logger = logging.getLogger("scheduler.jobs")
+
+# Seconds an idle job thread sleeps before looking for work queued by another worker
+JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", 1.0))
+# A running job whose heartbeat is this old is assumed dead and run again
+JOB_STALE_SECONDS = 300
+# How often a running job's heartbeat is refreshed, whatever its handler is doing
+JOB_HEARTBEAT_SECONDS = 30
+JOB_MAX_ATTEMPTS = 3
+# Reservations moderated per transaction, so the write lock is never held for long
+JOB_BATCH_SIZE = int(os.environ.get("JOB_BATCH_SIZE", 1000))
+# Finished jobs kept for the dashboard; older ones are pruned
+JOB_KEEP = 1000
+
+
+# ---------- handlers ----------
+# Each takes (conn, params, progress) and returns a JSON-able report;
+# progress(done, total) records how far it got.
+
+def _moderate(conn, params, progress):
+    ids = booking.pending_ids(conn, **params["filters"])
+    report = {"updated": 0}
+    progress(0, len(ids))
+    for first in range(0, len(ids), JOB_BATCH_SIZE):
+        batch = booking.moderate(conn, params["action"], reservation_ids=ids[first:first + JOB_BATCH_SIZE])
+        report["updated"] += batch["updated"]
+        progress(min(first + JOB_BATCH_SIZE, len(ids)), len(ids))
+    return report
+
+
+def _create_series(conn, params, progress):
+    dates = [date.fromisoformat(day) for day in params["dates"]]
+    report = booking.create_series(conn, params["room_id"], params["reserved_by"], dates,
+                                   params["start_hour"], params["end_hour"], params["status"],
+                                   interval=params.get("interval", False))
+    progress(report["requested"], report["requested"])
+    conflicts = report.pop("conflicts")
+    return {**report, "conflicts": len(conflicts),
+            "first_conflicts": [(c["slot_date"], c["slot_hour"]) for c in conflicts[:5]]}
+
+
+def _delete_series(conn, params, progress):
+    deleted = booking.delete_series(conn, params["series_id"], params["from_date"])
+    progress(deleted, deleted)
+    return {"deleted": deleted}
+
+
+HANDLERS = {
+    "moderate": _moderate,
+    "create_series": _create_series,
+    "delete_series": _delete_series,
+}
+
+
+# ---------- queue ----------
+
+def enqueue(conn, kind, params, total=None, created_by=None):
+    """Record a queued job and return its id."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    cur = conn.execute(
+        "INSERT INTO Jobs (kind, params, total, created_by) VALUES (?, ?, ?, ?)",
+        (kind, json.dumps(params), total, created_by),
+    )
+    conn.commit()
+    return cur.lastrowid
+
+
+def claim(conn, stale_seconds=JOB_STALE_SECONDS):
+    """Mark the oldest runnable job as running and return it, or None when the queue is empty.
+
+    Stale jobs that already used ``JOB_MAX_ATTEMPTS`` are marked failed in
+    the same transaction rather than left running.
+    """
+    stale = f"-{int(stale_seconds)} seconds"
+    booking.begin_immediate(conn)
+    try:
+        conn.execute("""
+            UPDATE Jobs
+            SET    status = 'failed', finished_at = CURRENT_TIMESTAMP,
+                   error = 'Gave up after ' || attempts || ' attempts: the worker stopped responding'
+            WHERE  status = 'running' AND heartbeat < datetime('now', ?) AND attempts >= ?
+        """, (stale, JOB_MAX_ATTEMPTS))
+        row = conn.execute("""
+            UPDATE Jobs
+            SET    status = 'running', attempts = attempts + 1,
+                   started_at = CURRENT_TIMESTAMP, heartbeat = CURRENT_TIMESTAMP
+            WHERE  job_id = (
+                       SELECT job_id FROM (
+                           SELECT job_id FROM Jobs WHERE status = 'queued'
+                           UNION ALL
+                           SELECT job_id FROM Jobs
+                           WHERE  status = 'running' AND heartbeat < datetime('now', ?) AND attempts < ?
+                       )
+                       ORDER BY job_id
+                       LIMIT 1
+                   )
+            RETURNING job_id, kind, params
+        """, (stale, JOB_MAX_ATTEMPTS)).fetchone()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return dict(row) if row else None
+
+
+def get_job(conn, job_id):
+    """The job row as a dict with ``result`` decoded, or None."""
+    row = conn.execute("""
+        SELECT job_id, kind, status, progress, total, attempts, result, error, created_by,
+               created_at, started_at, heartbeat, finished_at
+        FROM   Jobs
+        WHERE  job_id = ?
+    """, (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = dict(row)
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def recent_jobs(conn, limit=10):
+    """Queued and running jobs, then the newest finished ones, newest first."""
+    return [dict(row) for row in conn.execute("""
+        SELECT * FROM (
+            SELECT job_id, kind, status, progress, total, error, created_at, finished_at
+            FROM   Jobs
+            WHERE  status IN ('queued', 'running')
+            UNION ALL
+            SELECT * FROM (
+                SELECT job_id, kind, status, progress, total, error, created_at, finished_at
+                FROM   Jobs
+                WHERE  status IN ('done', 'failed')
+                ORDER  BY job_id DESC
+                LIMIT  ?
+            )
+        )
+        ORDER BY job_id DESC
+        LIMIT ?
+    """, (limit, limit))]
+
+
+def _heartbeat(database, job_id, stop):
+    """Keep ``job_id``'s heartbeat fresh until ``stop`` is set.
+
+    Series handlers report progress only once they finish, so without this
+    a long job would look dead and be claimed again while still running.
+    """
+    conn = db.connect(database)
+    try:
+        while not stop.wait(JOB_HEARTBEAT_SECONDS):
+            try:
+                conn.execute("UPDATE Jobs SET heartbeat = CURRENT_TIMESTAMP WHERE job_id = ? AND status = 'running'",
+                             (job_id,))
+                conn.commit()
+            except sqlite3.OperationalError:
+                conn.rollback()
+                logger.warning("Could not refresh the heartbeat of job %d", job_id)
+    finally:
+        conn.close()
+
+
+def run(conn, job, database):
+    """Run one claimed job to completion, recording progress and the outcome."""
+    job_id = job["job_id"]
+
+    def progress(done, total):
+        conn.execute("UPDATE Jobs SET progress = ?, total = ?, heartbeat = CURRENT_TIMESTAMP WHERE job_id = ?",
+                     (done, total, job_id))
+        conn.commit()
+
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(database, job_id, stop), name=f"job-{job_id}", daemon=True)
+    beat.start()
+    try:
+        result = HANDLERS[job["kind"]](conn, json.loads(job["params"]), progress)
+    except Exception as exc:
+        conn.rollback()
+        logger.exception("Job %d (%s) failed", job_id, job["kind"])
+        conn.execute("UPDATE Jobs SET status = 'failed', error = ?, finished_at = CURRENT_TIMESTAMP "
+                     "WHERE job_id = ?", (str(exc), job_id))
+        ok = False
+    else:
+        conn.execute("UPDATE Jobs SET status = 'done', result = ?, finished_at = CURRENT_TIMESTAMP "
+                     "WHERE job_id = ?", (json.dumps(result), job_id))
+        ok = True
+    finally:
+        stop.set()
+        beat.join()
+    conn.commit()
+
+    # Pick up the writes in this worker's availability index, as the routes do;
+    # the job is already finished, so a failure here must not leave it running
+    try:
+        availability.get_index(database).after_write(conn)
+    except Exception:
+        logger.exception("Refreshing the availability index after job %d failed", job_id)
+    return ok
+
+
+def prune(conn, keep=JOB_KEEP):
+    """Delete all but the newest ``keep`` finished jobs."""
+    conn.execute("""
+        DELETE FROM Jobs
+        WHERE  status IN ('done', 'failed')
+          AND  job_id < (SELECT COALESCE(MIN(job_id), 0) FROM (
+                   SELECT job_id FROM Jobs WHERE status IN ('done', 'failed') ORDER BY job_id DESC LIMIT ?
+               ))
+    """, (keep,))
+    conn.commit()
+
+
+class JobRunner:
+    """Per-process pool of threads that claim and run queued jobs."""
+
+    def __init__(self, database):
+        self.database = database
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+        self.workers = 0
+        self.completed = 0
+        self.failed = 0
+        self.errors = 0
+
+    def ensure_started(self, workers):
+        """Start the job threads in this process if they are not running yet."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            # Threads do not survive a fork, so every worker starts its own
+            if self._pid != os.getpid():
+                self.workers = workers
+                for n in range(workers):
+                    threading.Thread(target=self._loop, name=f"jobs-{n}", daemon=True).start()
+                self._pid = os.getpid()
+
+    def notify(self):
+        """Wake an idle thread in this process for a job just queued."""
+        self._wake.set()
+
+    def run_next(self, conn=None):
+        """Claim and run one job; return its id, or None when nothing was queued."""
+        own = conn is None
+        conn = conn or db.connect(self.database)
+        try:
+            job = claim(conn)
+            if job is None:
+                return None
+            ok = run(conn, job, self.database)
+            with self._lock:
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            if (self.completed + self.failed) % 100 == 0:
+                prune(conn)
+            return job["job_id"]
+        finally:
+            if own:
+                conn.close()
+
+    def _loop(self):
+        conn = db.connect(self.database)
+        while True:
+            try:
+                if self.run_next(conn) is None:
+                    self._wake.wait(JOB_POLL_SECONDS)
+                    self._wake.clear()
+            except Exception:
+                self.errors += 1
+                logger.exception("Job runner failed")
+                time.sleep(JOB_POLL_SECONDS)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "running": self._pid == os.getpid(),
+                "workers": self.workers,
+                "completed": self.completed,
+                "failed": self.failed,
+                "errors": self.errors,
+            }
+
+
+_runners = {}
+_runners_lock = threading.Lock()
+
+
+def get_runner(database):
+    """Return the process-wide job runner for ``database``."""
+    with _runners_lock:
+        runner = _runners.get(database)
+        if runner is None:
+            runner = JobRunner(database)
+            _runners[database] = runner
+        return runner
@@ -0,0 +1,207 @@
+"""
+Hot-path instrumentation for the Building Reservation System.
+
+Every request is timed into a per-route latency histogram. A sampled share
+of requests (``METRICS_SAMPLE_RATE``) also traces its SQL through the
+connection layer in db.py, which adds per-statement counts, time and rows
+returned, and - with ``METRICS_LOG=true`` - writes one JSON line per sampled
+request to the ``scheduler.metrics`` logger.
+
+Everything is kept in memory per worker process and exposed in the
+Prometheus text format by ``/metrics``, so a scraper sees one worker per
+scrape, as with ``/admin/db-stats``.
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+
+from flask import g, request
+
+import db
+
+ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+SAMPLE_RATE = float(os.environ.get("METRICS_SAMPLE_RATE", 1.0))
+LOG_REQUESTS = os.environ.get("METRICS_LOG", "false").lower() == "true"
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Distinct statements tracked before new ones are folded into "other"
+MAX_STATEMENTS = 500
+STATEMENT_LENGTH = 200
+
+logger = logging.getLogger("scheduler.metrics")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """Collapse whitespace so the same statement from different call sites shares a series."""
+    return _WHITESPACE.sub(" ", sql).strip()[:STATEMENT_LENGTH]
+
+
+class Registry:
+    """Per-process request histograms and SQL statement counters."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS, max_statements=MAX_STATEMENTS):
+        self.buckets = buckets
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._routes = {}         # (route, method, status) -> [bucket counts..., count, sum]
+        self._statements = {}     # sql -> [count, seconds, rows]
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._routes.clear()
+            self._statements.clear()
+
+    def observe_request(self, route, method, status, seconds):
+        with self._lock:
+            self._check_pid()
+            series = self._routes.get((route, method, status))
+            if series is None:
+                series = self._routes[(route, method, status)] = [0] * (len(self.buckets) + 2)
+            for position, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[position] += 1
+                    break
+            series[-2] += 1
+            series[-1] += seconds
+
+    def observe_query(self, sql, seconds, rows, count=True):
+        with self._lock:
+            self._check_pid()
+            series = self._statements.get(sql)
+            if series is None:
+                if len(self._statements) >= self.max_statements:
+                    sql = "other"
+                series = self._statements.setdefault(sql, [0, 0.0, 0])
+            if count:
+                series[0] += 1
+            series[1] += seconds
+            series[2] += rows
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._statements.clear()
+
+    def snapshot(self):
+        """Copies of the request and statement series, safe to read without the lock."""
+        with self._lock:
+            self._check_pid()
+            return ({key: list(value) for key, value in self._routes.items()},
+                    {key: list(value) for key, value in self._statements.items()})
+
+    def render(self, gauges=None):
+        """Prometheus text exposition of the registry plus ``gauges`` ({group: stats dict})."""
+        routes, statements = self.snapshot()
+        lines = [
+            "# HELP scheduler_request_duration_seconds Request latency by route.",
+            "# TYPE scheduler_request_duration_seconds histogram",
+        ]
+        for (route, method, status), series in sorted(routes.items()):
+            labels = f'route="{_escape(route)}",method="{method}",status="{status}"'
+            cumulative = 0
+            for bound, hits in zip(self.buckets, series):
+                cumulative += hits
+                lines.append(f'scheduler_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'scheduler_request_duration_seconds_bucket{{{labels},le="+Inf"}} {series[-2]}')
+            lines.append(f"scheduler_request_duration_seconds_count{{{labels}}} {series[-2]}")
+            lines.append(f"scheduler_request_duration_seconds_sum{{{labels}}} {series[-1]:.6f}")
+
+        for name, column, kind, help_text in (
+            ("scheduler_sql_queries_total", 0, "counter", "Statements executed in sampled requests."),
+            ("scheduler_sql_query_seconds_total", 1, "counter", "Time spent executing each statement."),
+            ("scheduler_sql_rows_total", 2, "counter", "Rows fetched from each statement."),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sql, series in sorted(statements.items()):
+                value = series[column]
+                value = f"{value:.6f}" if isinstance(value, float) else value
+                lines.append(f'{name}{{statement="{_escape(sql)}"}} {value}')
+
+        for group, stats in (gauges or {}).items():
+            for key, value in sorted(stats.items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"scheduler_{group}_{key}"
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RequestTrace:
+    """SQL tracer for one sampled request; feeds the registry and the request log."""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.rows = 0
+
+    def record_query(self, sql, seconds, rows, count=True):
+        if count:
+            self.queries += 1
+        self.query_seconds += seconds
+        self.rows += rows
+        self.registry.observe_query(normalize_sql(sql), seconds, rows, count)
+
+
+registry = Registry()
+
+
+def _before_request():
+    g.metrics_started = time.perf_counter()
+    if SAMPLE_RATE >= 1.0 or random.random() < SAMPLE_RATE:
+        g.metrics_trace = RequestTrace(registry)
+        db.start_trace(g.metrics_trace)
+
+
+def _after_request(response):
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    registry.observe_request(route, request.method, response.status_code, elapsed)
+    trace = g.get("metrics_trace")
+    if trace is not None and LOG_REQUESTS:
+        logger.info(json.dumps({
+            "route": route,
+            "method": request.method,
+            "status": response.status_code,
+            "ms": round(elapsed * 1000, 3),
+            "queries": trace.queries,
+            "query_ms": round(trace.query_seconds * 1000, 3),
+            "rows": trace.rows,
+        }))
+    return response
+
+
+def _teardown_request(exc=None):
+    # Runs after a streamed body has been sent, so its queries are traced too.
+    if g.pop("metrics_trace", None) is not None:
+        db.stop_trace()
+
+
+def init_app(app):
+    if not ENABLED:
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
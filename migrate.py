@@ -0,0 +1,255 @@
+"""
+Versioned schema migrations for the Building Reservation System.
+
+Migrations live in ``migrations/`` as ``NNNN_description.sql`` scripts or
+``NNNN_description.py`` modules exposing ``upgrade(conn)``. Long data copies
+can expose ``upgrade_online(conn, log)`` instead: it commits its own batches
+so other processes keep writing, and returns with its final transaction
+still open. Applied versions are recorded in ``schema_version`` so startup
+only runs what is missing.
+Upgrades hold an exclusive lock file next to the database, so several
+Gunicorn workers can boot at once without racing each other.
+"""
+
+import importlib.util
+import os
+import re
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+import archive
+import db
+import seed
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATIONS_DIR = os.path.join(BASE_DIR, "migrations")
+
+_MIGRATION_NAME = re.compile(r"^(\d{4})_[\w-]+\.(sql|py)$")
+
+SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version     INTEGER PRIMARY KEY,
+        name        TEXT NOT NULL,
+        applied_at  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+class FileLock:
+    """Exclusive advisory lock on ``path`` that works on POSIX and Windows."""
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = None
+
+    def __enter__(self):
+        self._fh = open(self.path, "a+")
+        if os.name == "nt":
+            import msvcrt
+            while True:
+                try:
+                    self._fh.seek(0)
+                    msvcrt.locking(self._fh.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        else:
+            import fcntl
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if os.name == "nt":
+            import msvcrt
+            self._fh.seek(0)
+            msvcrt.locking(self._fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+        self._fh.close()
+        self._fh = None
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """Return ``(version, filename, path)`` for every migration, in order."""
+    found = []
+    for filename in os.listdir(directory):
+        match = _MIGRATION_NAME.match(filename)
+        if match:
+            found.append((int(match.group(1)), filename, os.path.join(directory, filename)))
+    found.sort()
+    versions = [version for version, _, _ in found]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions in {directory}")
+    return found
+
+
+def applied_versions(conn):
+    """Return the set of versions recorded in schema_version (empty if none)."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if not exists:
+        return set()
+    return {row[0] for row in conn.execute("SELECT version FROM schema_version")}
+
+
+def pending_migrations(conn, directory=MIGRATIONS_DIR):
+    done = applied_versions(conn)
+    return [m for m in discover(directory) if m[0] not in done]
+
+
+def _apply(conn, version, filename, path, log=print):
+    try:
+        if path.endswith(".sql"):
+            with open(path, "r", encoding="utf-8") as f:
+                # executescript commits implicitly, so open the transaction inside the script
+                conn.executescript("BEGIN;\n" + f.read())
+        else:
+            spec = importlib.util.spec_from_file_location(f"migration_{version:04d}", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            if hasattr(module, "upgrade_online"):
+                # The version row commits together with the migration's last step
+                module.upgrade_online(conn, log)
+            else:
+                conn.execute("BEGIN")
+                module.upgrade(conn)
+        conn.execute(
+            "INSERT INTO schema_version (version, name) VALUES (?, ?)", (version, filename)
+        )
+        conn.commit()
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+
+
+def upgrade(database, directory=MIGRATIONS_DIR, seed_data=True, log=print):
+    """Apply every pending migration to ``database`` and return the versions applied.
+
+    A brand-new database is also loaded with the sample data from seed.py
+    (unless ``seed_data`` is false) once its schema is in place. Databases
+    that are already current return after a single lookup without touching
+    the lock file, so worker start-up cost does not depend on how much data
+    has accumulated.
+    """
+    conn = db.connect(database)
+    try:
+        if not pending_migrations(conn, directory):
+            return []
+    finally:
+        conn.close()
+
+    with FileLock(database + ".lock"):
+        conn = db.connect(database)
+        try:
+            # Another worker may have finished the upgrade while we waited
+            pending = pending_migrations(conn, directory)
+            if not pending:
+                return []
+
+            is_new = not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Buildings'"
+            ).fetchone()
+
+            conn.execute(SCHEMA_VERSION_TABLE)
+            conn.commit()
+            for version, filename, path in pending:
+                started = time.perf_counter()
+                _apply(conn, version, filename, path, log)
+                log(f"Applied migration {filename} ({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+            if is_new and seed_data:
+                seed.load(conn)
+                log("Database initialized with sample data!")
+
+            return [version for version, _, _ in pending]
+        finally:
+            conn.close()
+
+
+def reset(database, directory=MIGRATIONS_DIR, seed_data=True, log=print):
+    """Delete ``database`` and rebuild it from scratch (development only)."""
+    with FileLock(database + ".lock"):
+        # WAL mode leaves sidecar files that must not outlive the database
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(database + suffix):
+                os.remove(database + suffix)
+        log("Existing database removed for fresh initialization.")
+    return upgrade(database, directory, seed_data, log)
+
+
+db_cli = AppGroup("db", help="Database schema management.")
+
+
+@db_cli.command("upgrade")
+def upgrade_command():
+    """Apply any migrations that have not run yet."""
+    applied = upgrade(current_app.config["DATABASE"], log=click.echo)
+    if not applied:
+        click.echo("Database is already up to date.")
+
+
+@db_cli.command("status")
+def status_command():
+    """List migrations and whether each has been applied."""
+    conn = db.connect(current_app.config["DATABASE"])
+    try:
+        done = applied_versions(conn)
+    finally:
+        conn.close()
+    for version, filename, _ in discover():
+        click.echo(f"[{'x' if version in done else ' '}] {filename}")
+
+
+@db_cli.command("seed")
+@click.option("--employees", type=int, default=None, help="Employees with weekly schedules (default: the 11 samples).")
+@click.option("--rooms", type=int, default=None, help="Rooms in total (default: the 13 samples).")
+@click.option("--weeks", type=int, default=8, show_default=True, help="Weeks of bookings from the coming Monday.")
+@click.option("--seed", "random_seed", type=int, default=42, show_default=True, help="Random seed for synthetic data.")
+def seed_command(employees, rooms, weeks, random_seed):
+    """Load sample or synthetic data into a freshly migrated, empty database."""
+    database = current_app.config["DATABASE"]
+    upgrade(database, seed_data=False, log=click.echo)
+    conn = db.connect(database)
+    started = time.perf_counter()
+    try:
+        counts = seed.load(conn, employees=employees, rooms=rooms, weeks=weeks, seed=random_seed)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    finally:
+        conn.close()
+    click.echo(f"Seeded {counts['reservations']} reservations for {counts['employees']} employees in "
+               f"{counts['rooms']} rooms / {counts['buildings']} buildings "
+               f"({time.perf_counter() - started:.1f}s)")
+
+
+@db_cli.command("compact")
+@click.option("--after-days", type=int, default=archive.ARCHIVE_AFTER_DAYS, show_default=True,
+              help="Archive every reservation dated at least this many days ago (0 = none).")
+@click.option("--days", type=int, default=archive.ARCHIVE_REJECTED_DAYS, show_default=True,
+              help="Archive rejected and cancelled reservations dated at least this many days ago.")
+def compact_command(after_days, days):
+    """Move past and old rejected/cancelled reservations into ReservationsArchive."""
+    conn = db.connect(current_app.config["DATABASE"])
+    try:
+        report = archive.compact(conn, after_days=after_days, rejected_days=days)
+    finally:
+        conn.close()
+    click.echo(f"Archived {report['past']} reservations dated before {report['horizon'] or '-'} and "
+               f"{report['inactive']} rejected/cancelled before {report['cutoff']} ({report['seconds']:.1f}s)")
+
+
+@db_cli.command("reset")
+@click.confirmation_option(prompt="This deletes every reservation. Continue?")
+def reset_command():
+    """Delete the database and rebuild it with sample data."""
+    reset(current_app.config["DATABASE"], log=click.echo)
+
+
+def init_app(app):
+    app.cli.add_command(db_cli)
@@ -1,7 +1,9 @@
 -- SQLite database schema for Building Reservation System
+-- Migration 0001: baseline schema. IF NOT EXISTS lets databases created before
+-- the migration runner existed adopt this version without being rebuilt.
 
 -- ---------- 1. BUILDINGS ----------
-CREATE TABLE Buildings (
+CREATE TABLE IF NOT EXISTS Buildings (
     building_id  INTEGER PRIMARY KEY AUTOINCREMENT,
     name         TEXT NOT NULL,
     address      TEXT NOT NULL,
@@ -9,7 +11,7 @@ CREATE TABLE Buildings (
 );
 
 -- ---------- 2. ROOMS ----------
-CREATE TABLE Rooms (
+CREATE TABLE IF NOT EXISTS Rooms (
     room_id           INTEGER PRIMARY KEY AUTOINCREMENT,
     building_id       INTEGER NOT NULL,
     room_num          TEXT NOT NULL,
@@ -20,10 +22,10 @@ CREATE TABLE Rooms (
 );
 
 -- Index for better performance
-CREATE INDEX idx_room_building_num ON Rooms(building_id, room_num);
+CREATE INDEX IF NOT EXISTS idx_room_building_num ON Rooms(building_id, room_num);
 
 -- ---------- 3. RESERVATIONS (1‑hour slots) ----------
-CREATE TABLE Reservations (
+CREATE TABLE IF NOT EXISTS Reservations (
     reservation_id INTEGER PRIMARY KEY AUTOINCREMENT,
     room_id        INTEGER NOT NULL,
     reserved_by    TEXT NOT NULL,
@@ -45,16 +47,16 @@ CREATE TABLE Reservations (
 );
 
 -- Indexes for performance
-CREATE INDEX idx_room_date_hour ON Reservations(room_id, slot_date, slot_hour);
-CREATE INDEX idx_status ON Reservations(status);
-CREATE INDEX idx_slot_date ON Reservations(slot_date);
+CREATE INDEX IF NOT EXISTS idx_room_date_hour ON Reservations(room_id, slot_date, slot_hour);
+CREATE INDEX IF NOT EXISTS idx_status ON Reservations(status);
+CREATE INDEX IF NOT EXISTS idx_slot_date ON Reservations(slot_date);
 
 -- Optional: If you want only approved reservations to block slots in the future, you can:
 -- 1. Remove the inline UNIQUE constraint (requires table rebuild in SQLite), and
 -- 2. Add: CREATE UNIQUE INDEX uq_approved_room_slot ON Reservations(room_id, slot_date, slot_hour) WHERE status = 'approved';
 
 -- ---------- 4. ADMINS ----------
-CREATE TABLE Admins (
+CREATE TABLE IF NOT EXISTS Admins (
     admin_id       INTEGER PRIMARY KEY AUTOINCREMENT,
     username       TEXT NOT NULL UNIQUE,
     password_hash  TEXT NOT NULL,
@@ -62,4 +64,4 @@ CREATE TABLE Admins (
 );
 
 -- Index for faster username lookups
-CREATE INDEX idx_admin_username ON Admins(username);
+CREATE INDEX IF NOT EXISTS idx_admin_username ON Admins(username);
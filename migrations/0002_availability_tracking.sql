@@ -0,0 +1,68 @@
+-- Migration 0002: change tracking for the in-memory availability index.
+-- Triggers record every reservation write and bump a catalog version when
+-- buildings or rooms change, so each worker can refresh its index
+-- incrementally no matter which process (or script) made the change.
+
+-- ---------- DATA VERSIONS ----------
+CREATE TABLE IF NOT EXISTS DataVersion (
+    name     TEXT PRIMARY KEY,
+    version  INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO DataVersion (name, version) VALUES ('catalog', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_buildings_insert_version AFTER INSERT ON Buildings
+BEGIN
+    UPDATE DataVersion SET version = version + 1 WHERE name = 'catalog';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_buildings_update_version AFTER UPDATE ON Buildings
+BEGIN
+    UPDATE DataVersion SET version = version + 1 WHERE name = 'catalog';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_buildings_delete_version AFTER DELETE ON Buildings
+BEGIN
+    UPDATE DataVersion SET version = version + 1 WHERE name = 'catalog';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rooms_insert_version AFTER INSERT ON Rooms
+BEGIN
+    UPDATE DataVersion SET version = version + 1 WHERE name = 'catalog';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rooms_update_version AFTER UPDATE ON Rooms
+BEGIN
+    UPDATE DataVersion SET version = version + 1 WHERE name = 'catalog';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rooms_delete_version AFTER DELETE ON Rooms
+BEGIN
+    UPDATE DataVersion SET version = version + 1 WHERE name = 'catalog';
+END;
+
+-- ---------- RESERVATION CHANGE LOG ----------
+-- One row per touched (room, date) cell; pruned from the front as it grows
+CREATE TABLE IF NOT EXISTS ReservationChanges (
+    change_id  INTEGER PRIMARY KEY AUTOINCREMENT,
+    room_id    INTEGER NOT NULL,
+    slot_date  DATE    NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_reservations_insert_log AFTER INSERT ON Reservations
+BEGIN
+    INSERT INTO ReservationChanges (room_id, slot_date) VALUES (NEW.room_id, NEW.slot_date);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_reservations_delete_log AFTER DELETE ON Reservations
+BEGIN
+    INSERT INTO ReservationChanges (room_id, slot_date) VALUES (OLD.room_id, OLD.slot_date);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_reservations_update_log AFTER UPDATE ON Reservations
+BEGIN
+    INSERT INTO ReservationChanges (room_id, slot_date) VALUES (NEW.room_id, NEW.slot_date);
+    INSERT INTO ReservationChanges (room_id, slot_date)
+    SELECT OLD.room_id, OLD.slot_date
+    WHERE OLD.room_id != NEW.room_id OR OLD.slot_date != NEW.slot_date;
+END;
@@ -0,0 +1,65 @@
+"""
+Migration 0003: first-class recurring series.
+
+Adds RecurringSeries and a series_id column on Reservations, then back-fills
+series from the 'Weekly:' / 'Recurring:' label convention the admin page
+used to reverse-engineer them from.
+"""
+
+from datetime import datetime
+
+
+def upgrade(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS RecurringSeries (
+            series_id    INTEGER PRIMARY KEY AUTOINCREMENT,
+            room_id      INTEGER NOT NULL,
+            reserved_by  TEXT    NOT NULL,
+            weekday      INTEGER NOT NULL CHECK (weekday BETWEEN 0 AND 6),  -- Monday=0
+            start_hour   INTEGER NOT NULL,  -- first slot, 7-19
+            end_hour     INTEGER NOT NULL,  -- exclusive, 8-20
+            start_date   DATE    NOT NULL,
+            end_date     DATE    NOT NULL,
+            status       TEXT    NOT NULL DEFAULT 'approved' CHECK (status IN ('pending', 'approved')),
+            created_at   DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (room_id) REFERENCES Rooms(room_id)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_series_end_date ON RecurringSeries(end_date)")
+
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(Reservations)")}
+    if "series_id" not in columns:
+        conn.execute(
+            "ALTER TABLE Reservations ADD COLUMN series_id INTEGER REFERENCES RecurringSeries(series_id)"
+        )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_reservations_series ON Reservations(series_id, slot_date)")
+
+    # Back-fill: one series per label, room, weekday and status, as the old listing grouped them
+    groups = conn.execute("""
+        SELECT reserved_by, room_id, status,
+               CAST(strftime('%w', slot_date) AS INTEGER) AS sql_weekday,
+               MIN(slot_date) AS start_date, MAX(slot_date) AS end_date,
+               MIN(slot_hour) AS start_hour, MAX(slot_hour) + 1 AS end_hour
+        FROM   Reservations
+        WHERE  series_id IS NULL
+          AND  status IN ('pending', 'approved')
+          AND  (reserved_by LIKE 'Weekly:%' OR reserved_by LIKE 'Recurring:%')
+        GROUP  BY reserved_by, room_id, status, sql_weekday
+    """).fetchall()
+
+    for reserved_by, room_id, status, sql_weekday, start_date, end_date, start_hour, end_hour in groups:
+        weekday = datetime.strptime(start_date, "%Y-%m-%d").date().weekday()
+        cur = conn.execute("""
+            INSERT INTO RecurringSeries
+                (room_id, reserved_by, weekday, start_hour, end_hour, start_date, end_date, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (room_id, reserved_by, weekday, start_hour, end_hour, start_date, end_date, status))
+        conn.execute("""
+            UPDATE Reservations
+            SET    series_id = ?
+            WHERE  series_id IS NULL
+              AND  reserved_by = ?
+              AND  room_id = ?
+              AND  status = ?
+              AND  CAST(strftime('%w', slot_date) AS INTEGER) = ?
+        """, (cur.lastrowid, reserved_by, room_id, status, sql_weekday))
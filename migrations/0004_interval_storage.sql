@@ -0,0 +1,62 @@
+-- Migration 0004: interval reservation storage.
+-- A reservation row now covers the slots slot_hour .. end_hour - 1. Hourly rows
+-- (the default storage mode) simply have end_hour = slot_hour + 1, while
+-- interval mode (RESERVATION_STORAGE=interval) writes one row per booking.
+
+ALTER TABLE Reservations ADD COLUMN end_hour INTEGER CHECK (end_hour IS NULL OR (end_hour > slot_hour AND end_hour <= 20));
+
+UPDATE Reservations SET end_hour = slot_hour + 1 WHERE end_hour IS NULL;
+
+-- Safety net for writers that do not set end_hour yet
+CREATE TRIGGER IF NOT EXISTS trg_reservations_default_end AFTER INSERT ON Reservations
+WHEN NEW.end_hour IS NULL
+BEGIN
+    UPDATE Reservations SET end_hour = NEW.slot_hour + 1 WHERE reservation_id = NEW.reservation_id;
+END;
+
+-- UNIQUE(room_id, slot_date, slot_hour) only sees start hours, so overlapping
+-- active intervals are rejected here with one indexed probe per row
+CREATE TRIGGER IF NOT EXISTS trg_reservations_no_overlap BEFORE INSERT ON Reservations
+WHEN NEW.status IN ('pending', 'approved')
+BEGIN
+    SELECT RAISE(ABORT, 'Reservation overlaps an existing booking')
+    WHERE EXISTS (
+        SELECT 1 FROM Reservations
+        WHERE room_id = NEW.room_id
+          AND slot_date = NEW.slot_date
+          AND status IN ('pending', 'approved')
+          AND slot_hour < COALESCE(NEW.end_hour, NEW.slot_hour + 1)
+          AND end_hour > NEW.slot_hour
+    );
+END;
+
+-- status is watched too: moving a rejected row back to pending makes it active again
+CREATE TRIGGER IF NOT EXISTS trg_reservations_no_overlap_update
+BEFORE UPDATE OF room_id, slot_date, slot_hour, end_hour, status ON Reservations
+WHEN NEW.status IN ('pending', 'approved')
+BEGIN
+    SELECT RAISE(ABORT, 'Reservation overlaps an existing booking')
+    WHERE EXISTS (
+        SELECT 1 FROM Reservations
+        WHERE room_id = NEW.room_id
+          AND slot_date = NEW.slot_date
+          AND reservation_id != NEW.reservation_id
+          AND status IN ('pending', 'approved')
+          AND slot_hour < NEW.end_hour
+          AND end_hour > NEW.slot_hour
+    );
+END;
+
+-- ---------- HOURLY COMPATIBILITY VIEW ----------
+CREATE TABLE IF NOT EXISTS SlotHours (
+    hour  INTEGER PRIMARY KEY
+);
+
+INSERT OR IGNORE INTO SlotHours (hour) VALUES (7), (8), (9), (10), (11), (12), (13), (14), (15), (16), (17), (18), (19);
+
+-- One row per occupied hour, whichever storage mode wrote the reservation
+CREATE VIEW IF NOT EXISTS ReservationHours AS
+SELECT r.reservation_id, r.room_id, r.reserved_by, r.reserved_at, r.status,
+       r.slot_date, h.hour AS slot_hour, r.series_id
+FROM   Reservations r
+JOIN   SlotHours h ON h.hour >= r.slot_hour AND h.hour < r.end_hour;
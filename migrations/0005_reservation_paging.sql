@@ -0,0 +1,10 @@
+-- Migration 0005: keyset pagination for the admin reservations list.
+-- /admin/reservations pages newest-first on (reserved_at, reservation_id);
+-- these indexes let each page start with a seek instead of a sort.
+
+CREATE INDEX IF NOT EXISTS idx_reservations_reserved_at
+    ON Reservations(reserved_at, reservation_id);
+
+-- Same order within one status, for the Pending / Approved / Rejected tabs
+CREATE INDEX IF NOT EXISTS idx_reservations_status_reserved_at
+    ON Reservations(status, reserved_at, reservation_id);
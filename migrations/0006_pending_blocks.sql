@@ -0,0 +1,9 @@
+-- Migration 0006: dashboard block grouping.
+-- The admin dashboard groups pending reservations into consecutive-hour
+-- blocks per requester, room and date. This partial index holds only the
+-- pending queue, already in that order and covering every column the window
+-- functions read, so grouping is an index-only walk with no sort.
+
+CREATE INDEX IF NOT EXISTS idx_reservations_pending_blocks
+    ON Reservations(reserved_by, room_id, slot_date, slot_hour, end_hour)
+    WHERE status = 'pending';
@@ -0,0 +1,10 @@
+-- Migration 0007: version stamps for cached admin page fragments.
+-- A per-day schedule fragment is keyed by the newest change-log entry for its
+-- (room, date) cell, so the log gets an index to answer that with a seek.
+
+CREATE INDEX IF NOT EXISTS idx_reservation_changes_cell
+    ON ReservationChanges(room_id, slot_date, change_id);
+
+-- Random per-database stamp: change ids restart when a database is rebuilt,
+-- and fragments cached against the old file must not match the new one
+INSERT OR IGNORE INTO DataVersion (name, version) VALUES ('instance', abs(random()) % 1000000000);
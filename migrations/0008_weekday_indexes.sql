@@ -0,0 +1,18 @@
+-- Migration 0008: sargable weekday filters and composite indexes.
+-- weekday (Monday=0, matching RecurringSeries.weekday and date.weekday()) is a
+-- generated column, so a weekday filter is a plain column comparison the
+-- planner can combine with a date-range seek instead of calling strftime()
+-- inside the query.
+
+ALTER TABLE Reservations ADD COLUMN weekday INTEGER
+    GENERATED ALWAYS AS ((CAST(strftime('%w', slot_date) AS INTEGER) + 6) % 7) VIRTUAL;
+
+-- Status tabs, dashboard counters and date-bounded status filters;
+-- supersedes the single-column status index
+CREATE INDEX IF NOT EXISTS idx_reservations_status_date
+    ON Reservations(status, slot_date);
+DROP INDEX IF EXISTS idx_status;
+
+-- One room's cells over a date range, narrowed by status
+CREATE INDEX IF NOT EXISTS idx_reservations_room_date_status
+    ON Reservations(room_id, slot_date, status);
@@ -0,0 +1,132 @@
+"""
+Migration 0009: only active reservations hold a slot.
+
+The inline UNIQUE(room_id, slot_date, slot_hour) from 0001 applies to every
+status, so a rejected request kept its start hour taken, conflict checks
+had to look at rejected rows too, and cancelling meant a hard DELETE.
+SQLite cannot drop a table constraint, so Reservations is rebuilt without
+it; a partial unique index over ('pending', 'approved') takes its place and
+'cancelled' joins the allowed statuses.
+
+The rebuild runs online: rows are copied into Reservations_new in batches of
+BATCH_SIZE, each batch its own short transaction, so running workers keep
+booking while it copies. The final write transaction copies the rows added
+since, re-copies every (room, date) cell the change log saw during the copy,
+and swaps the tables.
+"""
+
+BATCH_SIZE = 20000
+
+COLUMNS = "reservation_id, room_id, reserved_by, reserved_at, status, slot_date, slot_hour, end_hour, series_id"
+
+CREATE_TABLE = """
+    CREATE TABLE Reservations_new (
+        reservation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        room_id        INTEGER NOT NULL,
+        reserved_by    TEXT NOT NULL,
+        reserved_at    DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        status         TEXT NOT NULL DEFAULT 'pending'
+                       CHECK (status IN ('pending', 'approved', 'rejected', 'cancelled')),
+        slot_date      DATE     NOT NULL,  -- e.g., '2025-08-04'
+        slot_hour      INTEGER  NOT NULL,  -- first slot, 7-19 (07:00-08:00 … 19:00-20:00)
+        end_hour       INTEGER  CHECK (end_hour IS NULL OR (end_hour > slot_hour AND end_hour <= 20)),
+        series_id      INTEGER  REFERENCES RecurringSeries(series_id),
+        weekday        INTEGER  GENERATED ALWAYS AS ((CAST(strftime('%w', slot_date) AS INTEGER) + 6) % 7) VIRTUAL,
+
+        FOREIGN KEY (room_id) REFERENCES Rooms(room_id),
+        CHECK (slot_hour BETWEEN 7 AND 19)
+    )
+"""
+
+# Replaces both the inline UNIQUE and idx_room_date_hour: conflict checks and
+# the overlap triggers filter on exactly this predicate, so they seek it and
+# never see rejected or cancelled rows
+ACTIVE_SLOT_INDEX = """
+    CREATE UNIQUE INDEX uq_reservations_active_slot
+        ON Reservations(room_id, slot_date, slot_hour)
+        WHERE status IN ('pending', 'approved')
+"""
+
+DROPPED_INDEXES = {"idx_room_date_hour"}
+
+
+def _copy_batch(conn, after, limit):
+    """Copy up to ``limit`` rows with ids above ``after``; return ``(last id, rows copied)``."""
+    last = conn.execute("""
+        SELECT MAX(reservation_id) FROM (
+            SELECT reservation_id FROM Reservations WHERE reservation_id > ? ORDER BY reservation_id LIMIT ?
+        )
+    """, (after, limit)).fetchone()[0]
+    if last is None:
+        return after, 0
+    cur = conn.execute(f"""
+        INSERT INTO Reservations_new ({COLUMNS})
+        SELECT {COLUMNS} FROM Reservations WHERE reservation_id > ? AND reservation_id <= ?
+    """, (after, last))
+    return last, cur.rowcount
+
+
+def upgrade_online(conn, log):
+    # A previous attempt may have stopped part-way through the copy
+    conn.execute("DROP TABLE IF EXISTS Reservations_new")
+    conn.execute(CREATE_TABLE)
+    conn.commit()
+
+    # Changes after this point are replayed from the log before the swap
+    since = conn.execute("SELECT COALESCE(MAX(change_id), 0) FROM ReservationChanges").fetchone()[0]
+    total = conn.execute("SELECT COUNT(*) FROM Reservations").fetchone()[0]
+    copied, last = 0, 0
+    while True:
+        last, rows = _copy_batch(conn, last, BATCH_SIZE)
+        conn.commit()
+        if not rows:
+            break
+        copied += rows
+        log(f"  copied {copied}/{total} reservations")
+
+    conn.execute("BEGIN IMMEDIATE")
+    while True:
+        last, rows = _copy_batch(conn, last, BATCH_SIZE)
+        if not rows:
+            break
+    oldest = conn.execute("SELECT MIN(change_id) FROM ReservationChanges").fetchone()[0]
+    if oldest is not None and oldest > since + 1:
+        # A worker pruned entries we needed, so the copy cannot be patched up
+        conn.execute("DELETE FROM Reservations_new")
+        conn.execute(f"INSERT INTO Reservations_new ({COLUMNS}) SELECT {COLUMNS} FROM Reservations")
+    else:
+        changed = "(SELECT room_id, slot_date FROM ReservationChanges WHERE change_id > ?)"
+        conn.execute(f"DELETE FROM Reservations_new WHERE (room_id, slot_date) IN {changed}", (since,))
+        conn.execute(f"""
+            INSERT INTO Reservations_new ({COLUMNS})
+            SELECT {COLUMNS} FROM Reservations WHERE (room_id, slot_date) IN {changed}
+        """, (since,))
+
+    # Views and triggers that name Reservations must go before the rename
+    # re-validates the schema; indexes go with the old table
+    saved = conn.execute("""
+        SELECT type, name, sql
+        FROM   sqlite_master
+        WHERE  sql IS NOT NULL
+          AND  ((type = 'index' AND tbl_name = 'Reservations')
+                OR (type IN ('trigger', 'view') AND (tbl_name = 'Reservations' OR sql LIKE '%Reservations%')))
+    """).fetchall()
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'Reservations'").fetchone()
+    for kind, name, _ in saved:
+        if kind != "index":
+            conn.execute(f"DROP {kind.upper()} {name}")
+    conn.execute("DROP TABLE Reservations")
+    conn.execute("ALTER TABLE Reservations_new RENAME TO Reservations")
+    if sequence is not None:
+        # Ids of deleted rows must never be handed out again
+        conn.execute("DELETE FROM sqlite_sequence WHERE name IN ('Reservations', 'Reservations_new')")
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('Reservations', ?)",
+                     (max(sequence[0], conn.execute("SELECT COALESCE(MAX(reservation_id), 0) "
+                                                    "FROM Reservations").fetchone()[0]),))
+
+    conn.execute(ACTIVE_SLOT_INDEX)
+    for kind, name, sql in sorted(saved, key=lambda obj: ("index", "view", "trigger").index(obj[0])):
+        if name not in DROPPED_INDEXES:
+            conn.execute(sql)
+    count = conn.execute("SELECT COUNT(*) FROM Reservations").fetchone()[0]
+    log(f"  swapped in the rebuilt Reservations table ({count} rows)")
@@ -0,0 +1,20 @@
+-- Migration 0010: cold storage for reservations that no longer matter to
+-- booking. Compaction (archive.py) moves rows here in batches so the live
+-- table and its indexes stay sized to the active schedule. Same columns as
+-- Reservations, without the triggers, checks or generated weekday.
+
+CREATE TABLE IF NOT EXISTS ReservationsArchive (
+    reservation_id INTEGER PRIMARY KEY,
+    room_id        INTEGER NOT NULL,
+    reserved_by    TEXT NOT NULL,
+    reserved_at    DATETIME NOT NULL,
+    status         TEXT NOT NULL,
+    slot_date      DATE     NOT NULL,
+    slot_hour      INTEGER  NOT NULL,
+    end_hour       INTEGER,
+    series_id      INTEGER,
+    archived_at    DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_reservations_archive_date
+    ON ReservationsArchive(slot_date);
@@ -0,0 +1,14 @@
+-- Migration 0011: indexes for admin history reads that reach into the archive.
+-- /admin/reservations UNIONs the archive when its date filter reaches back, and
+-- each arm walks newest-first on (reserved_at, reservation_id) like the live
+-- table's indexes from 0005.
+
+CREATE INDEX IF NOT EXISTS idx_reservations_archive_reserved_at
+    ON ReservationsArchive(reserved_at, reservation_id);
+
+CREATE INDEX IF NOT EXISTS idx_reservations_archive_status_reserved_at
+    ON ReservationsArchive(status, reserved_at, reservation_id);
+
+-- Status-filtered date windows (the schedule grid reaching back)
+CREATE INDEX IF NOT EXISTS idx_reservations_archive_status_date
+    ON ReservationsArchive(status, slot_date);
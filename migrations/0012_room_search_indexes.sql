@@ -0,0 +1,7 @@
+-- Migration 0012: size- and accessibility-aware room search.
+-- /search?engine=sql filters Rooms on capacity (a range), ADA compliance,
+-- building and floor; this index holds every Rooms column that query reads,
+-- so a capacity filter is a range seek that never touches the table.
+
+CREATE INDEX IF NOT EXISTS idx_rooms_search
+    ON Rooms(capacity, is_aca_compliant, building_id, floor, room_num);
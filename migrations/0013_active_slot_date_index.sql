@@ -0,0 +1,10 @@
+-- Migration 0013: next-free-slot search.
+-- /suggest reads every active reservation in a date range in date order and
+-- folds each (date, room) into one busy mask. This index is in that order and
+-- holds every column the read needs, so the scan is one ordered range walk
+-- with no table lookups and no sort. It is partial like
+-- uq_reservations_active_slot, so rejected and cancelled rows are never read.
+
+CREATE INDEX IF NOT EXISTS idx_reservations_active_date
+    ON Reservations(slot_date, room_id, slot_hour, end_hour)
+    WHERE status IN ('pending', 'approved');
@@ -0,0 +1,27 @@
+-- Migration 0014: background job queue (see jobs.py).
+-- Admin writes that touch many rows are recorded here and run by each
+-- worker's job threads instead of inside the request. A thread claims the
+-- oldest queued job under the write lock, so every job runs once across all
+-- Gunicorn workers; heartbeat lets a job whose worker died be claimed again.
+
+CREATE TABLE IF NOT EXISTS Jobs (
+    job_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind        TEXT NOT NULL,              -- handler name in jobs.HANDLERS
+    params      TEXT NOT NULL,              -- JSON arguments for the handler
+    status      TEXT NOT NULL DEFAULT 'queued'
+                CHECK (status IN ('queued', 'running', 'done', 'failed')),
+    progress    INTEGER NOT NULL DEFAULT 0, -- rows processed so far
+    total       INTEGER,                    -- rows expected, when known
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    result      TEXT,                       -- JSON report once done
+    error       TEXT,
+    created_by  TEXT,
+    created_at  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at  DATETIME,
+    heartbeat   DATETIME,
+    finished_at DATETIME
+);
+
+-- Claiming seeks the oldest queued (or stale running) job; the dashboard
+-- lists the active ones
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON Jobs(status, job_id);
@@ -0,0 +1,7 @@
+-- Migration 0015: series lookups in the archive.
+-- Deleting the rest of a recurring series trims RecurringSeries.end_date to
+-- the series' last remaining slot, which may now be an archived row. This
+-- index mirrors idx_reservations_series so that MAX(slot_date) is one seek.
+
+CREATE INDEX IF NOT EXISTS idx_reservations_archive_series
+    ON ReservationsArchive(series_id, slot_date);
@@ -0,0 +1,238 @@
+"""
+Sample and synthetic seed data for the Building Reservation System.
+
+Rows are written straight through the SQLite API with ``executemany`` in a
+single transaction. While the load runs, ``bulk_load`` relaxes durability
+PRAGMAs and drops the secondary indexes and triggers on Reservations, then
+rebuilds them once every row is in. That is far cheaper than maintaining
+them row by row, so a year of bookings for thousands of rooms loads in
+seconds.
+
+With the default parameters the data is the Couch Connector Inc sample set
+(4 buildings, 13 rooms, 11 employees on weekly schedules for 8 weeks). Larger
+``employees`` / ``rooms`` / ``weeks`` values add synthetic buildings, rooms
+and schedules so the same loader builds performance-test datasets:
+
+    flask --app app db seed --employees 20000 --rooms 5000 --weeks 52
+"""
+
+import random
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+BUILDINGS = [
+    ("Couch Connector HQ", "100 Sofa Way", 1),
+    ("Connector Collaboration Hub", "200 Cushion Blvd", 0),
+    ("Connector Logistics Annex", "210 Cushion Blvd", 1),
+    ("Couch Connector Support Center", "300 Ottoman Ave", 1),
+]
+
+# (building_id, room_num, capacity, floor, is_aca_compliant)
+ROOMS = [
+    # Couch Connector HQ (building_id: 1)
+    (1, "101", 6, 1, 1),
+    (1, "102", 8, 1, 1),
+    (1, "201", 12, 2, 1),
+    (1, "202", 4, 2, 0),
+    # Connector Collaboration Hub (building_id: 2)
+    (2, "A1", 10, 1, 1),
+    (2, "A2", 6, 1, 1),
+    (2, "B1", 8, 2, 0),
+    (2, "B2", 6, 2, 0),
+    # Connector Logistics Annex (building_id: 3)
+    (3, "L1", 8, 1, 1),
+    (3, "L2", 8, 1, 1),
+    # Couch Connector Support Center (building_id: 4)
+    (4, "S1", 4, 1, 1),
+    (4, "S2", 4, 1, 1),
+    (4, "S3", 6, 2, 0),
+]
+
+# Employee schedule data (de-identified for Couch Connector Inc)
+EMPLOYEES = [
+    # Couch Connector HQ (building_id: 1)
+    {'name': 'A Benson', 'room_id': 1, 'days': [0, 1, 2], 'hours': range(9, 13)},
+    {'name': 'C Miles', 'room_id': 2, 'days': [0, 1, 2, 3, 4], 'hours': range(13, 17)},
+    {'name': 'E Lyons', 'room_id': 3, 'days': [2, 4], 'hours': range(9, 12)},
+
+    # Connector Collaboration Hub (building_id: 2)
+    {'name': 'J Patel', 'room_id': 5, 'days': [1, 3], 'hours': range(8, 11)},
+    {'name': 'K Shaw', 'room_id': 6, 'days': [0, 2, 4], 'hours': range(10, 14)},
+    {'name': 'L Rivera', 'room_id': 8, 'days': [0, 2], 'hours': range(10, 13)},
+
+    # Connector Logistics Annex (building_id: 3)
+    {'name': 'R Singh', 'room_id': 9, 'days': [1, 3], 'hours': range(12, 16)},
+    {'name': 'T Gomez', 'room_id': 10, 'days': [0, 2, 4], 'hours': range(8, 11)},
+
+    # Couch Connector Support Center (building_id: 4)
+    {'name': 'M Chen', 'room_id': 11, 'days': [0, 1, 2, 3, 4], 'hours': range(8, 10)},
+    {'name': 'P Young', 'room_id': 12, 'days': [1, 3], 'hours': range(11, 14)},
+    {'name': 'S Ward', 'room_id': 13, 'days': [2, 4], 'hours': range(11, 15)},
+]
+
+# Default credentials: username='admin', password='admin123' (bcrypt, cost 12)
+ADMIN = ('admin', '$2b$12$tKISoYNiu9b1cWaV2S4bnOqobX74P2rk2YJeQcrlxkCci5Zmu6jgy')
+
+# Synthetic buildings hold this many rooms, spread over 4 floors
+ROOMS_PER_BUILDING = 20
+
+FIRST_HOUR = 7
+LAST_HOUR = 20   # exclusive: the last slot is 19:00-20:00
+
+
+@contextmanager
+def bulk_load(conn, table="Reservations"):
+    """Run the body as one transaction tuned for inserting many rows into ``table``.
+
+    Durability PRAGMAs are relaxed and ``table``'s secondary indexes and
+    triggers are dropped for the duration, then recreated from their saved
+    definitions before the commit. The loader is responsible for writing
+    rows those triggers would have accepted. Because the change-log triggers
+    are off, the catalog version and instance stamp are bumped at the end so
+    every worker's availability index and fragment cache start over.
+    """
+    objects = conn.execute("""
+        SELECT type, name, sql
+        FROM   sqlite_master
+        WHERE  tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL
+    """, (table,)).fetchall()
+    synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+    cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")   # 256 MB while sorting index builds
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("BEGIN")
+    try:
+        for kind, name, _ in objects:
+            conn.execute(f"DROP {kind.upper()} IF EXISTS {name}")
+        yield conn
+        # Indexes first so the triggers' own lookups have them
+        for kind, _, sql in sorted(objects, key=lambda obj: obj[0] != "index"):
+            conn.execute(sql)
+        conn.execute("UPDATE DataVersion SET version = version + 1 WHERE name = 'catalog'")
+        conn.execute("UPDATE DataVersion SET version = abs(random()) % 1000000000 WHERE name = 'instance'")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute(f"PRAGMA synchronous = {synchronous}")
+        conn.execute(f"PRAGMA cache_size = {cache_size}")
+        conn.execute("PRAGMA temp_store = DEFAULT")
+
+
+def first_monday(today=None):
+    """The Monday schedules start from: today if it is a Monday, else the next one."""
+    today = today or date.today()
+    return today + timedelta(days=(7 - today.weekday()) % 7)
+
+
+def synthetic_schedules(count, room_count, rng, taken):
+    """``count`` extra employee schedules placed where ``taken`` has no clash.
+
+    ``taken`` maps room_id to a weekly bitmask (bit ``day * 13 + hour - 7``)
+    and is updated in place. Employees who find no free room after a few
+    tries are left unscheduled.
+    """
+    span = LAST_HOUR - FIRST_HOUR
+    schedules = []
+    for n in range(1, count + 1):
+        days = sorted(rng.sample(range(5), rng.randint(1, 5)))
+        start = rng.randint(FIRST_HOUR, LAST_HOUR - 1)
+        hours = range(start, min(LAST_HOUR, start + rng.randint(1, 4)))
+        mask = sum(1 << (day * span + hour - FIRST_HOUR) for day in days for hour in hours)
+        for _ in range(8):
+            room_id = rng.randint(1, room_count)
+            if not taken.get(room_id, 0) & mask:
+                taken[room_id] = taken.get(room_id, 0) | mask
+                schedules.append({'name': f"Employee {n:05d}", 'room_id': room_id,
+                                  'days': days, 'hours': hours})
+                break
+    return schedules
+
+
+def load(conn, employees=None, rooms=None, weeks=8, seed=42, admin=True, start=None):
+    """Load the seed data into an empty, migrated database; return row counts.
+
+    ``employees`` and ``rooms`` default to the sample set and may only grow
+    it: extra rooms go into synthetic buildings and extra employees get
+    random weekly schedules in any room.
+    """
+    if conn.execute("SELECT 1 FROM Buildings LIMIT 1").fetchone():
+        raise ValueError("The database already has buildings; seed only a freshly migrated database.")
+    employees = len(EMPLOYEES) if employees is None else employees
+    rooms = len(ROOMS) if rooms is None else rooms
+    if employees < len(EMPLOYEES) or rooms < len(ROOMS):
+        raise ValueError(f"The sample data needs at least {len(EMPLOYEES)} employees and {len(ROOMS)} rooms.")
+    if weeks < 1:
+        raise ValueError("weeks must be at least 1")
+
+    rng = random.Random(seed)
+    buildings = list(BUILDINGS)
+    room_rows = list(ROOMS)
+    for n in range(rooms - len(ROOMS)):
+        building_id = len(BUILDINGS) + n // ROOMS_PER_BUILDING + 1
+        if building_id > len(buildings):
+            buildings.append((f"Building {building_id:04d}", f"{building_id} Synthetic Ave", building_id % 2))
+        floor = n % ROOMS_PER_BUILDING // (ROOMS_PER_BUILDING // 4) + 1
+        room_rows.append((building_id, f"{floor}{n % ROOMS_PER_BUILDING:02d}",
+                          rng.choice((4, 6, 8, 10, 12, 20)), floor, int(rng.random() < 0.7)))
+
+    span = LAST_HOUR - FIRST_HOUR
+    taken = {}
+    for emp in EMPLOYEES:
+        taken[emp['room_id']] = taken.get(emp['room_id'], 0) | sum(
+            1 << (day * span + hour - FIRST_HOUR) for day in emp['days'] for hour in emp['hours'])
+    schedules = EMPLOYEES + synthetic_schedules(employees - len(EMPLOYEES), rooms, rng, taken)
+
+    monday = first_monday(start)
+    series_rows = []
+    for emp in schedules:
+        for day in emp['days']:
+            series_rows.append((len(series_rows) + 1, emp['room_id'], f"Recurring: {emp['name']}", day,
+                                emp['hours'].start, emp['hours'].stop,
+                                (monday + timedelta(days=day)).isoformat(),
+                                (monday + timedelta(days=(weeks - 1) * 7 + day)).isoformat()))
+
+    dates = [(monday + timedelta(days=offset)).isoformat() for offset in range(weeks * 7)]
+    by_room = {}
+    for row in series_rows:
+        by_room.setdefault(row[1], []).append(row)
+
+    def reservation_rows():
+        # In (room, date, hour) order, so the slot index is appended to rather than split
+        for room_id in sorted(by_room):
+            rows = []
+            for series_id, _, reserved_by, day, start_hour, end_hour, _, _ in by_room[room_id]:
+                for week in range(weeks):
+                    slot_date = dates[week * 7 + day]
+                    rows.extend((room_id, reserved_by, slot_date, hour, hour + 1, series_id)
+                                for hour in range(start_hour, end_hour))
+            rows.sort(key=lambda row: (row[2], row[3]))
+            yield from rows
+
+    with bulk_load(conn):
+        conn.executemany("INSERT INTO Buildings (name, address, is_no_stair) VALUES (?, ?, ?)", buildings)
+        conn.executemany(
+            "INSERT INTO Rooms (building_id, room_num, capacity, floor, is_aca_compliant) VALUES (?, ?, ?, ?, ?)",
+            room_rows,
+        )
+        conn.executemany("""
+            INSERT INTO RecurringSeries
+                (series_id, room_id, reserved_by, weekday, start_hour, end_hour, start_date, end_date, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'approved')
+        """, series_rows)
+        conn.executemany("""
+            INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status, series_id)
+            VALUES (?, ?, ?, ?, ?, 'approved', ?)
+        """, reservation_rows())
+        if admin:
+            conn.execute("INSERT INTO Admins (username, password_hash) VALUES (?, ?)", ADMIN)
+
+    return {
+        "buildings": len(buildings),
+        "rooms": len(room_rows),
+        "employees": len(schedules),
+        "series": len(series_rows),
+        "reservations": conn.execute("SELECT COUNT(*) FROM Reservations").fetchone()[0],
+    }
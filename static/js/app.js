@@ -58,26 +58,21 @@ function initializeIndexPage() {
         dateInput.value = today;
     }
 
-    // Load buildings on page load
-    loadBuildings();
+    // Fill every dropdown from one /api/bootstrap response
+    loadBootstrap();
 
-    // Handle building change to load floors
+    // Floors come from the bootstrap data already in memory
     const buildingSelect = document.getElementById('building_id');
     if (buildingSelect) {
         buildingSelect.addEventListener('change', function() {
-            const buildingId = this.value;
-            if (buildingId) {
-                loadFloors(buildingId);
-            } else {
-                document.getElementById('floor').innerHTML = '<option value="">Any floor</option>';
-            }
+            fillFloors(this.value);
         });
     }
 
     // Handle search form submission
     searchForm.addEventListener('submit', function(e) {
         e.preventDefault();
-        if (validateTimeRange()) {
+        if (validateTimeRange() && validateWeekday()) {
             searchRooms();
         }
     });
@@ -110,35 +105,75 @@ function validateTimeRange() {
     return true;
 }
 
-function loadBuildings() {
-    fetch('/buildings')
-        .then(response => response.json())
-        .then(data => {
-            const select = document.getElementById('building_id');
-            select.innerHTML = '<option value="">Any building</option>';
-            data.buildings.forEach(building => {
-                select.innerHTML += `<option value="${building.building_id}">${building.name}</option>`;
-            });
-        })
-        .catch(error => console.error('Error loading buildings:', error));
+// Buildings, floors, hour window and weekday rules from /api/bootstrap
+let bootstrapData = null;
+
+function validateWeekday() {
+    const dateValue = document.getElementById('slot_date').value;
+    if (!bootstrapData || !dateValue) return true;
+
+    // Monday=0, matching the server's weekday numbering
+    const weekday = (new Date(dateValue + 'T00:00:00').getDay() + 6) % 7;
+    if (!bootstrapData.weekdays.bookable.includes(weekday)) {
+        const allowed = bootstrapData.weekdays.bookable.map(day => bootstrapData.weekdays.names[day]);
+        alert(`Reservations are only allowed on ${allowed[0]} through ${allowed[allowed.length - 1]}`);
+        return false;
+    }
+    return true;
 }
 
-function loadFloors(buildingId) {
-    fetch(`/floors/${buildingId}`)
+function loadBootstrap() {
+    fetch('/api/bootstrap')
         .then(response => response.json())
         .then(data => {
-            const select = document.getElementById('floor');
-            select.innerHTML = '<option value="">Any floor</option>';
-            data.floors.forEach(floor => {
-                select.innerHTML += `<option value="${floor}">Floor ${floor}</option>`;
-            });
+            bootstrapData = data;
+            fillBuildings();
+            fillHours();
         })
-        .catch(error => console.error('Error loading floors:', error));
+        .catch(error => console.error('Error loading search options:', error));
+}
+
+function fillBuildings() {
+    const select = document.getElementById('building_id');
+    select.innerHTML = '<option value="">Any building</option>';
+    bootstrapData.buildings.forEach(building => {
+        select.innerHTML += `<option value="${building.building_id}">${building.name}</option>`;
+    });
+}
+
+function fillFloors(buildingId) {
+    const select = document.getElementById('floor');
+    select.innerHTML = '<option value="">Any floor</option>';
+    if (!buildingId || !bootstrapData) return;
+    (bootstrapData.floors[buildingId] || []).forEach(floor => {
+        select.innerHTML += `<option value="${floor}">Floor ${floor}</option>`;
+    });
+}
+
+function fillHours() {
+    // Start options run first..last-1 and end options first+1..last
+    const hours = bootstrapData.hours;
+    const fill = (id, from, to) => {
+        const select = document.getElementById(id);
+        if (!select) return;
+        const current = select.value;
+        select.innerHTML = '<option value="">Select time</option>';
+        for (let hour = from; hour <= to; hour++) {
+            select.innerHTML += `<option value="${hour}">${hours.labels[hour]}</option>`;
+        }
+        select.value = current;
+    };
+    fill('start_hour', hours.first, hours.last - 1);
+    fill('end_hour', hours.first + 1, hours.last);
 }
 
+// The server ranks matches, so only the best ones need to come back
+const SEARCH_LIMIT = 24;
+
 function searchRooms() {
     const formData = new FormData(document.getElementById('searchForm'));
     const params = new URLSearchParams(formData);
+    params.set('limit', SEARCH_LIMIT);
     
     document.getElementById('searchResults').innerHTML = `
         <div class="text-center py-3">
@@ -195,6 +230,10 @@ function displaySearchResults(rooms, searchData) {
                             <strong>Floor:</strong> ${room.floor}<br>
                             <strong>Capacity:</strong> ${room.capacity} people
                         </p>
+                        <p class="mb-2">
+                            ${room.is_aca_compliant ? '<span class="badge bg-info me-1"><i class="fas fa-wheelchair"></i> ADA</span>' : ''}
+                            ${room.is_no_stair ? '<span class="badge bg-secondary">Step-free</span>' : ''}
+                        </p>
                         <button class="btn btn-success btn-sm" onclick="showReservationModal(${room.room_id}, '${room.room_num}', '${room.building_name}', ${room.floor}, ${room.capacity}, '${searchData.get('slot_date')}', '${startHour}', '${endHour}')">
                             <i class="fas fa-calendar-plus"></i> Reserve Room
                         </button>
@@ -204,11 +243,22 @@ function displaySearchResults(rooms, searchData) {
         `;
     });
     html += `</div>`;
+    if (rooms.length === SEARCH_LIMIT) {
+        html += `<p class="text-muted small">Showing the ${SEARCH_LIMIT} best matches. Narrow the filters to see others.</p>`;
+    }
     
     resultsDiv.innerHTML = html;
 }
 
 function showReservationModal(roomId, roomNum, buildingName, floor, capacity, slotDate, startHour, endHour) {
+    fillReservationDetails(roomId, roomNum, buildingName, floor, capacity, slotDate, startHour, endHour);
+    document.getElementById('reserved_by').value = '';
+    
+    const modal = new bootstrap.Modal(document.getElementById('reservationModal'));
+    modal.show();
+}
+
+function fillReservationDetails(roomId, roomNum, buildingName, floor, capacity, slotDate, startHour, endHour) {
     document.getElementById('modal_room_id').value = roomId;
     document.getElementById('modal_slot_date').value = slotDate;
     document.getElementById('modal_start_hour').value = startHour;
@@ -232,11 +282,34 @@ function showReservationModal(roomId, roomNum, buildingName, floor, capacity, sl
         <strong>Date:</strong> ${slotDate}<br>
         <strong>Time:</strong> ${timeSlot}
     `;
-    
-    document.getElementById('reserved_by').value = '';
-    
-    const modal = new bootstrap.Modal(document.getElementById('reservationModal'));
-    modal.show();
+    document.getElementById('suggestions').innerHTML = '';
+    fillRepeatDays(slotDate);
+}
+
+// Weekdays of the booking's week that can be added to it; each extra day is
+// one more item in a /reserve/batch request
+function fillRepeatDays(slotDate) {
+    const chosen = new Date(slotDate + 'T00:00');
+    const monday = new Date(chosen);
+    monday.setDate(chosen.getDate() - (chosen.getDay() + 6) % 7);
+    const today = new Date();
+    today.setHours(0, 0, 0, 0);
+    const names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri'];
+    let html = '';
+    names.forEach((name, offset) => {
+        const day = new Date(monday);
+        day.setDate(monday.getDate() + offset);
+        if (day < today) return;
+        const iso = `${day.getFullYear()}-${String(day.getMonth() + 1).padStart(2, '0')}-${String(day.getDate()).padStart(2, '0')}`;
+        const current = iso === slotDate;
+        html += `
+            <div class="form-check">
+                <input class="form-check-input" type="checkbox" id="repeat_${iso}" value="${iso}" ${current ? 'checked disabled' : ''}>
+                <label class="form-check-label" for="repeat_${iso}">${name} ${day.getDate()}</label>
+            </div>
+        `;
+    });
+    document.getElementById('repeatDays').innerHTML = html;
 }
 
 function submitReservation() {
@@ -259,6 +332,12 @@ function submitReservation() {
         return;
     }
 
+    const days = Array.from(document.querySelectorAll('#repeatDays input:checked')).map(input => input.value);
+    if (days.length > 1) {
+        submitBatchReservation(data, days);
+        return;
+    }
+
     fetch('/reserve', {
         method: 'POST',
         headers: {
@@ -266,10 +345,13 @@ function submitReservation() {
         },
         body: JSON.stringify(data)
     })
-    .then(response => response.json())
-    .then(data => {
-        if (data.error) {
-            alert('Error: ' + data.error);
+    .then(response => response.json().then(body => ({ status: response.status, body })))
+    .then(({ status, body }) => {
+        if (status === 409) {
+            // Someone got there first: offer the next free times instead of another guess
+            showSuggestions(data, body.error);
+        } else if (body.error) {
+            alert('Error: ' + body.error);
         } else {
             alert('Reservation submitted successfully! You will be notified once it\'s approved.');
             bootstrap.Modal.getInstance(document.getElementById('reservationModal')).hide();
@@ -282,6 +364,78 @@ function submitReservation() {
     });
 }
 
+function submitBatchReservation(data, days) {
+    const mode = document.getElementById('all_or_nothing').checked ? 'all_or_nothing' : 'best_effort';
+    const bookings = days.map(day => ({
+        room_id: data.room_id,
+        slot_date: day,
+        start_hour: data.start_hour,
+        end_hour: data.end_hour
+    }));
+
+    fetch('/reserve/batch', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ reserved_by: data.reserved_by, mode, bookings })
+    })
+    .then(response => response.json())
+    .then(body => {
+        const problems = (body.results || [])
+            .filter(result => result.status === 'conflict' || result.status === 'invalid')
+            .map(result => {
+                const day = bookings[result.index].slot_date;
+                if (result.status === 'invalid') return `${day}: ${result.error}`;
+                return `${day}: ${result.conflicting_hours[0]}:00 is already reserved or pending`;
+            });
+        if (!body.booked) {
+            alert(['Error: ' + (body.error || body.message), ...problems].join('\n'));
+            return;
+        }
+        alert([body.message + '. You will be notified once they\'re approved.', ...problems].join('\n'));
+        bootstrap.Modal.getInstance(document.getElementById('reservationModal')).hide();
+        searchRooms(); // Refresh results
+    })
+    .catch(error => {
+        console.error('Error submitting reservations:', error);
+        alert('Error submitting reservations. Please try again.');
+    });
+}
+
+function showSuggestions(request, message) {
+    const container = document.getElementById('suggestions');
+    const params = new URLSearchParams({
+        room_id: request.room_id,
+        duration: parseInt(request.end_hour) - parseInt(request.start_hour),
+        from_date: request.slot_date,
+        count: 5
+    });
+    container.innerHTML = `<div class="alert alert-danger small mb-2">${message}</div>`;
+    fetch(`/suggest?${params}`)
+        .then(response => response.json())
+        .then(data => {
+            const options = data.options || [];
+            if (!options.length) {
+                container.innerHTML += `<p class="text-muted small">This room has no free time of that length through ${data.searched_through || data.horizon_end}.</p>`;
+                return;
+            }
+            container.innerHTML += '<label class="form-label">Next available times</label><div class="d-flex flex-wrap gap-2"></div>';
+            const list = container.querySelector('.d-flex');
+            options.forEach(option => {
+                const button = document.createElement('button');
+                button.type = 'button';
+                button.className = 'btn btn-outline-primary btn-sm';
+                button.textContent = `${formatDate(option.slot_date + 'T00:00')} ${option.start_hour}:00-${option.end_hour}:00`;
+                button.addEventListener('click', () => fillReservationDetails(
+                    option.room_id, option.room_num, option.building_name, option.floor, option.capacity,
+                    option.slot_date, option.start_hour, option.end_hour));
+                list.appendChild(button);
+            });
+        })
+        .catch(error => console.error('Error loading suggestions:', error));
+}
+
 // ========================================
 // UTILITY FUNCTIONS
 // ========================================
@@ -343,6 +497,14 @@ async function apiCall(url, options = {}) {
     }
 }
 
+// Availability for an hour window across a date range in one request
+// params: start_date, end_date, start_hour, end_hour and optional weekdays,
+// building_id, floor, room_id, include_pending, all_dates
+function fetchRangeAvailability(params) {
+    const query = new URLSearchParams(params);
+    return apiCall(`/search/range?${query}`);
+}
+
 // Confirmation dialogs
 function confirmAction(message, callback) {
     if (confirm(message)) {
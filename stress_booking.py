@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Stress the booking path: many processes racing for the same room and hours.
+
+Every worker opens its own connection and tries random overlapping ranges in
+one room on a handful of dates through booking.book(). Afterwards the
+database is checked for double bookings and the attempt / commit rates are
+printed.
+
+Usage: python stress_booking.py [--workers 8] [--attempts 200] [--dates 3] [--interval]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+import booking
+import db
+import migrate
+
+ROOM_ID = 1
+
+
+def stress_dates(count):
+    """``count`` weekdays far enough ahead not to collide with seed data."""
+    day = date(2031, 1, 6)   # a Monday
+    dates = []
+    while len(dates) < count:
+        if day.weekday() < 5:
+            dates.append(day.isoformat())
+        day += timedelta(days=1)
+    return dates
+
+
+def _worker(database, worker_id, attempts, dates, interval, results):
+    rng = random.Random(worker_id)
+    conn = db.connect(database)
+    booked = conflicted = busy = 0
+    for _ in range(attempts):
+        start = rng.randint(7, 19)
+        end = rng.randint(start + 1, min(start + 3, 20))
+        try:
+            result = booking.book(conn, ROOM_ID, f"Worker {worker_id}", rng.choice(dates),
+                                  start, end, interval=interval)
+        except sqlite3.OperationalError as error:
+            if not booking.is_busy(error):
+                raise
+            busy += 1
+            continue
+        if result["conflicts"]:
+            conflicted += 1
+        else:
+            booked += 1
+    conn.close()
+    results.put((booked, conflicted, busy))
+
+
+def double_bookings(conn):
+    """Pairs of active reservations that overlap in the same room and date."""
+    return conn.execute("""
+        SELECT a.reservation_id, b.reservation_id
+        FROM   Reservations a
+        JOIN   Reservations b
+          ON   b.room_id = a.room_id
+         AND   b.slot_date = a.slot_date
+         AND   b.reservation_id > a.reservation_id
+         AND   b.slot_hour < a.end_hour
+         AND   b.end_hour > a.slot_hour
+        WHERE  a.status IN ('pending', 'approved')
+          AND  b.status IN ('pending', 'approved')
+    """).fetchall()
+
+
+def run(database, workers=8, attempts=200, date_count=3, interval=False):
+    """Race ``workers`` processes for one room; return counts, overlaps and rates."""
+    dates = stress_dates(date_count)
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=_worker, args=(database, n, attempts, dates, interval, results))
+        for n in range(workers)
+    ]
+
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    totals = [results.get(timeout=300) for _ in processes]
+    for process in processes:
+        process.join(60)
+    elapsed = time.perf_counter() - started
+    if any(process.exitcode != 0 for process in processes):
+        raise RuntimeError("a stress worker failed")
+
+    conn = sqlite3.connect(database)
+    overlaps = double_bookings(conn)
+    booked_hours = conn.execute(
+        "SELECT COALESCE(SUM(end_hour - slot_hour), 0) FROM Reservations "
+        "WHERE room_id = ? AND slot_date IN ({})".format(",".join("?" * len(dates))),
+        (ROOM_ID, *dates),
+    ).fetchone()[0]
+    conn.close()
+
+    booked, conflicted, busy = (sum(column) for column in zip(*totals))
+    return {
+        "attempts": workers * attempts,
+        "booked": booked,
+        "conflicted": conflicted,
+        "busy": busy,
+        "booked_hours": booked_hours,
+        "double_bookings": len(overlaps),
+        "seconds": elapsed,
+        "attempts_per_second": workers * attempts / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--attempts", type=int, default=200, help="bookings tried per worker")
+    parser.add_argument("--dates", type=int, default=3, help="dates the workers compete for")
+    parser.add_argument("--interval", action="store_true", help="store one row per booking")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="stress_booking_")
+    path = os.path.join(workdir, "stress.db")
+    migrate.upgrade(path, seed_data=False, log=lambda *a: None)
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO Buildings (name, address) VALUES ('Stress', '1 Race St')")
+    conn.execute("INSERT INTO Rooms (building_id, room_num, capacity) VALUES (1, '101', 4)")
+    conn.commit()
+    conn.close()
+
+    report = run(path, args.workers, args.attempts, args.dates, args.interval)
+    print(f"{report['attempts']} attempts from {args.workers} workers in {report['seconds']:.2f}s "
+          f"({report['attempts_per_second']:.0f}/s)")
+    print(f"booked {report['booked']}  conflicted {report['conflicted']}  busy {report['busy']}  "
+          f"hours filled {report['booked_hours']} of {13 * args.dates}")
+    print(f"double bookings: {report['double_bookings']}")
+    return 1 if report["double_bookings"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
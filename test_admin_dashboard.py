@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for the admin dashboard's pending-block grouping.
+"""
+
+import re
+
+import db
+
+
+def _pending(app, rows):
+    conn = db.connect(app.config["DATABASE"])
+    conn.execute("UPDATE Reservations SET status = 'approved' WHERE status = 'pending'")
+    conn.executemany(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status) "
+        "VALUES (?, ?, ?, ?, ?, 'pending')",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def _block_ids(html):
+    return re.findall(r'name="reservation_ids" value="([0-9,]+)"', html)
+
+
+def test_blocks_are_grouped_in_sql(admin_client, app):
+    _pending(app, [
+        (1, "Alice", "2030-01-07", 9, 10),
+        (1, "Alice", "2030-01-07", 10, 12),   # interval row continuing the block
+        (1, "Alice", "2030-01-07", 12, 13),
+        (1, "Alice", "2030-01-07", 14, 15),   # gap: separate single
+        (2, "Alice", "2030-01-07", 15, 16),   # other room
+        (2, "Alice", "2030-01-07", 16, 17),
+        (1, "Bob", "2030-01-08", 9, 10),
+    ])
+    html = admin_client.get('/admin').get_data(as_text=True)
+
+    # Approve/Reject Block forms appear twice per multi-row block
+    ids = _block_ids(html)
+    assert len(ids) == 4
+    assert [len(value.split(',')) for value in ids[::2]] == [3, 2]
+    assert "Block of 3" in html and "3 blocks" not in html
+    assert "4 blocks" in html
+
+
+def test_dashboard_pages_and_stats(admin_client, app):
+    _pending(app, [(3 + n // 13, f"Person {n:02d}", "2030-01-07", 7 + n % 13, 8 + n % 13)
+                  for n in range(30)])
+    first = admin_client.get('/admin').get_data(as_text=True)
+    second = admin_client.get('/admin?page=2').get_data(as_text=True)
+
+    assert "Page 1 of 2" in first
+    assert "Person 00" in first and "Person 24" in first and "Person 25" not in first
+    assert "Person 25" in second and "Person 29" in second
+    assert re.search(r'<h4 class="card-title">30</h4>', first)
+
+
+def test_bulk_moderation_by_filter(admin_client, app):
+    _pending(app, [
+        (1, "Alice", "2030-01-07", 9, 11),
+        (2, "Alice", "2030-01-08", 9, 10),
+        (5, "Alice", "2030-01-08", 9, 10),    # building 2
+        (1, "Bob", "2030-01-09", 9, 10),
+        (1, "Alice", "2030-02-04", 9, 10),    # outside the date range
+    ])
+    moderate = {"action": "approve", "building_id": "1", "reserved_by": "lic",
+                "start_date": "2030-01-01", "end_date": "2030-01-31"}
+    response = admin_client.post('/admin/moderate', data=moderate, headers={"Accept": "application/json"})
+    assert response.get_json() == {"updated": 2}
+
+    conn = db.connect(app.config["DATABASE"])
+    statuses = dict(conn.execute("SELECT room_id || ' ' || slot_date, status FROM Reservations "
+                                 "WHERE slot_date LIKE '2030-%'").fetchall())
+    assert statuses == {"1 2030-01-07": "approved", "2 2030-01-08": "approved", "5 2030-01-08": "pending",
+                        "1 2030-01-09": "pending", "1 2030-02-04": "pending"}
+    conn.close()
+
+    # No filters: every block still listed on the dashboard
+    assert "Approve all listed" in admin_client.get('/admin').get_data(as_text=True)
+    rejected = admin_client.post('/admin/moderate', data={"action": "reject"}, headers={"Accept": "application/json"})
+    assert rejected.get_json()["updated"] == 3
+    assert _block_ids(admin_client.get('/admin').get_data(as_text=True)) == []
+    for bad in ({"action": "delete"}, {"action": "approve", "start_date": "tomorrow"}):
+        assert admin_client.post('/admin/moderate', data=bad,
+                                 headers={"Accept": "application/json"}).status_code == 400
+    for reserved_by in (42, ["Alice"]):
+        response = admin_client.post('/admin/moderate', json={"action": "approve", "reserved_by": reserved_by},
+                                     headers={"Accept": "application/json"})
+        assert response.status_code == 400 and response.get_json() == {"error": "Invalid action or filter"}
+
+
+def test_approving_an_overlap_is_refused(admin_client, app):
+    _pending(app, [(7, "Keep", "2030-01-10", 9, 12)])
+    conn = db.connect(app.config["DATABASE"])
+    # Overlapping rows can only come from before the triggers: build them with it off
+    trigger = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'trg_reservations_no_overlap_update'").fetchone()[0]
+    conn.execute("DROP TRIGGER trg_reservations_no_overlap_update")
+    conn.execute("INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status) "
+                 "VALUES (7, 'Legacy', '2030-01-10', 10, 11, 'rejected')")
+    conn.execute("UPDATE Reservations SET status = 'pending' WHERE reserved_by = 'Legacy'")
+    conn.execute(trigger)
+    conn.commit()
+
+    response = admin_client.post('/admin/moderate', data={"action": "approve", "reserved_by": "Keep"},
+                                 headers={"Accept": "application/json"})
+    assert response.status_code == 409
+    assert conn.execute("SELECT status FROM Reservations WHERE reserved_by = 'Keep'").fetchone()[0] == "pending"
+    conn.close()
+
+    ids = admin_client.post('/admin/approve-block', data={"reservation_ids": "1,2,x"})
+    assert ids.status_code == 302
+
+
+def test_single_moderation_only_moves_pending_rows(admin_client, app):
+    _pending(app, [(7, "Stale", "2030-01-11", 9, 11)])
+    conn = db.connect(app.config["DATABASE"])
+    stale = conn.execute("SELECT reservation_id FROM Reservations WHERE reserved_by = 'Stale'").fetchone()[0]
+    assert admin_client.post(f'/admin/reject/{stale}').status_code == 302
+    # The freed slot is booked again, then the old row is approved from a stale page
+    conn.execute("INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status) "
+                 "VALUES (7, 'Rebooked', '2030-01-11', 9, 11, 'pending')")
+    conn.commit()
+    response = admin_client.post(f'/admin/approve/{stale}', follow_redirects=True)
+    assert response.status_code == 200 and 'no longer pending' in response.get_data(as_text=True)
+    rebooked = conn.execute("SELECT reservation_id FROM Reservations WHERE reserved_by = 'Rebooked'").fetchone()[0]
+    assert admin_client.post(f'/admin/approve/{rebooked}').status_code == 302
+
+    # Neither action moves a row that is no longer pending
+    admin_client.post(f'/admin/reject/{rebooked}')
+    admin_client.post(f'/admin/approve/{stale}')
+    statuses = dict(conn.execute("SELECT reserved_by, status FROM Reservations WHERE slot_date = '2030-01-11'"))
+    assert statuses == {"Stale": "rejected", "Rebooked": "approved"}
+
+    # Cancel only releases an active row
+    for reservation_id in (stale, 99999):
+        response = admin_client.post(f'/admin/cancel/{reservation_id}', follow_redirects=True)
+        assert 'is not active' in response.get_data(as_text=True)
+    assert 'now available' in admin_client.post(f'/admin/cancel/{rebooked}', follow_redirects=True).get_data(as_text=True)
+    statuses = dict(conn.execute("SELECT reserved_by, status FROM Reservations WHERE slot_date = '2030-01-11'"))
+    assert statuses == {"Stale": "rejected", "Rebooked": "cancelled"}
+    conn.close()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the paginated admin reservations list.
+"""
+
+import db
+
+JSON = {"Accept": "application/json"}
+
+
+def _add_reservations(app):
+    conn = db.connect(app.config["DATABASE"])
+    conn.executemany(
+        "INSERT INTO Reservations (room_id, reserved_by, reserved_at, slot_date, slot_hour, status) "
+        "VALUES (?, ?, '2030-01-01 09:00:00', ?, ?, ?)",
+        [(room, f"Pager {room}", f"2030-01-{7 + hour % 5:02d}", hour, "pending" if hour % 2 else "approved")
+         for room in (1, 2, 8) for hour in range(7, 20)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _all_pages(client, **params):
+    seen, cursor = [], None
+    while True:
+        query = {**params, "limit": 7, **({"cursor": cursor} if cursor else {})}
+        data = client.get('/admin/reservations', query_string=query, headers=JSON).get_json()
+        assert len(data["reservations"]) <= 7
+        seen.extend(data["reservations"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            return seen
+
+
+def test_cursor_pages_cover_every_row_once(admin_client, app):
+    _add_reservations(app)
+    rows = _all_pages(admin_client, reserved_by="Pager")
+    keys = [(row["reserved_at"], row["reservation_id"]) for row in rows]
+    assert len(keys) == 39
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_filters(admin_client, app):
+    _add_reservations(app)
+    rows = _all_pages(admin_client, reserved_by="Pager", status="pending", room_id=2,
+                      start_date="2030-01-08", end_date="2030-01-09")
+    assert rows
+    assert {row["status"] for row in rows} == {"pending"}
+    assert {row["reserved_by"] for row in rows} == {"Pager 2"}
+    assert all("2030-01-08" <= row["slot_date"] <= "2030-01-09" for row in rows)
+
+    building_rows = _all_pages(admin_client, reserved_by="Pager", building_id=1)
+    assert {row["reserved_by"] for row in building_rows} == {"Pager 1", "Pager 2"}
+
+
+def test_html_page_and_bad_cursor(admin_client, app):
+    _add_reservations(app)
+    page = admin_client.get('/admin/reservations', query_string={"reserved_by": "Pager 8"})
+    assert page.status_code == 200
+    assert b'id="loadMoreReservations"' in page.data
+
+    bad = admin_client.get('/admin/reservations', query_string={"cursor": "not-a-cursor"}, headers=JSON)
+    assert bad.status_code == 400
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for reservation compaction and the status-based slot rules it relies on.
+"""
+
+from datetime import date
+
+import archive
+import booking
+import db
+
+
+def _insert(conn, rows):
+    conn.executemany(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+
+
+def test_compact_archives_only_old_inactive_rows(app):
+    conn = db.connect(app.config["DATABASE"])
+    _insert(conn, [(1, "Old rejected", "2020-01-06", 9, "rejected"),
+                   (1, "Old cancelled", "2020-01-06", 10, "cancelled"),
+                   (1, "Old approved", "2020-01-06", 9, "approved"),
+                   (1, "Recent rejected", "2020-02-20", 9, "rejected")])
+    before = conn.execute("SELECT COUNT(*) FROM Reservations").fetchone()[0]
+
+    report = archive.compact(conn, today=date(2020, 3, 1), rejected_days=30, batch_size=1)
+
+    assert report["archived"] == 2 and report["cutoff"] == "2020-01-31"
+    assert conn.execute("SELECT COUNT(*) FROM Reservations").fetchone()[0] == before - 2
+    archived = conn.execute("SELECT reserved_by, status FROM ReservationsArchive ORDER BY reserved_by").fetchall()
+    assert [tuple(row) for row in archived] == [("Old cancelled", "cancelled"), ("Old rejected", "rejected")]
+    assert archive.compact(conn, today=date(2020, 3, 1))["archived"] == 0
+    assert not conn.in_transaction
+    conn.close()
+
+
+def test_claim_lets_one_worker_compact_per_interval(app):
+    conn = db.connect(app.config["DATABASE"])
+    assert archive.claim(conn, 3600, now=1000000)
+    assert not archive.claim(conn, 3600, now=1000000 + 60)
+    assert archive.claim(conn, 3600, now=1000000 + 3600)
+    conn.close()
+
+
+def test_cancel_keeps_the_row_and_frees_the_slot(admin_client, app):
+    conn = db.connect(app.config["DATABASE"])
+    _insert(conn, [(2, "Cancel me", "2030-01-07", 9, "approved")])
+    reservation_id = conn.execute("SELECT reservation_id FROM Reservations WHERE reserved_by = 'Cancel me'").fetchone()[0]
+
+    admin_client.post(f"/admin/cancel/{reservation_id}")
+    assert conn.execute("SELECT status FROM Reservations WHERE reservation_id = ?",
+                        (reservation_id,)).fetchone()[0] == "cancelled"
+
+    response = admin_client.post("/reserve", json={"room_id": 2, "reserved_by": "Next", "slot_date": "2030-01-07",
+                                                   "start_hour": 9, "end_hour": 10})
+    assert response.status_code == 200, response.get_json()
+    assert "Cancelled" in admin_client.get("/admin/reservations?status=cancelled").get_data(as_text=True)
+    conn.close()
+
+
+def test_history_views_union_the_archive_when_filters_reach_back(admin_client, app):
+    conn = db.connect(app.config["DATABASE"])
+    _insert(conn, [(1, f"Past {day}", f"2020-01-{day:02d}", 9, "approved") for day in range(6, 11)])
+    live = conn.execute("SELECT COUNT(*) FROM Reservations").fetchone()[0]
+
+    report = archive.compact(conn, today=date(2020, 6, 1), after_days=90)
+    assert report["past"] == 5 and report["horizon"] == "2020-03-03"
+    assert conn.execute("SELECT COUNT(*) FROM Reservations").fetchone()[0] == live - 5
+    assert archive.archived_through(conn) == "2020-01-10"
+    assert not archive.reaches_archive(conn, "2020-01-11")
+
+    # Keyset pages run across both tables without gaps or repeats
+    seen, cursor = [], None
+    while True:
+        page = admin_client.get("/admin/reservations", headers={"Accept": "application/json"},
+                                query_string={"start_date": "2020-01-07", "limit": 100,
+                                              **({"cursor": cursor} if cursor else {})}).get_json()
+        seen.extend((row["reservation_id"], row["reserved_by"]) for row in page["reservations"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    names = [name for _, name in seen]
+    assert {"Past 7", "Past 8", "Past 9", "Past 10"} <= set(names) and "Past 6" not in names
+    assert len(seen) == len(set(seen))
+    assert len(seen) == conn.execute("SELECT COUNT(*) FROM Reservations WHERE slot_date >= '2020-01-07'").fetchone()[0] + 4
+
+    recent = admin_client.get("/admin/reservations", headers={"Accept": "application/json"},
+                              query_string={"start_date": "2020-02-01", "limit": 500}).get_json()
+    assert not any(row["reserved_by"].startswith("Past") for row in recent["reservations"])
+
+    grid = admin_client.get("/admin/api/schedule", query_string={
+        "start_date": "2020-01-06", "end_date": "2020-01-10", "room_id": 1, "format": "json"}).get_json()
+    assert [day["cells"][2][2] for day in grid["rooms"][0]["days"]] == [f"Past {day}" for day in range(6, 11)]
+    conn.close()
+
+
+def test_deleting_a_compacted_series_keeps_its_history(app):
+    conn = db.connect(app.config["DATABASE"])
+    dates = booking.series_dates(date(2020, 1, 6), 4)
+    series_id = booking.create_series(conn, 3, "Weekly", dates, 9, 10, "approved")["series_id"]
+    assert archive.compact(conn, today=date(2020, 4, 15), after_days=90)["past"] == 2
+
+    assert booking.delete_series(conn, series_id, "2020-01-20") == 2
+    end_date = conn.execute("SELECT end_date FROM RecurringSeries WHERE series_id = ?", (series_id,)).fetchone()
+    assert end_date is not None and end_date[0] == "2020-01-13"
+    plan = " ".join(row[3] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT MAX(slot_date) FROM ReservationsArchive WHERE series_id = 1"))
+    assert "idx_reservations_archive_series" in plan
+    conn.close()
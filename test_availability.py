@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tests for room availability lookups: the bitmap index behind /search and /search/range.
+"""
+
+import random
+
+import availability
+import db
+import migrate
+
+
+def _database(tmp_path):
+    path = str(tmp_path / "availability.db")
+    migrate.upgrade(path, log=lambda *a: None)
+    return path
+
+
+def _sql_free_rooms(conn, slot_date, start_hour, end_hour, building_id=None):
+    cur = conn.execute("""
+        SELECT r.room_id
+        FROM   Rooms r
+        JOIN   Buildings b ON b.building_id = r.building_id
+        WHERE  (? IS NULL OR r.building_id = ?)
+          AND  r.room_id NOT IN (
+              SELECT room_id FROM Reservations
+              WHERE slot_date = ? AND slot_hour >= ? AND slot_hour < ? AND status = 'approved'
+          )
+        ORDER  BY b.name, r.floor, r.room_num
+    """, (building_id, building_id, slot_date, start_hour, end_hour))
+    return [row[0] for row in cur.fetchall()]
+
+
+def test_hour_mask():
+    assert availability.hour_mask(7, 8) == 0b1
+    assert availability.hour_mask(9, 12) == 0b11100
+    assert availability.hour_mask(7, 20) == (1 << 13) - 1
+
+
+def test_index_matches_sql(tmp_path):
+    """Random bookings and searches give the same answer through both engines."""
+    path = _database(tmp_path)
+    conn = db.connect(path)
+    rng = random.Random(7)
+    dates = ["2030-01-07", "2030-01-08", "2030-01-09"]
+    rows = {(rng.randint(1, 13), rng.choice(dates), rng.randint(7, 19)) for _ in range(200)}
+    conn.executemany(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status) VALUES (?, 'T', ?, ?, ?)",
+        [(room, day, hour, rng.choice(("pending", "approved", "rejected"))) for room, day, hour in rows],
+    )
+    conn.commit()
+
+    index = availability.AvailabilityIndex()
+    for _ in range(100):
+        slot_date = rng.choice(dates)
+        start = rng.randint(7, 19)
+        end = rng.randint(start + 1, 20)
+        building = rng.choice((None, 1, 2, 3, 4))
+        got = [room["room_id"] for room in index.free_rooms(conn, slot_date, start, end, building_id=building)]
+        assert got == _sql_free_rooms(conn, slot_date, start, end, building)
+    conn.close()
+
+
+def test_index_sees_writes_from_other_connections(tmp_path):
+    """Changes committed by another worker are picked up through the change log."""
+    path = _database(tmp_path)
+    reader = db.connect(path)
+    writer = db.connect(path)
+    index = availability.AvailabilityIndex()
+
+    free = lambda: {room["room_id"] for room in index.free_rooms(reader, "2030-01-07", 9, 10)}
+    assert 1 in free()
+
+    writer.execute(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status) "
+        "VALUES (1, 'T', '2030-01-07', 9, 'approved')"
+    )
+    writer.commit()
+    assert 1 not in free()
+    assert index.room_mask(reader, 1, "2030-01-07") == availability.hour_mask(9, 10)
+
+    writer.execute("UPDATE Reservations SET status = 'rejected' WHERE room_id = 1 AND slot_date = '2030-01-07'")
+    writer.commit()
+    assert 1 in free()
+
+    writer.execute("INSERT INTO Rooms (building_id, room_num, capacity) VALUES (1, 'NEW', 3)")
+    writer.commit()
+    assert len(free()) == 14
+
+    reader.close()
+    writer.close()
+
+
+def test_index_recovers_after_log_pruned(tmp_path):
+    path = _database(tmp_path)
+    conn = db.connect(path)
+    index = availability.AvailabilityIndex()
+    index.free_rooms(conn, "2030-01-07", 9, 10)
+
+    conn.executemany(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status) "
+        "VALUES (?, 'T', '2030-01-07', 9, 'approved')",
+        [(room,) for room in range(1, 6)],
+    )
+    availability.prune_change_log(conn, keep=1)
+    conn.commit()
+
+    free = {room["room_id"] for room in index.free_rooms(conn, "2030-01-07", 9, 10)}
+    assert free == set(range(6, 14))
+    conn.close()
+
+
+def test_search_route_engines_agree(client):
+    params = {"slot_date": "2030-01-07", "start_hour": 9, "end_hour": 12}
+    indexed = client.get('/search', query_string=params).get_json()
+    sql = client.get('/search', query_string={**params, "engine": "sql"}).get_json()
+    assert indexed == sql
+
+    assert client.get('/search', query_string={**params, "slot_date": "soon"}).status_code == 400
+
+
+def test_search_size_and_accessibility_filters(client):
+    params = {"slot_date": "2030-01-07", "start_hour": 9, "end_hour": 12}
+    everything = client.get('/search', query_string=params).get_json()["rooms"]
+    for extra in ({"min_capacity": 7}, {"min_capacity": 6, "limit": 3}, {"accessible": 1},
+                  {"step_free": "true", "min_capacity": 5}, {"accessible": 1, "building_id": 2, "limit": 1}):
+        indexed = client.get('/search', query_string={**params, **extra}).get_json()["rooms"]
+        sql = client.get('/search', query_string={**params, **extra, "engine": "sql"}).get_json()["rooms"]
+        assert indexed == sql, extra
+
+    fits = client.get('/search', query_string={**params, "min_capacity": 7}).get_json()["rooms"]
+    assert fits and all(room["capacity"] >= 7 for room in fits)
+    # Best fit: smallest rooms first, display order within a size
+    assert fits == sorted(fits, key=lambda room: (room["capacity"], everything.index(room)))
+    assert len(client.get('/search', query_string={**params, "limit": 2}).get_json()["rooms"]) == 2
+    accessible = client.get('/search', query_string={**params, "accessible": 1, "step_free": 1}).get_json()["rooms"]
+    assert accessible and all(room["is_aca_compliant"] and room["is_no_stair"] for room in accessible)
+
+    assert client.get('/search', query_string={**params, "min_capacity": 0}).status_code == 400
+    assert client.get('/search', query_string={**params, "limit": "lots"}).status_code == 400
+
+
+def _book(client, room_id, slot_date, start_hour, end_hour):
+    response = client.post('/reserve', json={
+        "room_id": room_id, "reserved_by": "Range Test", "slot_date": slot_date,
+        "start_hour": start_hour, "end_hour": end_hour,
+    })
+    assert response.status_code == 200
+
+
+def test_search_range_reports_busy_dates(client):
+    """Tuesdays 9-11 for four weeks in one request; pending only counts when asked."""
+    _book(client, 1, "2030-01-15", 10, 11)   # second Tuesday, pending
+    _book(client, 1, "2030-01-16", 9, 11)    # Wednesday, outside the weekday filter
+    params = {"start_date": "2030-01-08", "end_date": "2030-01-29", "weekdays": "1",
+              "start_hour": 9, "end_hour": 11, "room_id": 1}
+
+    data = client.get('/search/range', query_string=params).get_json()
+    assert data["dates"] == ["2030-01-08", "2030-01-15", "2030-01-22", "2030-01-29"]
+    assert data["rooms"][0]["free_dates"] == data["dates"]
+
+    data = client.get('/search/range', query_string={**params, "include_pending": 1}).get_json()
+    room = data["rooms"][0]
+    assert room["busy_hours"] == {"2030-01-15": [10]}
+    assert room["free_dates"] == ["2030-01-08", "2030-01-22", "2030-01-29"]
+
+    data = client.get('/search/range', query_string={**params, "include_pending": 1, "all_dates": 1}).get_json()
+    assert data["rooms"] == []
+
+
+def test_search_range_validation(client):
+    base = {"start_date": "2030-01-07", "end_date": "2030-01-11", "start_hour": 9, "end_hour": 10}
+    assert client.get('/search/range', query_string=base).status_code == 200
+    assert client.get('/search/range', query_string={**base, "weekdays": "5"}).status_code == 400
+    assert client.get('/search/range', query_string={**base, "end_date": "2030-01-01"}).status_code == 400
+    assert client.get('/search/range', query_string={**base, "end_date": "2031-06-01"}).status_code == 400
+    assert client.get('/search/range', query_string={**base, "end_hour": 9}).status_code == 400
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Smoke test for the load-test harness on a tiny synthetic dataset.
+"""
+
+import bench_load
+
+
+def test_load_run_reports_every_route(tmp_path, app):
+    database = str(tmp_path / "load.db")
+    shape, weekdays = bench_load.build_dataset(database, buildings=3, rooms=30, days=14,
+                                               density=0.2, pending=0.5, series=5)
+    assert shape["reservations"] > 0 and shape["series"] > 0
+
+    results = bench_load.run(database, shape, weekdays, requests=10, clients=2)
+    assert set(results["test_client"]) == set(bench_load.ROUTES)
+    for route, result in results["test_client"].items():
+        assert result["errors"] == 0, route
+        assert sum(result["statuses"].values()) == 10
+        assert result["p50_ms"] <= result["p99_ms"]
+    assert set(results["test_client"]["reserve"]["statuses"]) <= {"200", "409"}
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Tests for the reservation write paths in booking.py.
+"""
+
+from datetime import date
+
+import sqlite3
+
+import pytest
+
+import booking
+import db
+import stress_booking
+
+
+def test_series_dates():
+    dates = booking.series_dates(date(2030, 1, 8), 3)
+    assert [d.isoformat() for d in dates] == ["2030-01-08", "2030-01-15", "2030-01-22"]
+
+
+def test_create_series_skips_conflicts(app):
+    conn = db.connect(app.config["DATABASE"])
+    conn.executemany(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status) VALUES (2, ?, ?, ?, ?)",
+        [("Someone", "2030-01-15", 10, "approved"),
+         ("Other", "2030-01-22", 9, "rejected"),      # rejected rows no longer hold the slot
+         ("Elsewhere", "2030-01-16", 9, "approved")],   # different weekday, not a conflict
+    )
+    conn.commit()
+
+    report = booking.create_series(
+        conn, 2, "Weekly: Test", booking.series_dates(date(2030, 1, 8), 4), 9, 11, "approved"
+    )
+    assert report["requested"] == 8
+    assert report["inserted"] == 7
+    assert [(c["slot_date"], c["slot_hour"], c["reserved_by"]) for c in report["conflicts"]] == [
+        ("2030-01-15", 10, "Someone"),
+    ]
+    count = conn.execute("SELECT COUNT(*) FROM Reservations WHERE reserved_by = 'Weekly: Test'").fetchone()[0]
+    assert count == 7
+    assert not conn.in_transaction
+    conn.close()
+
+
+def test_recurring_route_returns_json_report(admin_client):
+    form = {"reserved_by": "Weekly: Json", "building_id": "1", "room_id": "1", "weekday": "0",
+            "start_hour": "15", "end_hour": "17", "weeks": "52", "start_date": "2030-01-01",
+            "status": "approved"}
+    response = admin_client.post('/admin/recurring', data=form, headers={"Accept": "application/json"})
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report["first_date"] == "2030-01-07"
+    assert report["inserted"] == 104
+    assert report["conflicts"] == []
+
+    again = admin_client.post('/admin/recurring', data=form, headers={"Accept": "application/json"}).get_json()
+    assert again["inserted"] == 0
+    assert len(again["conflicts"]) == 104
+
+
+def test_recurring_listing_and_delete(admin_client, app):
+    form = {"reserved_by": "Weekly: Listed", "building_id": "2", "room_id": "7", "weekday": "2",
+            "start_hour": "8", "end_hour": "10", "weeks": "4", "start_date": "2099-01-01",
+            "status": "pending"}
+    series_id = admin_client.post('/admin/recurring', data=form,
+                                  headers={"Accept": "application/json"}).get_json()["series_id"]
+
+    page = admin_client.get('/admin/recurring').get_data(as_text=True)
+    assert "Weekly: Listed" in page
+    assert f'name="series_id" value="{series_id}"' in page
+
+    admin_client.post('/admin/recurring/delete', data={"series_id": series_id, "from_date": "2099-01-14"})
+    conn = db.connect(app.config["DATABASE"])
+    assert conn.execute("SELECT end_date FROM RecurringSeries WHERE series_id = ?",
+                        (series_id,)).fetchone()[0] == "2099-01-07"
+    assert conn.execute("SELECT COUNT(*) FROM Reservations WHERE series_id = ?", (series_id,)).fetchone()[0] == 2
+
+    admin_client.post('/admin/recurring/delete', data={"series_id": series_id, "from_date": "2099-01-01"})
+    assert conn.execute("SELECT COUNT(*) FROM RecurringSeries WHERE series_id = ?", (series_id,)).fetchone()[0] == 0
+    conn.close()
+
+
+def test_create_series_interval_rows(app):
+    """Interval storage writes one row per free run and still reports hourly counts."""
+    conn = db.connect(app.config["DATABASE"])
+    conn.execute(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status) "
+        "VALUES (3, 'Someone', '2030-01-15', 10, 12, 'approved')"
+    )
+    conn.commit()
+
+    report = booking.create_series(
+        conn, 3, "Weekly: Spans", booking.series_dates(date(2030, 1, 8), 2), 9, 13, "approved", interval=True
+    )
+    assert report["inserted"] == 6
+    rows = conn.execute(
+        "SELECT slot_date, slot_hour, end_hour FROM Reservations WHERE series_id = ? ORDER BY slot_date, slot_hour",
+        (report["series_id"],),
+    ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        ("2030-01-08", 9, 13), ("2030-01-15", 9, 10), ("2030-01-15", 12, 13),
+    ]
+    conn.close()
+
+
+def test_reactivating_an_overlapping_row_is_refused(app):
+    conn = db.connect(app.config["DATABASE"])
+    conn.executemany(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status) "
+        "VALUES (6, ?, '2030-01-11', ?, ?, ?)",
+        [("Held", 8, 10, "approved"), ("Revived", 7, 11, "rejected"), ("Clear", 10, 12, "rejected")])
+    conn.commit()
+    # A status change alone still goes through the overlap trigger
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("UPDATE Reservations SET status = 'pending' WHERE reserved_by = 'Revived'")
+    conn.rollback()
+    conn.execute("UPDATE Reservations SET status = 'approved' WHERE reserved_by = 'Clear'")
+    conn.commit()
+    active = conn.execute("SELECT reserved_by FROM Reservations WHERE slot_date = '2030-01-11' "
+                          "AND status IN ('pending', 'approved') ORDER BY slot_hour").fetchall()
+    assert [row[0] for row in active] == ["Held", "Clear"]
+    conn.close()
+
+
+def test_interval_reservation_and_overlap(app, client):
+    app.config["RESERVATION_STORAGE"] = "interval"
+    try:
+        booking_json = {"room_id": 4, "reserved_by": "Span", "slot_date": "2030-01-09",
+                        "start_hour": 9, "end_hour": 12}
+        response = client.post('/reserve', json=booking_json)
+        assert response.status_code == 200
+        assert len(response.get_json()["reservation_ids"]) == 1
+
+        overlap = client.post('/reserve', json={**booking_json, "start_hour": 11, "end_hour": 13})
+        assert overlap.status_code == 409
+        assert "11:00" in overlap.get_json()["error"]
+        assert client.post('/reserve', json={**booking_json, "start_hour": 12, "end_hour": 13}).status_code == 200
+    finally:
+        app.config["RESERVATION_STORAGE"] = "hourly"
+
+    search = {"slot_date": "2030-01-09", "start_hour": 10, "end_hour": 11}
+    conn = db.connect(app.config["DATABASE"])
+    conn.execute("UPDATE Reservations SET status = 'approved' WHERE reserved_by = 'Span'")
+    conn.commit()
+    conn.close()
+    for engine in ("index", "sql"):
+        rooms = client.get('/search', query_string={**search, "engine": engine}).get_json()["rooms"]
+        assert 4 not in {room["room_id"] for room in rooms}
+
+
+def test_book_reports_conflicting_hours(app):
+    conn = db.connect(app.config["DATABASE"])
+    first = booking.book(conn, 5, "First", "2030-01-10", 9, 12)
+    assert len(first["reservation_ids"]) == 3 and first["conflicts"] == []
+
+    clash = booking.book(conn, 5, "Second", "2030-01-10", 11, 14)
+    assert clash["reservation_ids"] == []
+    assert clash["conflicting_hours"] == [11]
+    assert [c["reserved_by"] for c in clash["conflicts"]] == ["First"]
+    assert conn.execute("SELECT COUNT(*) FROM Reservations WHERE reserved_by = 'Second'").fetchone()[0] == 0
+
+    spanning = booking.book(conn, 5, "Span", "2030-01-10", 12, 16, interval=True)
+    assert len(spanning["reservation_ids"]) == 1
+    assert booking.book(conn, 5, "Late", "2030-01-10", 8, 20)["conflicting_hours"] == list(range(9, 16))
+    assert not conn.in_transaction
+    conn.close()
+
+
+def test_batch_modes_and_per_item_results(app, client):
+    conn = db.connect(app.config["DATABASE"])
+    booking.book(conn, 6, "Taken", "2030-01-15", 9, 10)
+    conn.close()
+    standups = [{"room_id": 6, "slot_date": f"2030-01-{day}", "start_hour": 9, "end_hour": 10}
+                for day in (14, 15, 16)]
+    batch = {"reserved_by": "Standup", "bookings": standups + [
+        {**standups[2], "start_hour": 9, "end_hour": 11, "reserved_by": "Overlap"},
+        {"room_id": 6, "slot_date": "2030-01-19", "start_hour": 9, "end_hour": 10},
+    ]}
+
+    invalid = client.post('/reserve/batch', json=batch)
+    assert invalid.status_code == 400
+    assert [r["status"] for r in invalid.get_json()["results"]] == ["skipped"] * 4 + ["invalid"]
+
+    del batch["bookings"][4]
+    atomic = client.post('/reserve/batch', json=batch)
+    assert atomic.status_code == 409
+    results = atomic.get_json()["results"]
+    assert [r["status"] for r in results] == ["skipped", "conflict", "skipped", "conflict"]
+    assert [c["reserved_by"] for c in results[1]["conflicts"]] == ["Taken"]
+    assert results[3]["conflicts"][0]["item"] == 2 and results[3]["conflicting_hours"] == [9]
+
+    partial = client.post('/reserve/batch', json={**batch, "mode": "best_effort"})
+    assert partial.status_code == 200
+    body = partial.get_json()
+    assert body["booked"] == 2
+    assert [r["status"] for r in body["results"]] == ["booked", "conflict", "booked", "conflict"]
+    conn = db.connect(app.config["DATABASE"])
+    rows = conn.execute("SELECT reservation_id, slot_date FROM Reservations WHERE reserved_by = 'Standup' "
+                        "ORDER BY slot_date").fetchall()
+    assert [tuple(row) for row in rows] == [
+        (body["results"][0]["reservation_ids"][0], "2030-01-14"),
+        (body["results"][2]["reservation_ids"][0], "2030-01-16")]
+    conn.close()
+
+    for bad in ({"bookings": []}, {"bookings": standups, "mode": "some"},
+                {"bookings": [{**standups[0], "room_id": 999, "reserved_by": "X"}]}, [batch], 7):
+        assert client.post('/reserve/batch', json=bad).status_code == 400
+
+
+def test_reserve_and_batch_validate_alike(client):
+    good = {"room_id": 6, "reserved_by": "Alike", "slot_date": "2030-01-21", "start_hour": 9, "end_hour": 10}
+    for bad, error in (({"room_id": 999}, "Room not found"), ({"room_id": {"id": 6}}, "Invalid room"),
+                       ({"start_hour": [9]}, "Invalid time format"), ({"reserved_by": {"a": 1}}, "Invalid name")):
+        single = client.post('/reserve', json={**good, **bad})
+        assert single.status_code == 400 and single.get_json()["error"] == error
+        batch = client.post('/reserve/batch', json={"bookings": [{**good, **bad}]})
+        assert batch.status_code == 400 and batch.get_json()["results"][0]["error"] == error
+    assert client.post('/reserve', json=[good]).status_code == 400
+    assert client.post('/reserve', json=good).status_code == 200
+
+
+def test_book_batch_single_transaction(app):
+    conn = db.connect(app.config["DATABASE"])
+    statements = []
+    conn.set_trace_callback(statements.append)
+    items = [{"room_id": room_id, "reserved_by": "Team", "slot_date": "2030-01-21", "start_hour": 13, "end_hour": 16}
+             for room_id in (1, 2, 3)]
+    results = booking.book_batch(conn, items, interval=True)
+    results += booking.book_batch(conn, [{**items[0], "slot_date": "2030-01-22"}])
+    assert [len(r["reservation_ids"]) for r in results] == [1, 1, 1, 3]
+    # Distinct statements: the trace repeats a statement for each trigger it fires
+    first = list(dict.fromkeys(statements[:statements.index("COMMIT") + 1]))
+    assert first[0] == "BEGIN IMMEDIATE" and len(first) == 4
+    assert "FROM   batch b" in first[1] and first[2].lstrip().startswith("INSERT")
+    assert not conn.in_transaction
+    conn.close()
+
+
+def test_begin_immediate_retries_busy(tmp_path):
+    path = str(tmp_path / "busy.db")
+    holder = sqlite3.connect(path)
+    holder.execute("CREATE TABLE T (x INTEGER)")
+    holder.commit()
+    holder.execute("BEGIN IMMEDIATE")
+    waiter = sqlite3.connect(path, timeout=0)
+    try:
+        booking.begin_immediate(waiter, retries=2, backoff=0.001)
+        raise AssertionError("lock is held, BEGIN IMMEDIATE should fail")
+    except sqlite3.OperationalError as error:
+        assert booking.is_busy(error)
+    holder.rollback()
+    booking.begin_immediate(waiter, retries=0)
+    waiter.rollback()
+    holder.close()
+    waiter.close()
+
+
+def test_concurrent_workers_never_double_book(app):
+    """Processes racing for the same room and hours leave no overlapping bookings."""
+    report = stress_booking.run(app.config["DATABASE"], workers=4, attempts=40, date_count=2)
+    assert report["double_bookings"] == 0
+    assert report["booked"] > 0
+    assert report["booked"] + report["conflicted"] + report["busy"] == report["attempts"]
+    assert report["attempts_per_second"] > 0
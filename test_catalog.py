@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the versioned catalog cache behind /buildings and /floors.
+"""
+
+import catalog
+import db
+
+
+def test_floors_match_sql(app, client):
+    conn = db.connect(app.config["DATABASE"])
+    for (building_id,) in conn.execute("SELECT building_id FROM Buildings").fetchall():
+        expected = [row[0] for row in conn.execute(
+            "SELECT DISTINCT floor FROM Rooms WHERE building_id = ? ORDER BY floor", (building_id,))]
+        assert client.get(f'/floors/{building_id}').get_json() == {"floors": expected}
+    conn.close()
+    assert client.get('/floors/999').get_json() == {"floors": []}
+
+
+def test_etag_revalidation(client):
+    first = client.get('/buildings')
+    assert first.status_code == 200
+    assert first.headers["ETag"]
+    assert "no-cache" in first.headers["Cache-Control"]
+
+    again = client.get('/buildings', headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == first.headers["ETag"]
+    assert again.data == b""
+
+
+def test_catalog_writes_invalidate_every_worker(app, client):
+    """A building added on another connection shows up through the DataVersion stamp."""
+    before = client.get('/buildings')
+    conn = db.connect(app.config["DATABASE"])
+    conn.execute("INSERT INTO Buildings (name, address) VALUES ('Annex', '9 New St')")
+    conn.commit()
+    conn.close()
+
+    after = client.get('/buildings', headers={"If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert "Annex" in [b["name"] for b in after.get_json()["buildings"]]
+    assert after.headers["ETag"] != before.headers["ETag"]
+
+
+def test_hit_ratio_reported(app, admin_client):
+    for _ in range(4):
+        admin_client.get('/buildings')
+    stats = admin_client.get('/admin/db-stats').get_json()["catalog_cache"]
+    assert stats["hits"] >= 3
+    assert stats["hit_ratio"] > 0
+    assert stats == catalog.get_cache(app.config["DATABASE"]).stats()
+
+
+def test_bootstrap_has_everything_the_search_form_needs(client):
+    response = client.get('/api/bootstrap')
+    data = response.get_json()
+    assert [b["name"] for b in data["buildings"]] == [b["name"] for b in client.get('/buildings').get_json()["buildings"]]
+    for building in data["buildings"]:
+        floors = client.get(f'/floors/{building["building_id"]}').get_json()["floors"]
+        assert data["floors"].get(str(building["building_id"]), []) == floors
+    assert (data["hours"]["first"], data["hours"]["last"]) == (7, 20)
+    assert data["hours"]["labels"]["13"] == "1:00 PM"
+    assert data["weekdays"]["bookable"] == [0, 1, 2, 3, 4]
+
+    cached = client.get('/api/bootstrap', headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304
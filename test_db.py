@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled SQLite connection manager.
+"""
+
+import sqlite3
+
+import db
+from app import app
+
+
+def test_pragmas_applied(tmp_path):
+    """New connections come up in WAL mode with the tuned settings."""
+    conn = db.connect(str(tmp_path / "pragmas.db"))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -16000
+    conn.close()
+
+
+def test_pool_reuses_connections(tmp_path):
+    """Released connections are handed out again instead of reopening."""
+    pool = db.ConnectionPool(str(tmp_path / "pool.db"), max_size=2)
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+    assert second is first
+    pool.release(second)
+
+    stats = pool.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert stats["open"] == 1
+    assert stats["in_use"] == 0
+    pool.close_all()
+
+
+def test_pool_rolls_back_on_release(tmp_path):
+    """A connection returned mid-transaction does not leak its writes."""
+    pool = db.ConnectionPool(str(tmp_path / "rollback.db"), max_size=1)
+    conn = pool.acquire()
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    assert conn.in_transaction
+    pool.release(conn)
+
+    conn = pool.acquire()
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    pool.release(conn)
+    pool.close_all()
+
+
+def test_pool_exhaustion_times_out(tmp_path):
+    """Waiting on a full pool is bounded and counted."""
+    pool = db.ConnectionPool(str(tmp_path / "full.db"), max_size=1, timeout=0.05)
+    conn = pool.acquire()
+    try:
+        pool.acquire()
+        raise AssertionError("acquire should time out when the pool is exhausted")
+    except sqlite3.OperationalError:
+        pass
+    pool.release(conn)
+    pool.close_all()
+
+
+def test_requests_share_pooled_connection():
+    """Repeated requests in one worker reuse the same warm connection."""
+    pool = db.get_pool(app.config["DATABASE"])
+    client = app.test_client()
+    client.get('/buildings')
+    before = pool.stats()
+    client.get('/buildings')
+    client.get('/floors/1')
+    after = pool.stats()
+
+    assert after["misses"] == before["misses"]
+    assert after["hits"] == before["hits"] + 2
+    assert after["in_use"] == 0
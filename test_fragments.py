@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for cached admin page fragments and the hour label tables.
+"""
+
+from datetime import date, timedelta
+
+import app as app_module
+import db
+import fragments
+
+
+def _next_weekday():
+    day = date.today() + timedelta(days=1)
+    while day.weekday() > 4:
+        day += timedelta(days=1)
+    return day.isoformat()
+
+
+def test_label_tables_match_formatting():
+    for hour in range(25):
+        assert app_module.hour_to_12hr(hour) == app_module.format_hour_12hr(hour)
+    assert app_module.time_range_12hr(9) == "9:00 AM - 10:00 AM"
+    assert app_module.time_range_12hr(11, 14) == "11:00 AM - 2:00 PM"
+
+
+def test_room_schedule_fragments_follow_writes(admin_client, app):
+    slot_date = _next_weekday()
+    conn = db.connect(app.config["DATABASE"])
+    conn.execute("DELETE FROM Reservations WHERE room_id = 3 AND slot_date = ?", (slot_date,))
+    conn.commit()
+
+    first = admin_client.get('/admin/room/3/schedule').get_data(as_text=True)
+    cache = fragments.get_cache(app.config["DATABASE"])
+    misses = cache.stats()["misses"]
+    assert admin_client.get('/admin/room/3/schedule').get_data(as_text=True) == first
+    assert cache.stats()["misses"] == misses
+
+    conn.execute(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status) "
+        "VALUES (3, 'Fragment Check', ?, 14, 16, 'pending')", (slot_date,))
+    conn.commit()
+    conn.close()
+    page = admin_client.get('/admin/room/3/schedule').get_data(as_text=True)
+    assert "Fragment Check" in page and "2:00 PM - 4:00 PM" in page
+    assert cache.stats()["misses"] == misses + 1
+
+
+def test_rooms_and_buildings_tables_follow_catalog(admin_client, app):
+    assert "Lab 42" not in admin_client.get('/admin/rooms').get_data(as_text=True)
+    conn = db.connect(app.config["DATABASE"])
+    conn.execute("INSERT INTO Rooms (building_id, room_num, capacity, floor) VALUES (1, 'Lab 42', 5, 3)")
+    conn.commit()
+    conn.close()
+    assert "Lab 42" in admin_client.get('/admin/rooms').get_data(as_text=True)
+    assert "Lab 42" in admin_client.get('/admin/rooms?building_id=1').get_data(as_text=True)
+    assert "Lab 42" not in admin_client.get('/admin/rooms?building_id=2').get_data(as_text=True)
+    assert admin_client.get('/admin/buildings').status_code == 200
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests for the background job queue and the admin routes that hand work to it.
+"""
+
+import time
+
+import pytest
+
+import availability
+import db
+import jobs
+
+JSON = {"Accept": "application/json"}
+
+
+@pytest.fixture
+def low_threshold(app):
+    original = app.config["ASYNC_ROW_THRESHOLD"]
+    app.config["ASYNC_ROW_THRESHOLD"] = 3
+    yield app
+    app.config["ASYNC_ROW_THRESHOLD"] = original
+
+
+def _pending(conn, count, slot_date="2030-01-07"):
+    conn.execute("UPDATE Reservations SET status = 'approved' WHERE status = 'pending'")
+    conn.executemany(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status) "
+        "VALUES (1, 'Queue', ?, ?, ?, 'pending')",
+        [(slot_date, 7 + n, 8 + n) for n in range(count)])
+    conn.commit()
+
+
+def test_large_moderation_runs_as_a_job(admin_client, low_threshold, monkeypatch):
+    app = low_threshold
+    conn = db.connect(app.config["DATABASE"])
+    _pending(conn, 5)
+    monkeypatch.setattr(jobs, "JOB_BATCH_SIZE", 2)
+
+    response = admin_client.post('/admin/moderate', data={"action": "approve", "reserved_by": "Queue"}, headers=JSON)
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+    queued = admin_client.get(response.get_json()["status_url"]).get_json()
+    assert queued["status"] == "queued" and queued["total"] == 5 and queued["created_by"] == "admin"
+    # The request returned before touching a reservation
+    assert conn.execute("SELECT COUNT(*) FROM Reservations WHERE reserved_by = 'Queue' "
+                        "AND status = 'pending'").fetchone()[0] == 5
+    assert f'data-job-id="{job_id}"' in admin_client.get('/admin').get_data(as_text=True)
+
+    runner = jobs.get_runner(app.config["DATABASE"])
+    assert runner.run_next() == job_id
+    assert runner.run_next() is None
+    done = admin_client.get(f'/admin/jobs/{job_id}').get_json()
+    assert done["status"] == "done" and done["progress"] == done["total"] == 5
+    assert done["result"] == {"updated": 5}
+    assert conn.execute("SELECT COUNT(*) FROM Reservations WHERE reserved_by = 'Queue' "
+                        "AND status = 'approved'").fetchone()[0] == 5
+    assert [job["job_id"] for job in admin_client.get('/admin/jobs').get_json()["jobs"]] == [job_id]
+    assert admin_client.get('/admin/jobs/999').status_code == 404
+    assert admin_client.get('/admin/jobs?limit=abc').status_code == 400
+    assert admin_client.get('/admin/jobs?limit=0').status_code == 400
+
+    # Small writes stay in the request
+    _pending(conn, 2, "2030-01-08")
+    small = admin_client.post('/admin/moderate', data={"action": "reject", "reserved_by": "Queue"}, headers=JSON)
+    assert small.status_code == 200 and small.get_json()["updated"] == 2
+    conn.close()
+
+
+def test_recurring_writes_over_the_threshold_are_queued(admin_client, low_threshold):
+    app = low_threshold
+    form = {"reserved_by": "Queued series", "building_id": "1", "room_id": "4", "weekday": "2",
+            "start_hour": "15", "end_hour": "17", "weeks": "3", "status": "approved", "start_date": "2030-01-07"}
+    response = admin_client.post('/admin/recurring', data=form)
+    assert response.status_code == 302 and response.headers["Location"].endswith("/admin")
+
+    conn = db.connect(app.config["DATABASE"])
+    runner = jobs.get_runner(app.config["DATABASE"])
+    job_id = runner.run_next()
+    report = jobs.get_job(conn, job_id)["result"]
+    assert report["inserted"] == 6 and report["conflicts"] == 0
+    series_id = conn.execute("SELECT series_id FROM RecurringSeries WHERE reserved_by = 'Queued series'").fetchone()[0]
+
+    admin_client.post('/admin/recurring/delete', data={"series_id": str(series_id), "from_date": "2030-01-01"})
+    assert jobs.get_job(conn, runner.run_next())["result"] == {"deleted": 6}
+    assert conn.execute("SELECT COUNT(*) FROM Reservations WHERE series_id = ?", (series_id,)).fetchone()[0] == 0
+    conn.close()
+
+
+def test_claim_is_exclusive_and_recovers_stale_jobs(app):
+    first = db.connect(app.config["DATABASE"])
+    second = db.connect(app.config["DATABASE"])
+    job_id = jobs.enqueue(first, "delete_series", {"series_id": 1, "from_date": "2030-01-01"})
+
+    assert jobs.claim(first)["job_id"] == job_id
+    assert jobs.claim(second) is None
+    # Its worker died: the heartbeat goes stale and another worker takes it over
+    first.execute("UPDATE Jobs SET heartbeat = datetime('now', '-1 hour') WHERE job_id = ?", (job_id,))
+    first.commit()
+    assert jobs.claim(second)["job_id"] == job_id
+    assert jobs.get_job(second, job_id)["attempts"] == 2
+    # Out of attempts: the next claim gives up on it instead of leaving it running
+    first.execute("UPDATE Jobs SET heartbeat = datetime('now', '-1 hour'), attempts = ? WHERE job_id = ?",
+                  (jobs.JOB_MAX_ATTEMPTS, job_id))
+    first.commit()
+    assert jobs.claim(second) is None
+    gave_up = jobs.get_job(second, job_id)
+    assert gave_up["status"] == "failed" and "3 attempts" in gave_up["error"] and gave_up["finished_at"]
+
+    # A handler error marks the job failed rather than killing the thread
+    bad = jobs.enqueue(first, "moderate", {"action": "approve", "filters": {"colour": "red"}})
+    assert jobs.get_runner(app.config["DATABASE"]).run_next(second) == bad
+    failed = jobs.get_job(second, bad)
+    assert failed["status"] == "failed" and "colour" in failed["error"]
+    with pytest.raises(ValueError):
+        jobs.enqueue(first, "drop_tables", {})
+    first.close()
+    second.close()
+
+
+def test_slow_jobs_keep_their_heartbeat_and_finish_despite_index_errors(app, monkeypatch):
+    conn = db.connect(app.config["DATABASE"])
+    beats = []
+
+    def slow(job_conn, params, progress):
+        # No progress calls: only the heartbeat thread keeps the job alive
+        job_conn.execute("UPDATE Jobs SET heartbeat = datetime('now', '-1 hour')")
+        job_conn.commit()
+        time.sleep(0.3)
+        beats.append(job_conn.execute("SELECT heartbeat > datetime('now', '-1 minute') FROM Jobs").fetchone()[0])
+        return {"slept": True}
+
+    def broken_refresh(conn):
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setitem(jobs.HANDLERS, "delete_series", slow)
+    monkeypatch.setattr(jobs, "JOB_HEARTBEAT_SECONDS", 0.05)
+    monkeypatch.setattr(availability.get_index(app.config["DATABASE"]), "after_write", broken_refresh)
+    job_id = jobs.enqueue(conn, "delete_series", {})
+
+    assert jobs.get_runner(app.config["DATABASE"]).run_next() == job_id
+    assert beats == [1]
+    job = jobs.get_job(conn, job_id)
+    assert job["status"] == "done" and job["result"] == {"slept": True}
+    conn.close()
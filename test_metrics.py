@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for request timing, SQL tracing and the /metrics endpoint.
+"""
+
+import db
+import metrics
+
+
+def test_requests_and_queries_are_recorded(client, admin_client, app):
+    metrics.registry.reset()
+    assert client.get('/buildings').status_code == 200
+    assert client.get('/search?building_id=1&date=2030-01-07&hour=9').status_code in (200, 400)
+
+    body = admin_client.get('/metrics').get_data(as_text=True)
+    assert 'scheduler_request_duration_seconds_count{route="/buildings",method="GET",status="200"} 1' in body
+    assert 'le="+Inf"' in body
+    assert 'scheduler_sql_queries_total{statement="SELECT version FROM DataVersion WHERE name = \'catalog\'"}' in body
+    assert "scheduler_db_pool_connect_time_total_ms" in body
+    assert "scheduler_catalog_cache_hits" in body
+
+
+def test_tracer_counts_rows_and_stops(app):
+    trace = metrics.RequestTrace(metrics.Registry())
+    conn = db.connect(app.config["DATABASE"])
+    db.start_trace(trace)
+    try:
+        rows = conn.execute("SELECT room_id FROM Rooms").fetchall()
+        list(conn.execute("SELECT building_id FROM Buildings"))
+    finally:
+        db.stop_trace()
+    conn.execute("SELECT 1").fetchone()
+    conn.close()
+
+    assert trace.queries == 2
+    _, statements = trace.registry.snapshot()
+    assert statements["SELECT room_id FROM Rooms"][2] == len(rows)
+    assert "SELECT 1" not in statements
+
+
+def test_statement_cardinality_is_capped():
+    registry = metrics.Registry(max_statements=2)
+    for n in range(5):
+        registry.observe_query(f"SELECT {n}", 0.001, 1)
+    _, statements = registry.snapshot()
+    assert set(statements) == {"SELECT 0", "SELECT 1", "other"}
+    assert statements["other"][0] == 3
+
+
+def test_metrics_requires_admin_or_token(client, app):
+    assert client.get('/metrics').status_code == 401
+    app.config["METRICS_TOKEN"] = "scrape-me"
+    try:
+        assert client.get('/metrics', headers={"Authorization": "Bearer wrong"}).status_code == 401
+        response = client.get('/metrics', headers={"Authorization": "Bearer scrape-me"})
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+    finally:
+        app.config["METRICS_TOKEN"] = None
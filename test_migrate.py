@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Tests for the versioned migration runner.
+"""
+
+import multiprocessing
+import os
+import sqlite3
+
+import migrate
+
+
+def _count(database, table):
+    conn = sqlite3.connect(database)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _quiet(*args, **kwargs):
+    pass
+
+
+def test_fresh_database_is_migrated_and_seeded(tmp_path):
+    database = str(tmp_path / "fresh.db")
+    applied = migrate.upgrade(database, log=_quiet)
+
+    assert applied == [version for version, _, _ in migrate.discover()]
+    assert _count(database, "Buildings") > 0
+    assert _count(database, "Admins") == 1
+
+
+def test_upgrade_keeps_existing_data(tmp_path):
+    """A second start-up applies nothing and loses no reservations."""
+    database = str(tmp_path / "keep.db")
+    migrate.upgrade(database, log=_quiet)
+    conn = sqlite3.connect(database)
+    conn.execute(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status) "
+        "VALUES (1, 'Keep Me', '2030-01-07', 9, 'pending')"
+    )
+    conn.commit()
+    conn.close()
+    before = _count(database, "Reservations")
+
+    assert migrate.upgrade(database, log=_quiet) == []
+    assert _count(database, "Reservations") == before
+
+
+def test_legacy_database_adopts_baseline(tmp_path):
+    """Databases built before schema_version existed are not re-seeded."""
+    database = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(database)
+    with open(os.path.join(migrate.MIGRATIONS_DIR, "0001_initial_schema.sql")) as f:
+        conn.executescript(f.read())
+    conn.execute("INSERT INTO Buildings (name, address) VALUES ('Legacy', '1 Old St')")
+    conn.commit()
+    conn.close()
+
+    migrate.upgrade(database, log=_quiet)
+    assert _count(database, "Buildings") == 1
+    assert _count(database, "schema_version") == len(migrate.discover())
+
+
+def test_failed_migration_rolls_back(tmp_path):
+    directory = tmp_path / "broken"
+    directory.mkdir()
+    (directory / "0001_ok.sql").write_text("CREATE TABLE Ok (x INTEGER);")
+    (directory / "0002_broken.sql").write_text(
+        "CREATE TABLE Partial (x INTEGER);\nINSERT INTO Missing VALUES (1);"
+    )
+    database = str(tmp_path / "broken.db")
+
+    try:
+        migrate.upgrade(database, directory=str(directory), seed_data=False, log=_quiet)
+        raise AssertionError("broken migration should raise")
+    except sqlite3.OperationalError:
+        pass
+
+    conn = sqlite3.connect(database)
+    assert migrate.applied_versions(conn) == {1}
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    assert "Partial" not in tables
+
+
+def _upgrade_worker(database):
+    migrate.upgrade(database, log=_quiet)
+
+
+def test_parallel_workers_upgrade_once(tmp_path):
+    """Workers booting together serialise on the lock file and seed exactly once."""
+    database = str(tmp_path / "parallel.db")
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_upgrade_worker, args=(database,)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    assert _count(database, "Admins") == 1
+    assert _count(database, "schema_version") == len(migrate.discover())
+
+
+def test_recurring_series_backfill(tmp_path):
+    """Labelled weekly reservations from before 0003 are grouped into series."""
+    database = str(tmp_path / "backfill.db")
+    conn = sqlite3.connect(database)
+    with open(os.path.join(migrate.MIGRATIONS_DIR, "0001_initial_schema.sql")) as f:
+        conn.executescript(f.read())
+    conn.execute("INSERT INTO Buildings (name, address) VALUES ('HQ', '1 Main St')")
+    conn.execute("INSERT INTO Rooms (building_id, room_num, capacity) VALUES (1, '101', 6)")
+    conn.executemany(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status) VALUES (1, ?, ?, ?, ?)",
+        [("Weekly: Team", "2030-01-07", 9, "approved"), ("Weekly: Team", "2030-01-07", 10, "approved"),
+         ("Weekly: Team", "2030-01-14", 9, "approved"), ("Weekly: Team", "2030-01-14", 10, "approved"),
+         ("Weekly: Team", "2030-01-08", 9, "approved"),
+         ("Drop-in", "2030-01-09", 9, "pending")],
+    )
+    conn.commit()
+    conn.close()
+
+    migrate.upgrade(database, log=_quiet)
+
+    conn = sqlite3.connect(database)
+    series = conn.execute(
+        "SELECT weekday, start_hour, end_hour, start_date, end_date FROM RecurringSeries ORDER BY weekday"
+    ).fetchall()
+    assert series == [(0, 9, 11, "2030-01-07", "2030-01-14"), (1, 9, 10, "2030-01-08", "2030-01-08")]
+    assert conn.execute("SELECT COUNT(*) FROM Reservations WHERE series_id IS NULL").fetchone()[0] == 1
+    conn.close()
+
+
+def test_overlap_trigger_and_hourly_view(tmp_path):
+    """Interval rows cannot overlap and still read as hourly rows through ReservationHours."""
+    database = str(tmp_path / "interval.db")
+    migrate.upgrade(database, log=_quiet)
+    conn = sqlite3.connect(database)
+    conn.execute(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status) "
+        "VALUES (1, 'Span', '2030-01-07', 9, 12, 'pending')"
+    )
+    try:
+        conn.execute(
+            "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status) "
+            "VALUES (1, 'Clash', '2030-01-07', 11, 'pending')"
+        )
+        raise AssertionError("overlapping reservation should be rejected")
+    except sqlite3.IntegrityError:
+        pass
+    conn.execute(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status) "
+        "VALUES (1, 'Hourly', '2030-01-07', 12, 'pending')"
+    )
+
+    hours = conn.execute(
+        "SELECT reserved_by, slot_hour FROM ReservationHours WHERE room_id = 1 AND slot_date = '2030-01-07' ORDER BY slot_hour"
+    ).fetchall()
+    assert hours == [("Span", 9), ("Span", 10), ("Span", 11), ("Hourly", 12)]
+    conn.close()
+
+
+def test_partial_unique_rebuild_replays_concurrent_writes(tmp_path):
+    """0009 copies in batches while another connection keeps writing, and loses none of it."""
+    directory = tmp_path / "migrations"
+    directory.mkdir()
+    for _, filename, path in migrate.discover():
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        if filename.startswith("0009"):
+            source = source.replace("BATCH_SIZE = 20000", "BATCH_SIZE = 3")
+            filename = "held_" + filename
+        (directory / filename).write_text(source, encoding="utf-8")
+    held = next(directory.glob("held_0009*"))
+
+    database = str(tmp_path / "rebuild.db")
+    migrate.upgrade(database, str(directory), seed_data=False, log=_quiet)
+    conn = sqlite3.connect(database)
+    conn.execute("INSERT INTO Buildings (name, address) VALUES ('HQ', '1 Main St')")
+    conn.execute("INSERT INTO Rooms (building_id, room_num, capacity) VALUES (1, '101', 6)")
+    conn.executemany(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status) VALUES (1, ?, '2030-01-07', ?, ?)",
+        [(f"Row {hour}", hour, "rejected" if hour == 8 else "approved") for hour in range(7, 19)],
+    )
+    conn.execute("DELETE FROM Reservations WHERE slot_hour = 18")
+    conn.commit()
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'Reservations'").fetchone()[0]
+    held.rename(directory / held.name[len("held_"):])
+
+    progress = []
+
+    def log(message):
+        # Writes from a "running worker" between batches, to rows already copied
+        if not progress:
+            conn.execute("UPDATE Reservations SET status = 'rejected' WHERE slot_hour = 7")
+            conn.execute("DELETE FROM Reservations WHERE slot_hour = 9")
+            conn.execute("INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status) "
+                         "VALUES (1, 'Late', '2030-01-08', 9, 'pending')")
+            conn.commit()
+        progress.append(message)
+
+    assert migrate.upgrade(database, str(directory), seed_data=False, log=log) == [9]
+    assert sum("copied" in line for line in progress) >= 3
+    expected = [(f"Row {hour}", hour, "rejected" if hour in (7, 8) else "approved") for hour in range(7, 18) if hour != 9]
+    rows = conn.execute("SELECT reserved_by, slot_hour, status FROM Reservations WHERE slot_date = '2030-01-07' "
+                        "ORDER BY slot_hour").fetchall()
+    assert rows == expected
+    assert conn.execute("SELECT reserved_by FROM Reservations WHERE slot_date = '2030-01-08'").fetchall() == [("Late",)]
+    assert conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'Reservations'").fetchone()[0] == sequence + 1
+    assert not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'Reservations_new'").fetchone()
+
+    # Rejected rows no longer hold their hour; active ones still do, through the partial index
+    conn.execute("INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status) "
+                 "VALUES (1, 'Rebook', '2030-01-07', 8, 'pending')")
+    try:
+        conn.execute("INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status) "
+                     "VALUES (1, 'Clash', '2030-01-07', 10, 11, 'rejected')")
+        conn.execute("UPDATE Reservations SET status = 'approved' WHERE reserved_by = 'Clash'")
+        raise AssertionError("two active rows must not share a start hour")
+    except sqlite3.IntegrityError:
+        pass
+    # The view was recreated over the new table: 10 copied rows, Rebook and the rejected Clash
+    assert conn.execute("SELECT COUNT(*) FROM ReservationHours WHERE slot_date = '2030-01-07'").fetchone()[0] == 12
+    conn.close()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Query-plan guard: no route may fall back to a full scan of a large table.
+
+Every statement a route runs is captured (with its parameters bound) and run
+through EXPLAIN QUERY PLAN. A plain ``SCAN`` of a reservation table fails the
+test, as does walking a whole non-partial index without a LIMIT. Catalog
+tables (Buildings, Rooms) are small and loaded whole by design.
+"""
+
+import re
+from datetime import date
+
+import pytest
+
+import archive
+import db
+import jobs
+
+LARGE_TABLES = {"Reservations", "ReservationChanges", "RecurringSeries", "ReservationsArchive", "Jobs"}
+
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_KEYWORDS = {"where", "join", "on", "left", "inner", "cross", "group", "order", "limit", "indexed",
+             "not", "using", "as", "union", "set", "values"}
+
+
+def _aliases(sql):
+    """Map every name a table is referred to by in ``sql`` to the table."""
+    names = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        names[table] = table
+        if alias and alias.lower() not in _KEYWORDS:
+            names[alias] = table
+    return names
+
+
+def _full_scans(conn, sql):
+    names = _aliases(sql)
+    partial = {name for name, index_sql in conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql LIKE '%WHERE%'")}
+    limited = re.search(r"\bLIMIT\b", sql, re.IGNORECASE)
+    scans = []
+    for row in conn.execute("EXPLAIN QUERY PLAN " + sql):
+        match = re.match(r"SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?$", row[3])
+        if not match or names.get(match.group(1)) not in LARGE_TABLES:
+            continue
+        index = match.group(2)
+        if index is None or not (index in partial or limited):
+            scans.append(row[3])
+    return scans
+
+
+@pytest.fixture
+def traced(app, monkeypatch):
+    """Statements executed by pooled connections, with parameters expanded."""
+    statements = []
+    connect = db.connect
+
+    def tracing_connect(database):
+        conn = connect(database)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(db, "connect", tracing_connect)
+    return statements
+
+
+def _routes(conn):
+    monday = conn.execute("SELECT MIN(slot_date) FROM Reservations").fetchone()[0]
+    approved = conn.execute("SELECT reservation_id FROM Reservations WHERE status = 'approved' LIMIT 1").fetchone()[0]
+    series_id = conn.execute("SELECT MAX(series_id) FROM RecurringSeries").fetchone()[0]
+    conn.execute("UPDATE Reservations SET status = 'pending' WHERE room_id = 3")
+    conn.commit()
+    pending = [row[0] for row in conn.execute("SELECT reservation_id FROM Reservations WHERE status = 'pending' LIMIT 3")]
+    conn.executemany("INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, status) "
+                     "VALUES (1, 'Archived', ?, 9, 'approved')", [("2020-01-06",), ("2020-01-07",)])
+    conn.commit()
+    archive.compact(conn)
+    job_id = jobs.enqueue(conn, "delete_series", {"series_id": series_id, "from_date": "2099-01-01"})
+    window = f"start_date={monday}&end_date={monday}"
+    archived = "start_date=2020-01-06&end_date=2020-01-10"
+    return [
+        ("GET", f"/search?slot_date={monday}&start_hour=9&end_hour=11", {}),
+        ("GET", f"/search?slot_date={monday}&start_hour=9&end_hour=11&engine=sql&building_id=1", {}),
+        ("GET", f"/search?slot_date={monday}&start_hour=9&end_hour=11&engine=sql&min_capacity=6&accessible=1&limit=3", {}),
+        ("GET", f"/search/range?{window}&start_hour=9&end_hour=11&building_id=1", {}),
+        ("GET", f"/search/range?{window}&start_hour=9&end_hour=11&room_id=2&include_pending=1", {}),
+        ("GET", f"/suggest?room_id=1&duration=2&from_date={monday}", {}),
+        ("GET", f"/suggest?duration=3&count=10&from_date={monday}&min_capacity=8", {}),
+        ("GET", "/buildings", {}),
+        ("GET", "/floors/1", {}),
+        ("GET", "/api/bootstrap", {}),
+        ("POST", "/reserve", {"json": {"room_id": 4, "reserved_by": "Plan", "slot_date": monday,
+                                       "start_hour": 7, "end_hour": 9}}),
+        ("POST", "/reserve/batch", {"json": {"reserved_by": "Plan", "mode": "best_effort", "bookings": [
+            {"room_id": 4, "slot_date": monday, "start_hour": 8, "end_hour": 10},
+            {"room_id": 5, "slot_date": monday, "start_hour": 7, "end_hour": 9}]}}),
+        ("GET", "/admin", {}),
+        ("GET", "/admin/reservations", {}),
+        ("GET", "/admin/reservations?status=approved", {}),
+        ("GET", f"/admin/reservations?status=pending&{window}", {}),
+        ("GET", f"/admin/reservations?room_id=1&{window}&reserved_by=Ben", {}),
+        ("GET", "/admin/reservations?building_id=1", {}),
+        ("GET", f"/admin/reservations?status=approved&{archived}", {}),
+        ("GET", "/admin/buildings", {}),
+        ("GET", "/admin/rooms", {}),
+        ("GET", "/admin/recurring", {}),
+        ("POST", "/admin/recurring", {"data": {"reserved_by": "Plan series", "building_id": "1", "room_id": "4",
+                                               "weekday": "1", "start_hour": "15", "end_hour": "17",
+                                               "weeks": "4", "status": "approved"}}),
+        ("POST", "/admin/recurring/delete", {"data": {"series_id": str(series_id), "from_date": monday}}),
+        ("GET", "/admin/room/1/schedule", {}),
+        ("GET", "/admin/schedule", {}),
+        ("GET", f"/admin/api/schedule?{window}", {}),
+        ("GET", f"/admin/api/schedule?{archived}&room_id=1", {}),
+        ("POST", f"/admin/approve/{pending[0]}", {}),
+        ("POST", f"/admin/reject/{pending[1]}", {}),
+        ("POST", f"/admin/cancel/{approved}", {}),
+        ("POST", "/admin/approve-block", {"data": {"reservation_ids": str(pending[2])}}),
+        ("POST", "/admin/moderate", {"data": {"action": "approve", "room_id": "3", "start_date": monday}}),
+        ("POST", "/admin/moderate", {"data": {"action": "reject", "building_id": "2", "reserved_by": "Plan"}}),
+        ("GET", "/admin/jobs", {}),
+        ("GET", f"/admin/jobs/{job_id}", {}),
+        ("GET", "/admin/db-stats", {}),
+    ]
+
+
+def test_no_route_scans_a_large_table(admin_client, app, traced):
+    conn = db.connect(app.config["DATABASE"])
+    failures, checked = [], 0
+    for method, url, kwargs in _routes(conn):
+        del traced[:]
+        response = admin_client.open(url, method=method, **kwargs)
+        response.get_data()   # streamed bodies run their queries as they are read
+        assert response.status_code < 500, url
+        for sql in dict.fromkeys(traced):
+            # Trigger bodies are traced as "-- ..." comments; transaction control has no plan
+            if sql.startswith("--") or sql.split(None, 1)[0].upper() in ("BEGIN", "COMMIT", "ROLLBACK", "PRAGMA"):
+                continue
+            checked += 1
+            for scan in _full_scans(conn, sql):
+                failures.append(f"{method} {url}: {scan}\n    {' '.join(sql.split())[:200]}")
+    conn.close()
+    assert checked > 40
+    assert not failures, "Full scans:\n" + "\n".join(failures)
+
+
+def test_full_scan_is_detected(app):
+    conn = db.connect(app.config["DATABASE"])
+    assert _full_scans(conn, "SELECT * FROM Reservations r WHERE r.reserved_by = 'x'") == ["SCAN r"]
+    assert _full_scans(conn, "SELECT * FROM Reservations WHERE room_id = 1 AND slot_date = '2030-01-07'") == []
+    assert _full_scans(conn, "SELECT * FROM Rooms WHERE capacity > 4") == []
+    conn.close()
+
+
+def test_weekday_column_matches_python(app):
+    conn = db.connect(app.config["DATABASE"])
+    rows = conn.execute("SELECT slot_date, weekday FROM Reservations GROUP BY slot_date").fetchall()
+    assert rows
+    for slot_date, weekday in rows:
+        assert date.fromisoformat(slot_date).weekday() == weekday
+    conn.close()
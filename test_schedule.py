@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the streamed admin schedule grid.
+"""
+
+import json
+
+import db
+
+
+def _setup(app):
+    conn = db.connect(app.config["DATABASE"])
+    conn.executemany(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status) VALUES (?, ?, ?, ?, ?, ?)",
+        [(1, "Grid A", "2030-01-07", 9, 10, "approved"),
+         (1, "Grid B", "2030-01-08", 13, 16, "pending"),
+         (2, "Grid C", "2030-01-07", 19, 20, "rejected")],
+    )
+    conn.commit()
+    building_rooms = [row[0] for row in conn.execute(
+        "SELECT room_id FROM Rooms WHERE building_id = (SELECT building_id FROM Rooms WHERE room_id = 1)")]
+    conn.close()
+    return building_rooms
+
+
+def test_ndjson_grid_is_dense(admin_client, app):
+    building_rooms = _setup(app)
+    response = admin_client.get('/admin/api/schedule', query_string={
+        "start_date": "2030-01-07", "end_date": "2030-01-13", "room_id": 1})
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    header = lines[0]
+    assert header["type"] == "grid"
+    assert header["dates"] == ["2030-01-07", "2030-01-08", "2030-01-09", "2030-01-10", "2030-01-11"]
+    assert [line["type"] for line in lines[1:]] == ["room"] + ["day"] * 5
+
+    days = {line["date"]: line["cells"] for line in lines if line["type"] == "day"}
+    assert days["2030-01-07"][2][1:] == ["approved", "Grid A"]
+    assert [cell is not None for cell in days["2030-01-08"]] == [h in (13, 14, 15) for h in range(7, 20)]
+    assert all(cell is None for cell in days["2030-01-09"])
+
+    building = admin_client.get('/admin/api/schedule', query_string={
+        "start_date": "2030-01-07", "end_date": "2030-01-07", "building_id": 1}).get_data(as_text=True)
+    rooms = [json.loads(line)["room_id"] for line in building.splitlines() if '"type": "room"' in line]
+    assert sorted(rooms) == sorted(building_rooms)
+
+
+def test_chunked_json_and_rejected_filter(admin_client, app):
+    _setup(app)
+    params = {"start_date": "2030-01-07", "end_date": "2030-01-07", "room_id": 2, "format": "json"}
+    data = admin_client.get('/admin/api/schedule', query_string=params).get_json()
+    assert data["room_count"] == 1
+    assert data["rooms"][0]["days"][0]["cells"][-1] is None
+
+    data = admin_client.get('/admin/api/schedule', query_string={**params, "include_rejected": 1}).get_json()
+    assert data["rooms"][0]["days"][0]["cells"][-1][1] == "rejected"
+
+    assert admin_client.get('/admin/api/schedule', query_string={**params, "format": "xml"}).status_code == 400
+    assert admin_client.get('/admin/schedule').status_code == 200
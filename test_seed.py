@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the bulk seed loader.
+"""
+
+import sqlite3
+
+import pytest
+
+import db
+import migrate
+import seed
+from stress_booking import double_bookings
+
+
+def _schema(conn):
+    return sorted(tuple(row) for row in conn.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = 'Reservations'"))
+
+
+def _fresh(tmp_path):
+    database = str(tmp_path / "seed.db")
+    migrate.upgrade(database, seed_data=False, log=lambda *a: None)
+    return db.connect(database)
+
+
+def test_sample_data_and_schema_survive_bulk_load(tmp_path):
+    conn = _fresh(tmp_path)
+    before = _schema(conn)
+    counts = seed.load(conn)
+
+    assert counts == {"buildings": 4, "rooms": 13, "employees": 11, "series": 31, "reservations": 824}
+    assert _schema(conn) == before
+    assert conn.execute("SELECT COUNT(*) FROM Admins").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM ReservationChanges").fetchone()[0] == 0
+    monday = seed.first_monday().isoformat()
+    assert conn.execute("SELECT MIN(slot_date) FROM Reservations").fetchone()[0] == monday
+    assert not conn.execute("""
+        SELECT 1 FROM Reservations r JOIN RecurringSeries s ON s.series_id = r.series_id
+        WHERE  r.room_id != s.room_id OR r.slot_hour NOT BETWEEN s.start_hour AND s.end_hour - 1
+    """).fetchone()
+
+    # The rebuilt triggers still guard new writes
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour) "
+                     "VALUES (1, 'Clash', ?, 8, 11)", (monday,))
+    conn.close()
+
+
+def test_synthetic_scale_has_no_double_bookings(tmp_path):
+    conn = _fresh(tmp_path)
+    counts = seed.load(conn, employees=200, rooms=60, weeks=4)
+    assert counts["rooms"] == 60 and counts["buildings"] == 7
+    assert counts["employees"] > 150
+    assert counts["reservations"] == conn.execute(
+        "SELECT SUM((end_hour - start_hour) * 4) FROM RecurringSeries").fetchone()[0]
+    assert double_bookings(conn) == []
+    conn.close()
+
+
+def test_seed_refuses_populated_database(tmp_path):
+    conn = _fresh(tmp_path)
+    seed.load(conn)
+    with pytest.raises(ValueError):
+        seed.load(conn)
+    assert conn.execute("SELECT COUNT(*) FROM Buildings").fetchone()[0] == 4
+    conn.close()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for the /suggest next-free-slot solver.
+"""
+
+import time
+from datetime import date, timedelta
+
+import pytest
+
+import availability
+import db
+import migrate
+import seed
+from app import app as flask_app
+
+# Worst-case wall time for one /suggest call on the synthetic dataset below
+LATENCY_BUDGET = 0.5
+
+
+def _book(conn, room_id, slot_date, start_hour, end_hour, status="approved"):
+    conn.execute(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status) "
+        "VALUES (?, 'Busy', ?, ?, ?, ?)", (room_id, slot_date, start_hour, end_hour, status))
+    conn.commit()
+
+
+def test_suggestions_skip_weekends_and_busy_hours(client, app):
+    conn = db.connect(app.config["DATABASE"])
+    # Friday 2030-01-11 is free only 16:00-18:00 in room 2
+    _book(conn, 2, "2030-01-11", 7, 16)
+    _book(conn, 2, "2030-01-11", 18, 20, status="pending")
+    conn.close()
+
+    options = client.get('/suggest', query_string={"room_id": 2, "duration": 2, "from_date": "2030-01-11",
+                                                   "count": 3}).get_json()["options"]
+    assert [(o["slot_date"], o["start_hour"], o["end_hour"]) for o in options] == [
+        ("2030-01-11", 16, 18), ("2030-01-14", 7, 9), ("2030-01-14", 8, 10)]
+    assert {o["room_id"] for o in options} == {2}
+
+    saturday = client.get('/suggest', query_string={"room_id": 2, "duration": 1,
+                                                    "from_date": "2030-01-12"}).get_json()
+    assert saturday["options"][0]["slot_date"] == "2030-01-14"
+
+    fit = client.get('/suggest', query_string={"duration": 1, "from_date": "2030-01-14", "min_capacity": 9,
+                                               "count": 2}).get_json()["options"]
+    assert [o["capacity"] for o in fit] == [10, 12]
+
+    for bad in ({"duration": 0}, {"duration": 14}, {"duration": 2, "count": 99},
+                {"duration": 2, "from_date": "2000-01-03"}, {"duration": "long"}):
+        assert client.get('/suggest', query_string=bad).status_code == 400, bad
+    assert client.get('/suggest', query_string={"duration": 1, "room_id": 999}).status_code == 404
+
+
+def test_solver_matches_brute_force(app):
+    conn = db.connect(app.config["DATABASE"])
+    monday = date(2030, 2, 4)
+    for offset, (room, start, end) in enumerate([(1, 7, 12), (1, 13, 20), (3, 9, 17), (5, 7, 20), (1, 12, 13)]):
+        _book(conn, room, (monday + timedelta(days=offset % 3)).isoformat(), start, end)
+    rooms = [{"room_id": room_id} for room_id in (1, 3, 5)]
+    options, _ = availability.next_free_slots(conn, rooms, monday, monday + timedelta(days=13), 4, 25)
+
+    expected = []
+    for day in range(14):
+        slot_date = monday + timedelta(days=day)
+        if slot_date.weekday() > 4:
+            continue
+        for start in range(7, 17):
+            for room in rooms:
+                clash = conn.execute(
+                    "SELECT 1 FROM Reservations WHERE room_id = ? AND slot_date = ? AND status IN ('pending', 'approved') "
+                    "AND slot_hour < ? AND end_hour > ?",
+                    (room["room_id"], slot_date.isoformat(), start + 4, start)).fetchone()
+                if not clash:
+                    expected.append((room["room_id"], slot_date.isoformat(), start))
+    assert [(o["room_id"], o["slot_date"], o["start_hour"]) for o in options] == expected[:25]
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def busy_app(tmp_path_factory):
+    """The app over 300 rooms of weekly schedules, plus room 1 booked solid for the whole horizon."""
+    database = str(tmp_path_factory.mktemp("suggest") / "busy.db")
+    migrate.upgrade(database, seed_data=False, log=lambda *a: None)
+    conn = db.connect(database)
+    seed.load(conn, employees=3000, rooms=300, weeks=10)
+    monday = seed.first_monday()
+    conn.execute("DELETE FROM Reservations WHERE room_id = 1")
+    conn.executemany(
+        "INSERT INTO Reservations (room_id, reserved_by, slot_date, slot_hour, end_hour, status) "
+        "VALUES (1, 'Solid', ?, 7, 20, 'approved')",
+        [((monday + timedelta(days=day)).isoformat(),) for day in range(90)])
+    conn.commit()
+    conn.close()
+    original = flask_app.config["DATABASE"]
+    flask_app.config.update(DATABASE=database, TESTING=True)
+    yield flask_app, monday
+    flask_app.config.update(DATABASE=original, TESTING=False)
+
+
+def test_worst_cases_stay_within_latency_budget(busy_app, monkeypatch):
+    app, monday = busy_app
+    client = app.test_client()
+    statements = []
+    connect = db.connect
+
+    def tracing_connect(database):
+        conn = connect(database)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(db, "connect", tracing_connect)
+    cases = [
+        # One room with nothing free: the whole horizon is scanned and nothing found
+        {"room_id": 1, "duration": 1},
+        # Whole catalog, a full-day booking that few rooms can take
+        {"duration": 13, "count": 20},
+        # A filtered candidate set small enough to seek room by room
+        {"building_id": 5, "min_capacity": 10, "duration": 6, "count": 20},
+    ]
+    for case in cases:
+        params = {"from_date": monday.isoformat(), **case}
+        client.get('/suggest', query_string=params)   # warm the pool and catalog cache
+        worst = 0.0
+        for _ in range(3):
+            del statements[:]
+            started = time.perf_counter()
+            response = client.get('/suggest', query_string=params)
+            worst = max(worst, time.perf_counter() - started)
+            assert response.status_code == 200
+        scans = [sql for sql in statements if "FROM   Reservations" in sql or "FROM Reservations" in sql]
+        assert len(scans) == 1, scans
+        assert worst < LATENCY_BUDGET, (case, worst)
+
+    solid = client.get('/suggest', query_string={"room_id": 1, "duration": 1,
+                                                 "from_date": monday.isoformat()}).get_json()
+    assert solid["options"] == [] and solid["searched_through"] <= solid["horizon_end"]